@@ -1,5 +1,7 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Header, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+import math
 
 app = FastAPI(title="Oscar Legal AI Service", version="0.1.0")
 
@@ -11,10 +13,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 from typing import Optional
 from app.services.research_service import research_service
 from app.services.drafting_service import drafting_service
+from app.services.model_router import model_router
+from app.services.resilience import UpstreamError
+from app.services.admission import AdmissionRejected, admission_controller
+from app.services.chunking import count_tokens
+from app.services.batch_service import batch_drafting_service, group_key, parse_rows
 from typing import List, Optional
 
 class ResearchRequest(BaseModel):
@@ -33,6 +40,30 @@ class AnalysisRequest(BaseModel):
     issue: str
     context: Optional[str] = None
 
+@app.exception_handler(UpstreamError)
+async def upstream_error_handler(request: Request, exc: UpstreamError):
+    headers = None
+    if exc.retry_after or exc.status_code == 503:
+        # 503 always says when to come back, at least a second from now
+        headers = {"Retry-After": str(max(1, math.ceil(exc.retry_after or 0)))}
+    return JSONResponse(status_code=exc.status_code, content={"detail": str(exc)}, headers=headers)
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))}
+    )
+
+def estimate_tokens(*texts: Optional[str], completion_tokens: int) -> int:
+    """Rough LLM token cost of a request, charged against the caller's token bucket."""
+    return sum(count_tokens(t) for t in texts if t) + completion_tokens
+
+@app.on_event("startup")
+async def resume_batch_jobs():
+    batch_drafting_service.resume_unfinished()
+
 @app.get("/")
 def read_root():
     return {"message": "Oscar Legal AI Service is running", "status": "online"}
@@ -41,27 +72,122 @@ def read_root():
 def health_check():
     return {"status": "healthy"}
 
+@app.get("/api/v1/models/stats")
+def model_stats():
+    """Rolling latency, token usage and estimated cost per model."""
+    return model_router.stats()
+
 @app.post("/api/v1/research")
-async def legal_research(request: ResearchRequest):
-    return await research_service.perform_research(
-        query=request.query,
-        jurisdiction=request.jurisdiction,
-        top_k=request.top_k
-    )
+async def legal_research(
+    request: ResearchRequest,
+    http_request: Request,
+    x_latency_slo_ms: Optional[int] = Header(None)
+):
+    # Retrieved context is roughly 300 tokens per document
+    tokens = estimate_tokens(request.query, completion_tokens=1500 + 300 * request.top_k)
+    async with admission_controller.admit("research", http_request, tokens):
+        return await research_service.perform_research(
+            query=request.query,
+            jurisdiction=request.jurisdiction,
+            top_k=request.top_k,
+            user_tier=admission_controller.user_tier(http_request),
+            latency_slo_ms=x_latency_slo_ms
+        )
 
 @app.post("/api/v1/draft")
-async def generate_draft(request: DraftingRequest):
-    return await drafting_service.generate_document(
-        template_type=request.template_type,
-        party_a=request.party_a,
-        party_b=request.party_b,
-        jurisdiction=request.jurisdiction,
-        additional_clauses=request.additional_clauses
-    )
+async def generate_draft(
+    request: DraftingRequest,
+    http_request: Request,
+    x_latency_slo_ms: Optional[int] = Header(None)
+):
+    tokens = estimate_tokens(*(request.additional_clauses or []), completion_tokens=3000 + 200)
+    async with admission_controller.admit("draft", http_request, tokens):
+        return await drafting_service.generate_document(
+            template_type=request.template_type,
+            party_a=request.party_a,
+            party_b=request.party_b,
+            jurisdiction=request.jurisdiction,
+            additional_clauses=request.additional_clauses,
+            user_tier=admission_controller.user_tier(http_request),
+            latency_slo_ms=x_latency_slo_ms
+        )
 
 @app.post("/api/v1/analyze")
-async def analyze_legal_issue(request: AnalysisRequest):
-    return await drafting_service.analyze_legal_issue(
-        issue=request.issue,
-        context=request.context
+async def analyze_legal_issue(
+    request: AnalysisRequest,
+    http_request: Request,
+    x_latency_slo_ms: Optional[int] = Header(None)
+):
+    tokens = estimate_tokens(request.issue, request.context, completion_tokens=2000)
+    async with admission_controller.admit("analyze", http_request, tokens):
+        return await drafting_service.analyze_legal_issue(
+            issue=request.issue,
+            context=request.context,
+            user_tier=admission_controller.user_tier(http_request),
+            latency_slo_ms=x_latency_slo_ms
+        )
+
+@app.post("/api/v1/draft/batch", status_code=202)
+async def create_batch_draft(http_request: Request):
+    """
+    Start a mail-merge drafting job from a JSON list of DraftingRequest rows,
+    a CSV body (text/csv) or a multipart upload with a `file` field.
+    """
+    content_type = http_request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        upload = (await http_request.form()).get("file")
+        if upload is None:
+            raise HTTPException(status_code=400, detail="Missing 'file' upload")
+        data, is_csv = await upload.read(), (upload.filename or "").lower().endswith(".csv")
+    else:
+        data, is_csv = await http_request.body(), content_type.startswith("text/csv")
+
+    try:
+        raw_rows = parse_rows(data, is_csv)
+    except (ValueError, KeyError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Could not parse rows: {e}")
+
+    rows, errors = [], []
+    for index, raw in enumerate(raw_rows):
+        try:
+            rows.append(DraftingRequest(**raw).dict())
+        except (ValidationError, TypeError) as e:
+            errors.append({"row": index + 1, "error": str(e)})
+    if errors or not rows:
+        raise HTTPException(status_code=422, detail=errors or "No rows to draft")
+
+    # One strong-model draft per group of rows sharing a template
+    groups = len({group_key(r) for r in rows})
+    async with admission_controller.admit("batch", http_request, estimate_tokens(completion_tokens=3200 * groups)):
+        return batch_drafting_service.create_job(rows, owner=admission_controller.identify(http_request))
+
+def owned_batch_job(job_id: str, http_request: Request) -> dict:
+    """Status of a job created by the caller; other callers get the same 404 as for a missing job."""
+    try:
+        job = batch_drafting_service.status(job_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Batch job not found")
+    if job.get("owner") != admission_controller.identify(http_request):
+        raise HTTPException(status_code=404, detail="Batch job not found")
+    return job
+
+@app.get("/api/v1/draft/batch/{job_id}")
+def get_batch_draft(job_id: str, http_request: Request):
+    return owned_batch_job(job_id, http_request)
+
+@app.post("/api/v1/draft/batch/{job_id}/resume", status_code=202)
+async def resume_batch_draft(job_id: str, http_request: Request):
+    job = owned_batch_job(job_id, http_request)
+    # Resuming drafts again, so it is charged like starting the job
+    async with admission_controller.admit("batch", http_request, estimate_tokens(completion_tokens=3200 * job["groups"])):
+        batch_drafting_service.start(job_id)
+    return batch_drafting_service.status(job_id)
+
+@app.get("/api/v1/draft/batch/{job_id}/archive")
+def download_batch_draft(job_id: str, http_request: Request):
+    owned_batch_job(job_id, http_request)
+    return StreamingResponse(
+        batch_drafting_service.iter_archive(job_id),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="drafts-{job_id}.zip"'}
     )
@@ -0,0 +1,245 @@
+from contextlib import asynccontextmanager
+from typing import Dict, Optional, Tuple
+import asyncio
+import base64
+import hashlib
+import hmac
+import ipaddress
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# KEYS: request bucket, token bucket
+# ARGV: request rate/s, request capacity, token rate/s, token capacity, token cost, ttl ms
+TOKEN_BUCKET_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local function level(key, rate, capacity)
+    local v = redis.call('HMGET', key, 'level', 'ts')
+    local current = tonumber(v[1]) or capacity
+    local ts = tonumber(v[2]) or now
+    return math.min(capacity, current + math.max(0, now - ts) * rate)
+end
+local req_rate, req_cap = tonumber(ARGV[1]), tonumber(ARGV[2])
+local tok_rate, tok_cap = tonumber(ARGV[3]), tonumber(ARGV[4])
+local cost = math.min(tonumber(ARGV[5]), tok_cap)
+local requests = level(KEYS[1], req_rate, req_cap)
+local tokens = level(KEYS[2], tok_rate, tok_cap)
+local wait = 0
+if requests < 1 then wait = math.max(wait, (1 - requests) / req_rate) end
+if tokens < cost then wait = math.max(wait, (cost - tokens) / tok_rate) end
+if wait == 0 then
+    requests = requests - 1
+    tokens = tokens - cost
+end
+redis.call('HSET', KEYS[1], 'level', requests, 'ts', now)
+redis.call('HSET', KEYS[2], 'level', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], ARGV[6])
+redis.call('PEXPIRE', KEYS[2], ARGV[6])
+if wait == 0 then return {1, '0'} end
+return {0, tostring(wait)}
+"""
+
+
+class AdmissionRejected(Exception):
+    """The request was not admitted; respond 429 with Retry-After."""
+
+    def __init__(self, detail: str, retry_after: float):
+        super().__init__(detail)
+        self.retry_after = retry_after
+
+
+class TokenBucketLimiter:
+    """
+    Per-identity rate limit in both requests and estimated LLM tokens.
+    State lives in Redis so every worker shares it; if Redis is unreachable the
+    limiter falls back to per-process buckets until Redis answers again.
+    """
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        requests_per_minute: float = 20,
+        request_burst: float = 10,
+        tokens_per_minute: float = 40000,
+        token_burst: float = 40000,
+        redis_retry_seconds: float = 30
+    ):
+        self.redis_url = redis_url
+        self.request_rate = requests_per_minute / 60
+        self.request_capacity = request_burst
+        self.token_rate = tokens_per_minute / 60
+        self.token_capacity = token_burst
+        self.redis_retry_seconds = redis_retry_seconds
+        self._redis = None
+        self._script = None
+        self._redis_down_until = 0.0
+        self._local: Dict[str, Tuple[float, float]] = {}
+
+    def _client(self):
+        if not self.redis_url or time.monotonic() < self._redis_down_until:
+            return None
+        if self._redis is None:
+            import redis.asyncio as redis
+            self._redis = redis.from_url(self.redis_url, socket_timeout=0.25, socket_connect_timeout=0.25)
+            self._script = self._redis.register_script(TOKEN_BUCKET_SCRIPT)
+        return self._redis
+
+    def _take_local(self, key: str, rate: float, capacity: float, cost: float, now: float) -> Tuple[float, float]:
+        level, ts = self._local.get(key, (capacity, now))
+        level = min(capacity, level + (now - ts) * rate)
+        wait = 0.0 if level >= cost else (cost - level) / rate
+        return level, wait
+
+    def _acquire_local(self, identity: str, cost: float) -> float:
+        now = time.monotonic()
+        cost = min(cost, self.token_capacity)
+        req_key, tok_key = f"{identity}:req", f"{identity}:tok"
+        requests, req_wait = self._take_local(req_key, self.request_rate, self.request_capacity, 1, now)
+        tokens, tok_wait = self._take_local(tok_key, self.token_rate, self.token_capacity, cost, now)
+        wait = max(req_wait, tok_wait)
+        if wait == 0:
+            requests, tokens = requests - 1, tokens - cost
+        self._local[req_key] = (requests, now)
+        self._local[tok_key] = (tokens, now)
+        return wait
+
+    async def acquire(self, identity: str, estimated_tokens: int) -> float:
+        """Consume one request and `estimated_tokens` tokens. Returns 0 if admitted, else seconds to wait."""
+        client = self._client()
+        if client is not None:
+            ttl_ms = int(max(self.request_capacity / self.request_rate, self.token_capacity / self.token_rate) * 1000) + 1000
+            try:
+                allowed, wait = await self._script(
+                    keys=[f"ai:rl:{identity}:req", f"ai:rl:{identity}:tok"],
+                    args=[self.request_rate, self.request_capacity, self.token_rate, self.token_capacity, estimated_tokens, ttl_ms]
+                )
+                return 0.0 if int(allowed) == 1 else float(wait)
+            except Exception as e:
+                logger.warning("Rate limiter falling back to in-memory buckets: %s", e)
+                self._redis_down_until = time.monotonic() + self.redis_retry_seconds
+        return self._acquire_local(identity, estimated_tokens)
+
+
+class ConcurrencyLimiter:
+    """At most `max_concurrent` requests in flight, with a short bounded wait queue."""
+
+    def __init__(self, max_concurrent: int, max_queue: int, queue_timeout: float):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self.waiting = 0
+
+    @asynccontextmanager
+    async def slot(self):
+        if self._semaphore.locked() and self.waiting >= self.max_queue:
+            raise AdmissionRejected("Too many concurrent requests, please retry shortly", self.queue_timeout)
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise AdmissionRejected("Too many concurrent requests, please retry shortly", self.queue_timeout)
+        finally:
+            self.waiting -= 1
+        try:
+            yield
+        finally:
+            self._semaphore.release()
+
+
+def _b64decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def verified_claims(token: str, secret: Optional[str]) -> Optional[Dict]:
+    """Return the claims of an unexpired HS256 JWT signed with the backend's SECRET_KEY, or None."""
+    if not secret:
+        return None
+    try:
+        header, payload, signature = token.split(".")
+        expected = hmac.new(secret.encode(), f"{header}.{payload}".encode(), hashlib.sha256).digest()
+        if not hmac.compare_digest(expected, _b64decode(signature)):
+            return None
+        if json.loads(_b64decode(header)).get("alg") != "HS256":
+            return None
+        claims = json.loads(_b64decode(payload))
+        if claims.get("exp") is not None and claims["exp"] < time.time():
+            return None
+        return claims if isinstance(claims, dict) else None
+    except (ValueError, TypeError):
+        return None
+
+
+# Routing tier of callers without a valid token
+FREE_TIER = "free"
+
+
+class AdmissionController:
+    def __init__(self):
+        self.secret_key = os.getenv("SECRET_KEY")
+        self.rate_limiter = TokenBucketLimiter(
+            redis_url=os.getenv("REDIS_URL"),
+            requests_per_minute=float(os.getenv("AI_RATE_REQUESTS_PER_MINUTE", "20")),
+            request_burst=float(os.getenv("AI_RATE_REQUESTS_BURST", "10")),
+            tokens_per_minute=float(os.getenv("AI_RATE_TOKENS_PER_MINUTE", "40000")),
+            token_burst=float(os.getenv("AI_RATE_TOKENS_BURST", "40000"))
+        )
+        # Peers allowed to set X-Real-IP (the nginx in front of this service)
+        self.trusted_proxies = [
+            ipaddress.ip_network(network.strip(), strict=False)
+            for network in os.getenv("AI_TRUSTED_PROXIES", "127.0.0.1,::1").split(",") if network.strip()
+        ]
+        max_queue = int(os.getenv("AI_MAX_QUEUE", "8"))
+        queue_timeout = float(os.getenv("AI_QUEUE_TIMEOUT_SECONDS", "2"))
+        self.endpoints = {
+            name: ConcurrencyLimiter(int(os.getenv(f"AI_MAX_CONCURRENT_{name.upper()}", default)), max_queue, queue_timeout)
+            for name, default in (("research", "8"), ("draft", "4"), ("analyze", "2"), ("batch", "2"))
+        }
+
+    def _from_trusted_proxy(self, host: str) -> bool:
+        try:
+            address = ipaddress.ip_address(host)
+        except ValueError:
+            return False
+        return any(address in network for network in self.trusted_proxies)
+
+    def _claims(self, request) -> Optional[Dict]:
+        authorization = request.headers.get("authorization", "")
+        if authorization.lower().startswith("bearer "):
+            return verified_claims(authorization[7:], self.secret_key)
+        return None
+
+    def user_tier(self, request) -> str:
+        """Model-routing tier: the role in the caller's verified token (student, lawyer, ...), else free."""
+        claims = self._claims(request)
+        return str(claims["role"]) if claims and claims.get("role") else FREE_TIER
+
+    def identify(self, request) -> str:
+        """
+        Rate-limit key: the verified user, else the client address. Only credentials
+        checked here may pick a bucket, and X-Real-IP counts only when a trusted proxy
+        set it; otherwise a caller could start a fresh quota per request.
+        """
+        claims = self._claims(request)
+        if claims and claims.get("sub"):
+            return f"user:{claims['sub']}"
+        client_ip = request.client.host if request.client else "unknown"
+        real_ip = request.headers.get("x-real-ip")
+        if real_ip and self._from_trusted_proxy(client_ip):
+            client_ip = real_ip.strip()
+        return f"ip:{client_ip}"
+
+    @asynccontextmanager
+    async def admit(self, endpoint: str, request, estimated_tokens: int):
+        """Rate-limit the caller, then hold one of the endpoint's concurrency slots for the block."""
+        wait = await self.rate_limiter.acquire(self.identify(request), estimated_tokens)
+        if wait > 0:
+            raise AdmissionRejected("Rate limit exceeded", wait)
+        async with self.endpoints[endpoint].slot():
+            yield
+
+admission_controller = AdmissionController()
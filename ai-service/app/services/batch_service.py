@@ -0,0 +1,258 @@
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+from app.services.drafting_service import drafting_service
+import asyncio
+import csv
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import uuid
+import zipfile
+
+logger = logging.getLogger(__name__)
+
+PARTY_A_PLACEHOLDER = "{{PARTY_A}}"
+PARTY_B_PLACEHOLDER = "{{PARTY_B}}"
+
+
+def _slug(value: str, max_length: int = 40) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", value.lower()).strip("-")[:max_length] or "x"
+
+
+def group_key(row: Dict) -> str:
+    """Rows that differ only in their parties share one generated template."""
+    shared = [row["template_type"], row["jurisdiction"], sorted(row.get("additional_clauses") or [])]
+    return hashlib.sha1(json.dumps(shared).encode("utf-8")).hexdigest()[:16]
+
+
+def parse_rows(data: bytes, is_csv: bool) -> List[Dict]:
+    """
+    Parse an uploaded row list. CSV needs template_type, party_a, party_b and jurisdiction
+    columns (additional_clauses separated by ';'); JSON is a list or {"rows": [...]}.
+    """
+    text = data.decode("utf-8-sig")
+    if not is_csv:
+        parsed = json.loads(text)
+        return parsed["rows"] if isinstance(parsed, dict) else parsed
+
+    rows = []
+    for record in csv.DictReader(io.StringIO(text)):
+        row = {k.strip(): (v or "").strip() for k, v in record.items() if k}
+        clauses = row.pop("additional_clauses", "")
+        row["additional_clauses"] = [c.strip() for c in clauses.split(";") if c.strip()] or None
+        rows.append(row)
+    return rows
+
+
+class _ZipStream(io.RawIOBase):
+    """Write-only, unseekable sink so zipfile emits the archive incrementally."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def pop(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class BatchDraftingService:
+    """
+    Mail-merge drafting. A job's rows, checkpoint and generated documents live under
+    BATCH_DIR/<job_id>, so an interrupted job resumes from its checkpoint instead of restarting.
+    """
+
+    def __init__(self, base_dir: Optional[str] = None):
+        self.base_dir = base_dir or os.getenv("BATCH_DIR", "./data/batch_jobs")
+        self.max_concurrency = int(os.getenv("BATCH_MAX_CONCURRENCY", "4"))
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._running: Dict[str, asyncio.Task] = {}
+
+    def _job_dir(self, job_id: str) -> str:
+        if not re.fullmatch(r"[0-9a-f]{32}", job_id):
+            raise KeyError(job_id)
+        return os.path.join(self.base_dir, job_id)
+
+    def _read_meta(self, job_id: str) -> Dict:
+        path = os.path.join(self._job_dir(job_id), "job.json")
+        if not os.path.exists(path):
+            raise KeyError(job_id)
+        with open(path) as f:
+            return json.load(f)
+
+    def _write_meta(self, job_id: str, meta: Dict):
+        path = os.path.join(self._job_dir(job_id), "job.json")
+        with open(path + ".tmp", "w") as f:
+            json.dump(meta, f)
+        os.replace(path + ".tmp", path)
+
+    def _read_rows(self, job_id: str) -> List[Dict]:
+        with open(os.path.join(self._job_dir(job_id), "rows.jsonl")) as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def _read_checkpoint(self, job_id: str) -> Dict[int, Dict]:
+        path = os.path.join(self._job_dir(job_id), "checkpoint.jsonl")
+        done: Dict[int, Dict] = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line from a crash
+                    done[entry["row"]] = entry
+        return done
+
+    def _append_checkpoint(self, job_id: str, entry: Dict):
+        with open(os.path.join(self._job_dir(job_id), "checkpoint.jsonl"), "a") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def create_job(self, rows: List[Dict], owner: str) -> Dict:
+        """Store and start a job; `owner` is the admission identity allowed to see and resume it."""
+        job_id = uuid.uuid4().hex
+        job_dir = self._job_dir(job_id)
+        os.makedirs(os.path.join(job_dir, "docs"), exist_ok=True)
+        os.makedirs(os.path.join(job_dir, "templates"), exist_ok=True)
+        with open(os.path.join(job_dir, "rows.jsonl"), "w") as f:
+            for row in rows:
+                f.write(json.dumps(row) + "\n")
+        meta = {
+            "job_id": job_id,
+            "owner": owner,
+            "status": "queued",
+            "total": len(rows),
+            "groups": len({group_key(r) for r in rows}),
+            "created_at": datetime.now().isoformat(),
+        }
+        self._write_meta(job_id, meta)
+        self.start(job_id)
+        return meta
+
+    def start(self, job_id: str):
+        """Run (or resume) a job in the background; a job already running is left alone."""
+        self._read_meta(job_id)
+        task = self._running.get(job_id)
+        if task is None or task.done():
+            self._running[job_id] = asyncio.create_task(self._run(job_id))
+
+    def resume_unfinished(self):
+        """Restart jobs that were interrupted by a crash or redeploy."""
+        if not os.path.isdir(self.base_dir):
+            return
+        for job_id in os.listdir(self.base_dir):
+            try:
+                if self._read_meta(job_id)["status"] in ("queued", "running"):
+                    logger.info("Resuming batch drafting job %s", job_id)
+                    self.start(job_id)
+            except (KeyError, ValueError):
+                continue
+
+    async def _template(self, job_id: str, row: Dict, key: str, locks: Dict[str, asyncio.Lock]) -> Optional[str]:
+        """Generate (once per group, persisted) a draft with party placeholders."""
+        path = os.path.join(self._job_dir(job_id), "templates", f"{key}.txt")
+        async with locks.setdefault(key, asyncio.Lock()):
+            if os.path.exists(path):
+                with open(path) as f:
+                    content = f.read()
+            else:
+                async with self._semaphore:
+                    result = await drafting_service.generate_document(
+                        template_type=row["template_type"],
+                        party_a=PARTY_A_PLACEHOLDER,
+                        party_b=PARTY_B_PLACEHOLDER,
+                        jurisdiction=row["jurisdiction"],
+                        additional_clauses=row.get("additional_clauses")
+                    )
+                content = result["content"]
+                with open(path, "w") as f:
+                    f.write(content)
+        # The model did not keep the placeholders; rows in this group are drafted individually
+        if PARTY_A_PLACEHOLDER not in content or PARTY_B_PLACEHOLDER not in content:
+            return None
+        return content
+
+    async def _draft_row(self, job_id: str, index: int, row: Dict, locks: Dict[str, asyncio.Lock]):
+        try:
+            template = await self._template(job_id, row, group_key(row), locks)
+            if template is not None:
+                content = template.replace(PARTY_A_PLACEHOLDER, row["party_a"]).replace(PARTY_B_PLACEHOLDER, row["party_b"])
+            else:
+                async with self._semaphore:
+                    result = await drafting_service.generate_document(
+                        template_type=row["template_type"],
+                        party_a=row["party_a"],
+                        party_b=row["party_b"],
+                        jurisdiction=row["jurisdiction"],
+                        additional_clauses=row.get("additional_clauses")
+                    )
+                content = result["content"]
+            filename = f"{index + 1:04d}_{_slug(row['template_type'])}_{_slug(row['party_a'])}_{_slug(row['party_b'])}.txt"
+            with open(os.path.join(self._job_dir(job_id), "docs", filename), "w") as f:
+                f.write(content)
+            self._append_checkpoint(job_id, {"row": index, "status": "done", "file": filename})
+        except Exception as e:
+            logger.warning("Batch job %s row %d failed: %s", job_id, index, e)
+            self._append_checkpoint(job_id, {"row": index, "status": "failed", "error": str(e)})
+
+    async def _run(self, job_id: str):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        meta = self._read_meta(job_id)
+        meta.update(status="running", started_at=meta.get("started_at") or datetime.now().isoformat())
+        self._write_meta(job_id, meta)
+
+        done = {i for i, entry in self._read_checkpoint(job_id).items() if entry["status"] == "done"}
+        locks: Dict[str, asyncio.Lock] = {}
+        await asyncio.gather(*(
+            self._draft_row(job_id, i, row, locks)
+            for i, row in enumerate(self._read_rows(job_id))
+            if i not in done
+        ))
+
+        meta = self._read_meta(job_id)
+        meta.update(status="completed", finished_at=datetime.now().isoformat())
+        self._write_meta(job_id, meta)
+
+    def status(self, job_id: str) -> Dict:
+        meta = self._read_meta(job_id)
+        entries = self._read_checkpoint(job_id).values()
+        completed = sum(1 for e in entries if e["status"] == "done")
+        failed = [{"row": e["row"] + 1, "error": e["error"]} for e in entries if e["status"] == "failed"]
+        docs_per_minute = None
+        if meta.get("started_at") and completed:
+            end = datetime.fromisoformat(meta["finished_at"]) if meta.get("finished_at") else datetime.now()
+            minutes = max((end - datetime.fromisoformat(meta["started_at"])).total_seconds() / 60, 1 / 60)
+            docs_per_minute = round(completed / minutes, 1)
+        return {**meta, "completed": completed, "failed": failed, "docs_per_minute": docs_per_minute}
+
+    def iter_archive(self, job_id: str) -> Iterator[bytes]:
+        """Stream a zip of the documents generated so far, one file at a time."""
+        job_dir = self._job_dir(job_id)
+        status = self.status(job_id)
+        entries = sorted(self._read_checkpoint(job_id).values(), key=lambda e: e["row"])
+
+        stream = _ZipStream()
+        with zipfile.ZipFile(stream, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for entry in entries:
+                if entry["status"] != "done":
+                    continue
+                with open(os.path.join(job_dir, "docs", entry["file"]), "rb") as src, archive.open(entry["file"], "w") as dest:
+                    while chunk := src.read(64 * 1024):
+                        dest.write(chunk)
+                yield stream.pop()
+            archive.writestr("manifest.json", json.dumps(status, indent=2))
+        yield stream.pop()
+
+batch_drafting_service = BatchDraftingService()
@@ -0,0 +1,74 @@
+from typing import List
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:  # tiktoken missing or its BPE file could not be fetched
+    _encoding = None
+
+# Rough average for English legal prose when no tokenizer is available
+CHARS_PER_TOKEN = 4
+
+
+def count_tokens(text: str) -> int:
+    """Count (or estimate) the number of model tokens in text."""
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def _hard_split(text: str, max_tokens: int) -> List[str]:
+    """Split a single oversized block on token boundaries."""
+    if _encoding is not None:
+        tokens = _encoding.encode(text)
+        return [_encoding.decode(tokens[i:i + max_tokens]) for i in range(0, len(tokens), max_tokens)]
+    step = max_tokens * CHARS_PER_TOKEN
+    return [text[i:i + step] for i in range(0, len(text), step)]
+
+
+def _tail(text: str, n_tokens: int) -> str:
+    """Return roughly the last n_tokens tokens of text."""
+    if n_tokens <= 0:
+        return ""
+    if _encoding is not None:
+        return _encoding.decode(_encoding.encode(text)[-n_tokens:])
+    return text[-n_tokens * CHARS_PER_TOKEN:]
+
+
+def split_by_tokens(text: str, max_tokens: int, overlap: int = 0) -> List[str]:
+    """
+    Split text into chunks of at most max_tokens tokens.
+    Paragraph boundaries are preferred so clauses are not cut in half;
+    the last `overlap` tokens of each chunk are repeated at the start of the next.
+    """
+    if count_tokens(text) <= max_tokens:
+        return [text]
+
+    overlap = min(overlap, max_tokens // 2)
+    blocks: List[str] = []
+    for paragraph in text.split("\n\n"):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if count_tokens(paragraph) > max_tokens - overlap:
+            blocks.extend(_hard_split(paragraph, max_tokens - overlap))
+        else:
+            blocks.append(paragraph)
+
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for block in blocks:
+        block_tokens = count_tokens(block)
+        if current and current_tokens + block_tokens > max_tokens:
+            chunks.append("\n\n".join(current))
+            tail = _tail(chunks[-1], overlap)
+            current = [tail] if tail else []
+            current_tokens = count_tokens(tail)
+        current.append(block)
+        current_tokens += block_tokens
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
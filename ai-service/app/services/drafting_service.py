@@ -1,23 +1,63 @@
 from datetime import datetime
 from typing import List, Dict, Optional
-from openai import OpenAI
+from app.services.chunking import count_tokens, split_by_tokens
+from app.services.llm_provider import Completion
+from app.services.model_router import model_router
+from app.services.resilience import ENDPOINT_DEADLINES, ResponseCache, UpstreamError, deadline
+import asyncio
 import os
 
+ANALYSIS_SYSTEM_PROMPT = """You are a senior legal analyst for 'Oscar Legal Practitioners'.
+Provide a detailed legal analysis including potential risks, applicable laws (where known), and strategic recommendations.
+Structure your response into:
+1. Situation Overview
+2. Legal Issues Identified
+3. Applicable Principles
+4. Risk Assessment
+5. Strategic Advice"""
+
+MAP_SYSTEM_PROMPT = """You are a senior legal analyst for 'Oscar Legal Practitioners'.
+You are reviewing ONE EXCERPT of a longer document in relation to a legal issue.
+List only the findings from this excerpt that matter for the issue: relevant facts, clauses (quote clause numbers),
+obligations, deadlines, liabilities and red flags. Be concise. If nothing in the excerpt is relevant, reply "No relevant findings." """
+
+COLLAPSE_SYSTEM_PROMPT = """You are a senior legal analyst for 'Oscar Legal Practitioners'.
+Merge the findings below into a single concise list. Remove duplicates, keep clause references and keep every red flag."""
+
+
+def _empty_usage() -> Dict[str, int]:
+    return {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+
+
+def _add_usage(totals: Dict[str, int], completion: Completion) -> None:
+    totals["calls"] += 1
+    for key in ("prompt_tokens", "completion_tokens", "total_tokens"):
+        totals[key] += completion.usage.get(key, 0)
+
+
 class DraftingService:
     def __init__(self):
-        self.api_key = os.getenv("OPENAI_API_KEY")
-        self.client = OpenAI(api_key=self.api_key)
+        self.router = model_router
+        self.cache = ResponseCache()
+        # Long-context analysis (map-reduce) settings
+        self.chunk_tokens = int(os.getenv("ANALYSIS_CHUNK_TOKENS", "6000"))
+        self.chunk_overlap = int(os.getenv("ANALYSIS_CHUNK_OVERLAP", "200"))
+        self.max_concurrency = int(os.getenv("ANALYSIS_MAX_CONCURRENCY", "8"))
+        self.map_max_tokens = int(os.getenv("ANALYSIS_MAP_MAX_TOKENS", "600"))
+        self.reduce_input_tokens = int(os.getenv("ANALYSIS_REDUCE_INPUT_TOKENS", "12000"))
 
     async def generate_document(
-        self, 
-        template_type: str, 
-        party_a: str, 
-        party_b: str, 
+        self,
+        template_type: str,
+        party_a: str,
+        party_b: str,
         jurisdiction: str,
-        additional_clauses: List[str] = None
+        additional_clauses: List[str] = None,
+        user_tier: Optional[str] = None,
+        latency_slo_ms: Optional[int] = None
     ) -> Dict:
         """Generate a legal document based on template and details."""
-        
+
         system_prompt = f"""You are a senior legal drafting expert specializing in {jurisdiction} law.
 Your task is to draft a high-quality, professional, and legally robust {template_type}.
 Use precise legal terminology and ensure proper formatting.
@@ -35,54 +75,135 @@ Please include:
 5. Dispute Resolution
 6. Execution block"""
 
+        cache_key = ResponseCache.key("draft", template_type, party_a, party_b, jurisdiction, additional_clauses)
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4-turbo-preview",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.2,
-                max_tokens=3000
-            )
-
-            content = response.choices[0].message.content
-            
-            return {
-                "document_type": template_type,
-                "content": content,
-                "jurisdiction": jurisdiction,
-                "generated_at": datetime.now().isoformat()
-            }
-        except Exception as e:
-            return {"error": str(e)}
-
-    async def analyze_legal_issue(self, issue: str, context: Optional[str] = None) -> Dict:
-        """Perform deep legal analysis of a situation or case."""
-        
-        system_prompt = """You are a senior legal analyst for 'Oscar Legal Practitioners'.
-Provide a detailed legal analysis including potential risks, applicable laws (where known), and strategic recommendations.
-Structure your response into:
-1. Situation Overview
-2. Legal Issues Identified
-3. Applicable Principles
-4. Risk Assessment
-5. Strategic Advice"""
+            async with deadline(ENDPOINT_DEADLINES["draft"]):
+                completion = await self.router.complete(
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    task="draft",
+                    template_type=template_type,
+                    user_tier=user_tier,
+                    latency_slo_ms=latency_slo_ms,
+                    temperature=0.2,
+                    max_tokens=3000
+                )
+        except UpstreamError:
+            cached = self.cache.get(cache_key)
+            if cached is None:
+                raise
+            return {**cached, "degraded": True, "cached": True}
+
+        result = {
+            "document_type": template_type,
+            "content": completion.content,
+            "jurisdiction": jurisdiction,
+            "model": completion.model,
+            "generated_at": datetime.now().isoformat()
+        }
+        self.cache.set(cache_key, result)
+        return result
+
+    async def _complete(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        max_tokens: int,
+        usage: Dict[str, int],
+        task: str = "analyze",
+        **routing
+    ) -> Completion:
+        completion = await self.router.complete(
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            task=task,
+            temperature=0.3,
+            max_tokens=max_tokens,
+            **routing
+        )
+        _add_usage(usage, completion)
+        return completion
+
+    async def _map_chunks(self, issue: str, chunks: List[str], usage: Dict[str, int]) -> List[str]:
+        """Extract issue-relevant findings from every chunk, at most max_concurrency at a time."""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
 
-        user_prompt = f"ISSUE: {issue}\n\nCONTEXT: {context if context else 'No additional context provided.'}"
+        async def analyze_chunk(index: int, chunk: str) -> str:
+            async with semaphore:
+                user_prompt = f"ISSUE: {issue}\n\nEXCERPT {index + 1} OF {len(chunks)}:\n{chunk}"
+                findings = await self._complete(MAP_SYSTEM_PROMPT, user_prompt, self.map_max_tokens, usage, task="analyze_map")
+                return f"[Excerpt {index + 1}]\n{findings.content}"
+
+        return await asyncio.gather(*(analyze_chunk(i, c) for i, c in enumerate(chunks)))
+
+    async def _collapse(self, issue: str, findings: List[str], usage: Dict[str, int]) -> List[str]:
+        """Merge partial findings until they fit in a single reduce prompt."""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def merge(group: str) -> str:
+            async with semaphore:
+                user_prompt = f"ISSUE: {issue}\n\nFINDINGS:\n{group}"
+                merged = await self._complete(COLLAPSE_SYSTEM_PROMPT, user_prompt, self.map_max_tokens, usage, task="analyze_collapse")
+                return merged.content
+
+        while count_tokens("\n\n".join(findings)) > self.reduce_input_tokens and len(findings) > 1:
+            groups = split_by_tokens("\n\n".join(findings), self.reduce_input_tokens)
+            findings = await asyncio.gather(*(merge(g) for g in groups))
+        return findings
+
+    async def analyze_legal_issue(
+        self,
+        issue: str,
+        context: Optional[str] = None,
+        user_tier: Optional[str] = None,
+        latency_slo_ms: Optional[int] = None
+    ) -> Dict:
+        """
+        Perform deep legal analysis of a situation or case.
+        Contexts longer than chunk_tokens are analyzed map-reduce style: chunks are
+        analyzed concurrently and the partial findings are reduced into the final structure.
+        """
+        usage = {"map": _empty_usage(), "collapse": _empty_usage(), "reduce": _empty_usage()}
+        routing = {"user_tier": user_tier, "latency_slo_ms": latency_slo_ms}
+        context_tokens = count_tokens(context) if context else 0
+        cache_key = ResponseCache.key("analyze", issue, context)
 
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4-turbo-preview",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.3,
-                max_tokens=2000
-            )
-            return {"analysis": response.choices[0].message.content}
-        except Exception as e:
-            return {"error": str(e)}
+            async with deadline(ENDPOINT_DEADLINES["analyze"]):
+                if context_tokens <= self.chunk_tokens:
+                    user_prompt = f"ISSUE: {issue}\n\nCONTEXT: {context if context else 'No additional context provided.'}"
+                    analysis = await self._complete(ANALYSIS_SYSTEM_PROMPT, user_prompt, 2000, usage["reduce"], **routing)
+                    chunk_count = 1
+                else:
+                    chunks = split_by_tokens(context, self.chunk_tokens, overlap=self.chunk_overlap)
+                    findings = await self._map_chunks(issue, chunks, usage["map"])
+                    findings = await self._collapse(issue, findings, usage["collapse"])
+
+                    user_prompt = (
+                        f"ISSUE: {issue}\n\n"
+                        f"CONTEXT: The supporting document was too long to include in full ({len(chunks)} excerpts). "
+                        f"Below are the findings extracted from each excerpt.\n\n" + "\n\n".join(findings)
+                    )
+                    analysis = await self._complete(ANALYSIS_SYSTEM_PROMPT, user_prompt, 2000, usage["reduce"], **routing)
+                    chunk_count = len(chunks)
+        except UpstreamError:
+            cached = self.cache.get(cache_key)
+            if cached is None:
+                raise
+            return {**cached, "degraded": True, "cached": True}
+
+        result = {
+            "analysis": analysis.content,
+            "model": analysis.model,
+            "chunks": chunk_count,
+            "context_tokens": context_tokens,
+            "usage": usage
+        }
+        self.cache.set(cache_key, result)
+        return result
 
 drafting_service = DraftingService()
@@ -0,0 +1,197 @@
+from dataclasses import dataclass, field
+from typing import List, Dict, Optional
+from app.services.chunking import count_tokens
+import asyncio
+import hashlib
+import os
+import random
+import time
+
+
+class ProviderError(Exception):
+    """A provider call failed. `retriable` marks transient failures (rate limits, timeouts, 5xx)."""
+
+    def __init__(self, message: str, retriable: bool, status_code: int = 502, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retriable = retriable
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+@dataclass
+class Completion:
+    content: str
+    model: str
+    usage: Dict[str, int] = field(default_factory=dict)
+    latency: float = 0.0
+
+
+class OpenAIProvider:
+    """Chat completions through the OpenAI API."""
+
+    name = "openai"
+
+    def __init__(self, api_key: Optional[str] = None):
+        from openai import AsyncOpenAI
+        # Retries are handled by the resilience layer, not by the SDK
+        self.client = AsyncOpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY"), max_retries=0)
+
+    @staticmethod
+    def _translate(error: Exception) -> ProviderError:
+        import openai
+        if isinstance(error, openai.RateLimitError):
+            retry_after = error.response.headers.get("retry-after") if error.response is not None else None
+            return ProviderError(str(error), retriable=True, status_code=429,
+                                 retry_after=float(retry_after) if retry_after else None)
+        if isinstance(error, openai.APITimeoutError):
+            return ProviderError(str(error), retriable=True, status_code=504)
+        if isinstance(error, openai.APIConnectionError):
+            return ProviderError(str(error), retriable=True)
+        if isinstance(error, openai.APIStatusError):
+            return ProviderError(str(error), retriable=error.status_code >= 500 or error.status_code == 408)
+        return ProviderError(str(error), retriable=False)
+
+    async def complete(
+        self,
+        model: str,
+        messages: List[Dict],
+        temperature: float = 0.2,
+        max_tokens: int = 1000,
+        timeout: Optional[float] = None
+    ) -> Completion:
+        import openai
+        started = time.perf_counter()
+        options = {"timeout": timeout} if timeout is not None else {}
+        try:
+            response = await self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                **options
+            )
+        except openai.OpenAIError as e:
+            raise self._translate(e) from e
+        usage = response.usage
+        return Completion(
+            content=response.choices[0].message.content,
+            model=model,
+            usage={
+                "prompt_tokens": usage.prompt_tokens if usage else 0,
+                "completion_tokens": usage.completion_tokens if usage else 0,
+                "total_tokens": usage.total_tokens if usage else 0,
+            },
+            latency=time.perf_counter() - started
+        )
+
+
+class OfflineProvider:
+    """
+    Deterministic stand-in for local development and tests.
+    No network access; each model answers after a configurable simulated latency.
+    """
+
+    name = "offline"
+
+    def __init__(self, latencies: Optional[Dict[str, float]] = None, default_latency: float = 0.05):
+        self.latencies = latencies or {}
+        self.default_latency = default_latency
+        self.calls: List[Dict] = []
+
+    async def complete(
+        self,
+        model: str,
+        messages: List[Dict],
+        temperature: float = 0.2,
+        max_tokens: int = 1000,
+        timeout: Optional[float] = None
+    ) -> Completion:
+        started = time.perf_counter()
+        self.calls.append({"model": model, "messages": messages})
+        await asyncio.sleep(self.latencies.get(model, self.default_latency))
+
+        prompt = messages[-1]["content"] if messages else ""
+        digest = hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:8]
+        content = f"[offline:{model}:{digest}] {prompt[:200]}"
+        prompt_tokens = sum(count_tokens(m.get("content", "")) for m in messages)
+        completion_tokens = count_tokens(content)
+        return Completion(
+            content=content,
+            model=model,
+            usage={
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+            latency=time.perf_counter() - started
+        )
+
+
+class FaultInjectingProvider:
+    """
+    Wraps another provider (the offline one by default) and injects failures and
+    latency, so retries, deadlines and the circuit breaker can be exercised locally.
+    """
+
+    name = "faulty"
+
+    def __init__(
+        self,
+        inner=None,
+        failure_rate: float = 0.0,
+        extra_latency: float = 0.0,
+        status_codes: Optional[List[int]] = None,
+        seed: Optional[int] = None
+    ):
+        self.inner = inner or OfflineProvider()
+        self.failure_rate = failure_rate
+        self.extra_latency = extra_latency
+        self.status_codes = status_codes or [429, 500, 503, 504]
+        self.random = random.Random(seed)
+        self.scripted: List[Optional[int]] = []
+
+    def script(self, *outcomes: Optional[int]):
+        """Queue exact outcomes for the next calls: a status code to fail with, or None to succeed."""
+        self.scripted.extend(outcomes)
+
+    async def complete(self, model: str, messages: List[Dict], timeout: Optional[float] = None, **kwargs) -> Completion:
+        if self.extra_latency:
+            if timeout is not None and self.extra_latency >= timeout:
+                await asyncio.sleep(max(timeout, 0))
+                raise ProviderError("Injected timeout", retriable=True, status_code=504)
+            await asyncio.sleep(self.extra_latency)
+
+        if self.scripted:
+            status_code = self.scripted.pop(0)
+        elif self.random.random() < self.failure_rate:
+            status_code = self.random.choice(self.status_codes)
+        else:
+            status_code = None
+        if status_code is not None:
+            raise ProviderError(
+                f"Injected upstream error {status_code}",
+                retriable=status_code in (408, 429) or status_code >= 500,
+                status_code=status_code,
+                retry_after=1.0 if status_code == 429 else None
+            )
+        return await self.inner.complete(model=model, messages=messages, timeout=timeout, **kwargs)
+
+
+# Singleton instance
+provider = None
+
+def get_provider():
+    """Return the configured provider; LLM_PROVIDER=offline|faulty selects a local stand-in."""
+    global provider
+    if provider is None:
+        name = os.getenv("LLM_PROVIDER", "openai")
+        if name == "offline":
+            provider = OfflineProvider()
+        elif name == "faulty":
+            provider = FaultInjectingProvider(
+                failure_rate=float(os.getenv("LLM_FAULT_RATE", "0.3")),
+                extra_latency=float(os.getenv("LLM_FAULT_LATENCY", "0"))
+            )
+        else:
+            provider = OpenAIProvider()
+    return provider
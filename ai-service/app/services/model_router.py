@@ -0,0 +1,243 @@
+from collections import deque
+from dataclasses import dataclass, field
+from typing import List, Dict, Optional
+from app.services.chunking import count_tokens
+from app.services.llm_provider import Completion, get_provider
+from app.services.resilience import CircuitBreaker, RetryPolicy, call_with_resilience
+import asyncio
+import json
+import os
+import time
+
+FAST_MODEL = os.getenv("LLM_FAST_MODEL", "gpt-3.5-turbo")
+STRONG_MODEL = os.getenv("LLM_STRONG_MODEL", "gpt-4-turbo-preview")
+
+# Used when MODEL_ROUTING_CONFIG does not point at a JSON file with the same shape
+DEFAULT_ROUTING_CONFIG = {
+    "default_model": STRONG_MODEL,
+    "fast_model": FAST_MODEL,
+    "hedge_after_seconds": None,
+    "models": {
+        FAST_MODEL: {"cost_per_1k_tokens": 0.0015},
+        STRONG_MODEL: {"cost_per_1k_tokens": 0.03},
+    },
+    "rules": [
+        {"name": "analysis-excerpts", "task": ["analyze_map", "analyze_collapse"], "model": FAST_MODEL},
+        {"name": "short-research", "task": "research", "max_prompt_tokens": 3000, "model": FAST_MODEL},
+        {"name": "free-tier", "user_tiers": ["free", "client", "student"], "task": ["research", "analyze"], "model": FAST_MODEL},
+        {"name": "drafting", "task": "draft", "model": STRONG_MODEL},
+    ],
+}
+
+
+@dataclass
+class RoutingRule:
+    """First matching rule wins; every condition that is set must hold."""
+    model: str
+    name: str = ""
+    task: List[str] = field(default_factory=list)
+    template_types: List[str] = field(default_factory=list)
+    user_tiers: List[str] = field(default_factory=list)
+    min_prompt_tokens: Optional[int] = None
+    max_prompt_tokens: Optional[int] = None
+    latency_slo_below_ms: Optional[int] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "RoutingRule":
+        data = dict(data)
+        for key in ("task", "template_types", "user_tiers"):
+            value = data.get(key) or []
+            data[key] = [value] if isinstance(value, str) else list(value)
+        return cls(**data)
+
+    def matches(
+        self,
+        task: str,
+        prompt_tokens: int,
+        template_type: Optional[str],
+        user_tier: Optional[str],
+        latency_slo_ms: Optional[int]
+    ) -> bool:
+        if self.task and task not in self.task:
+            return False
+        if self.template_types and (template_type or "").lower() not in [t.lower() for t in self.template_types]:
+            return False
+        if self.user_tiers and user_tier not in self.user_tiers:
+            return False
+        if self.min_prompt_tokens is not None and prompt_tokens < self.min_prompt_tokens:
+            return False
+        if self.max_prompt_tokens is not None and prompt_tokens > self.max_prompt_tokens:
+            return False
+        if self.latency_slo_below_ms is not None and (latency_slo_ms is None or latency_slo_ms > self.latency_slo_below_ms):
+            return False
+        return True
+
+
+@dataclass
+class RouteDecision:
+    model: str
+    reason: str
+    hedge_model: Optional[str] = None
+    hedge_after: Optional[float] = None
+
+
+class LatencyTracker:
+    """Rolling window of observed completion latencies (seconds) per model."""
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self.samples: Dict[str, deque] = {}
+
+    def record(self, model: str, latency: float):
+        self.samples.setdefault(model, deque(maxlen=self.window)).append(latency)
+
+    def percentile(self, model: str, q: float, min_samples: int = 5) -> Optional[float]:
+        samples = self.samples.get(model)
+        if not samples or len(samples) < min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class ModelRouter:
+    def __init__(self, config: Optional[Dict] = None, provider=None):
+        if config is None:
+            config = self._load_config()
+        self.default_model = config.get("default_model", STRONG_MODEL)
+        self.fast_model = config.get("fast_model", FAST_MODEL)
+        self.hedge_after_seconds = config.get("hedge_after_seconds")
+        self.models = config.get("models", {})
+        self.rules = [RoutingRule.from_dict(r) for r in config.get("rules", [])]
+        self.latency = LatencyTracker()
+        self.usage: Dict[str, Dict[str, float]] = {}
+        self._provider = provider
+        self.retry_policy = RetryPolicy(max_attempts=int(os.getenv("LLM_MAX_ATTEMPTS", "3")))
+        self.breakers: Dict[str, CircuitBreaker] = {}
+
+    def breaker(self, model: str) -> CircuitBreaker:
+        if model not in self.breakers:
+            self.breakers[model] = CircuitBreaker(
+                failure_threshold=int(os.getenv("LLM_BREAKER_THRESHOLD", "5")),
+                reset_timeout=float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+            )
+        return self.breakers[model]
+
+    @staticmethod
+    def _load_config() -> Dict:
+        path = os.getenv("MODEL_ROUTING_CONFIG")
+        if path and os.path.exists(path):
+            with open(path) as f:
+                return json.load(f)
+        return DEFAULT_ROUTING_CONFIG
+
+    @property
+    def provider(self):
+        if self._provider is None:
+            self._provider = get_provider()
+        return self._provider
+
+    def route(
+        self,
+        task: str,
+        prompt_tokens: int,
+        template_type: Optional[str] = None,
+        user_tier: Optional[str] = None,
+        latency_slo_ms: Optional[int] = None
+    ) -> RouteDecision:
+        """Pick a model for a request and decide whether (and when) to hedge it."""
+        model, reason = self.default_model, "default"
+        for rule in self.rules:
+            if rule.matches(task, prompt_tokens, template_type, user_tier, latency_slo_ms):
+                model, reason = rule.model, f"rule:{rule.name or rule.model}"
+                break
+
+        hedge_after = self.hedge_after_seconds
+        if latency_slo_ms is not None and model != self.fast_model:
+            slo = latency_slo_ms / 1000
+            p95 = self.latency.percentile(model, 0.95)
+            if p95 is not None and p95 > slo:
+                fast_p95 = self.latency.percentile(self.fast_model, 0.95)
+                if fast_p95 is None or fast_p95 < p95:
+                    return RouteDecision(model=self.fast_model, reason=f"slo:{model} p95 {p95:.2f}s > {slo:.2f}s")
+            # Leave the fast model enough of the SLO to still answer in time
+            hedge_after = slo / 2 if hedge_after is None else min(hedge_after, slo / 2)
+
+        if hedge_after is not None and model != self.fast_model:
+            return RouteDecision(model=model, reason=reason, hedge_model=self.fast_model, hedge_after=hedge_after)
+        return RouteDecision(model=model, reason=reason)
+
+    def _record_usage(self, completion: Completion):
+        stats = self.usage.setdefault(completion.model, {"calls": 0, "total_tokens": 0, "estimated_cost": 0.0})
+        tokens = completion.usage.get("total_tokens", 0)
+        stats["calls"] += 1
+        stats["total_tokens"] += tokens
+        stats["estimated_cost"] += tokens / 1000 * self.models.get(completion.model, {}).get("cost_per_1k_tokens", 0.0)
+
+    async def _call(self, model: str, messages: List[Dict], **kwargs) -> Completion:
+        started = time.perf_counter()
+
+        async def attempt(timeout: Optional[float]) -> Completion:
+            return await self.provider.complete(model=model, messages=messages, timeout=timeout, **kwargs)
+
+        try:
+            completion = await call_with_resilience(attempt, self.breaker(model), self.retry_policy)
+        except asyncio.CancelledError:
+            # A hedged-away call was at least this slow; keep it in the window
+            self.latency.record(model, time.perf_counter() - started)
+            raise
+        self.latency.record(model, time.perf_counter() - started)
+        self._record_usage(completion)
+        return completion
+
+    async def _hedged(self, decision: RouteDecision, messages: List[Dict], **kwargs) -> Completion:
+        """Run on the chosen model; if it has not answered after hedge_after, race it against the hedge model."""
+        primary = asyncio.create_task(self._call(decision.model, messages, **kwargs))
+        pending = {primary}
+        try:
+            try:
+                return await asyncio.wait_for(asyncio.shield(primary), decision.hedge_after)
+            except asyncio.TimeoutError:
+                pass
+
+            pending.add(asyncio.create_task(self._call(decision.hedge_model, messages, **kwargs)))
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def complete(
+        self,
+        messages: List[Dict],
+        task: str,
+        template_type: Optional[str] = None,
+        user_tier: Optional[str] = None,
+        latency_slo_ms: Optional[int] = None,
+        **kwargs
+    ) -> Completion:
+        """Route and run a chat completion. Extra kwargs go to the provider."""
+        prompt_tokens = sum(count_tokens(m.get("content", "")) for m in messages)
+        decision = self.route(task, prompt_tokens, template_type, user_tier, latency_slo_ms)
+        if decision.hedge_after is not None:
+            return await self._hedged(decision, messages, **kwargs)
+        return await self._call(decision.model, messages, **kwargs)
+
+    def stats(self) -> Dict:
+        return {
+            model: {
+                "p50_seconds": self.latency.percentile(model, 0.5, min_samples=1),
+                "p95_seconds": self.latency.percentile(model, 0.95, min_samples=1),
+                "samples": len(samples),
+                "circuit": self.breaker(model).state,
+                **self.usage.get(model, {}),
+            }
+            for model, samples in self.latency.samples.items()
+        }
+
+model_router = ModelRouter()
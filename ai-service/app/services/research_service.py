@@ -1,24 +1,28 @@
-from openai import OpenAI
-import os
 from typing import List, Dict, Optional
+from app.services.model_router import model_router
+from app.services.resilience import ENDPOINT_DEADLINES, ResponseCache, UpstreamError, deadline
 from app.services.vector_store import get_vector_store
 
 class ResearchService:
     def __init__(self):
-        self.api_key = os.getenv("OPENAI_API_KEY")
-        self.client = OpenAI(api_key=self.api_key)
+        self.router = model_router
         self.vector_store = get_vector_store()
+        self.cache = ResponseCache()
 
     async def perform_research(
         self, 
         query: str, 
         jurisdiction: Optional[str] = None,
-        top_k: int = 5
+        top_k: int = 5,
+        user_tier: Optional[str] = None,
+        latency_slo_ms: Optional[int] = None
     ) -> Dict:
         """
         Perform legal research using RAG.
         1. Retrieve relevant documents from vector store.
         2. Generate response using OpenAI.
+        While the model is unavailable, the last cached answer (or the retrieved
+        sources alone) is returned with "degraded": true.
         """
         # 1. Retrieval
         where_filter = {"jurisdiction": jurisdiction} if jurisdiction else None
@@ -50,29 +54,41 @@ WARNING: This is for academic purposes only. Does not constitute real legal advi
 
         user_prompt = f"CONTEXT:\n{context}\n\nRESEARCH QUESTION: {query}"
 
+        cache_key = ResponseCache.key(query, jurisdiction, top_k)
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4-turbo-preview",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.1,
-                max_tokens=1500
-            )
-
-            answer = response.choices[0].message.content
-            
+            async with deadline(ENDPOINT_DEADLINES["research"]):
+                completion = await self.router.complete(
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    task="research",
+                    user_tier=user_tier,
+                    latency_slo_ms=latency_slo_ms,
+                    temperature=0.1,
+                    max_tokens=1500
+                )
+        except UpstreamError:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return {**cached, "degraded": True, "cached": True}
+            if not documents:
+                raise
             return {
-                "answer": answer,
+                "answer": "AI generation is temporarily unavailable. The most relevant sources from the internal database are listed below.",
                 "sources": metadatas,
-                "query": query
-            }
-        except Exception as e:
-            return {
-                "error": str(e),
-                "answer": "Failed to generate research results due to an error.",
-                "query": query
+                "documents": documents,
+                "query": query,
+                "degraded": True
             }
 
+        result = {
+            "answer": completion.content,
+            "sources": metadatas,
+            "query": query,
+            "model": completion.model
+        }
+        self.cache.set(cache_key, result)
+        return result
+
 research_service = ResearchService()
@@ -0,0 +1,206 @@
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from app.services.llm_provider import ProviderError
+import asyncio
+import hashlib
+import json
+import os
+import random
+import time
+
+# Absolute (monotonic) deadline of the request currently being served
+_deadline: ContextVar[Optional[float]] = ContextVar("llm_deadline", default=None)
+
+ENDPOINT_DEADLINES = {
+    "research": float(os.getenv("RESEARCH_DEADLINE_SECONDS", "30")),
+    "draft": float(os.getenv("DRAFT_DEADLINE_SECONDS", "90")),
+    "analyze": float(os.getenv("ANALYZE_DEADLINE_SECONDS", "120")),
+}
+
+
+class UpstreamError(Exception):
+    """An LLM call failed in a way the API should report with a proper status code."""
+    status_code = 502
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class UpstreamTimeout(UpstreamError):
+    status_code = 504
+
+
+class UpstreamUnavailable(UpstreamError):
+    """Upstream is unhealthy (circuit open or still rate limited after retries)."""
+    status_code = 503
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current request's deadline, or None if there is none."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+@asynccontextmanager
+async def deadline(seconds: float):
+    """Bound everything inside the block (retries and backoff included) to `seconds`."""
+    absolute = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None:
+        absolute = min(absolute, current)
+    token = _deadline.set(absolute)
+    try:
+        async with asyncio.timeout(max(0.0, absolute - time.monotonic())):
+            yield
+    except TimeoutError:
+        raise UpstreamTimeout(f"Deadline of {seconds:g}s exceeded")
+    finally:
+        _deadline.reset(token)
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive upstream failures, rejects calls
+    for `reset_timeout` seconds, then lets a single probe through (half-open).
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def retry_after(self) -> float:
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self.probe_in_flight:
+            self.probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.probe_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.probe_in_flight or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self.probe_in_flight = False
+
+
+class RetryPolicy:
+    """Capped exponential backoff with full jitter."""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 8.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if retry_after:
+            delay = max(delay, retry_after)
+        return delay
+
+
+async def call_with_resilience(
+    call: Callable[[Optional[float]], Awaitable[Any]],
+    breaker: CircuitBreaker,
+    policy: RetryPolicy
+) -> Any:
+    """
+    Run call(timeout) with retries on retriable errors only, never past the request
+    deadline, and fail fast while the circuit breaker is open.
+    """
+    last_error: Optional[ProviderError] = None
+    for attempt in range(policy.max_attempts):
+        if not breaker.allow():
+            raise UpstreamUnavailable("AI provider is temporarily unavailable", retry_after=breaker.retry_after())
+
+        timeout = remaining()
+        if timeout is not None and timeout <= 0:
+            break
+        try:
+            result = await call(timeout)
+        except ProviderError as e:
+            if e.retriable:
+                breaker.record_failure()
+            else:
+                # The request itself was rejected; upstream is healthy
+                breaker.record_success()
+                raise UpstreamError(str(e))
+            last_error = e
+        except asyncio.CancelledError:
+            breaker.probe_in_flight = False
+            raise
+        except Exception:
+            # Anything else counts as a failure too, so a half-open probe is never left in flight
+            breaker.record_failure()
+            raise
+        else:
+            breaker.record_success()
+            return result
+
+        delay = policy.backoff(attempt, last_error.retry_after)
+        timeout = remaining()
+        if attempt + 1 >= policy.max_attempts or (timeout is not None and delay >= timeout):
+            break
+        await asyncio.sleep(delay)
+
+    if last_error is None or last_error.status_code == 504:
+        raise UpstreamTimeout(str(last_error) if last_error else "Deadline exceeded")
+    raise UpstreamUnavailable(str(last_error), retry_after=last_error.retry_after)
+
+
+class ResponseCache:
+    """Small LRU of recent successful responses, served only while upstream is failing."""
+
+    def __init__(self, max_entries: int = 512, ttl: float = 24 * 3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+
+    @staticmethod
+    def key(*parts: Any) -> str:
+        return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if time.monotonic() - stored_at > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Dict):
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
@@ -27,6 +27,17 @@ target_metadata = Base.metadata
 # my_important_option = config.get_main_option("my_important_option")
 # ... etc.
 
+PARTITIONED_PREFIXES = ("activity_log_", "cases_archive_", "tasks_archive_")
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    # Partitions (activity_log by month, the archives by year) are created at runtime,
+    # not declared as models
+    if type_ == "table" and reflected and compare_to is None and name.startswith(PARTITIONED_PREFIXES):
+        return False
+    return True
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -43,6 +54,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -68,7 +80,7 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata, include_object=include_object
         )
 
         with context.begin_transaction():
@@ -0,0 +1,54 @@
+"""Add the partitioned activity_log table
+
+Revision ID: a5c3e8f1d640
+Revises: f2b7c4d9a183
+Create Date: 2026-10-19 17:05:12.538904
+
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'a5c3e8f1d640'
+down_revision = 'f2b7c4d9a183'
+branch_labels = None
+depends_on = None
+
+# Monthly partitions created up front; the running app keeps creating them ahead
+INITIAL_MONTHS = 3
+
+
+def upgrade():
+    op.create_table(
+        'activity_log',
+        sa.Column('id', sa.BigInteger(), sa.Identity(), nullable=False),
+        sa.Column('occurred_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('action', sa.String(length=32), nullable=False),
+        sa.Column('entity_type', sa.String(length=16), nullable=True),
+        sa.Column('entity_id', sa.Integer(), nullable=True),
+        sa.Column('details', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.PrimaryKeyConstraint('id', 'occurred_at'),
+        postgresql_partition_by='RANGE (occurred_at)',
+    )
+    # Indexes on the parent are created on every partition
+    op.create_index('ix_activity_log_entity', 'activity_log', ['entity_type', 'entity_id', sa.text('occurred_at DESC')])
+    op.create_index('ix_activity_log_user_id', 'activity_log', ['user_id', sa.text('occurred_at DESC')])
+
+    year, month = date.today().year, date.today().month
+    for _ in range(INITIAL_MONTHS):
+        next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+        op.execute(
+            f"CREATE TABLE activity_log_{year:04d}_{month:02d} PARTITION OF activity_log "
+            f"FOR VALUES FROM ('{year:04d}-{month:02d}-01') TO ('{next_year:04d}-{next_month:02d}-01')"
+        )
+        year, month = next_year, next_month
+
+
+def downgrade():
+    # Dropping the parent drops every partition
+    op.drop_table('activity_log')
@@ -0,0 +1,40 @@
+"""Add indexes for list queries and foreign-key joins
+
+Revision ID: b3d1e0a4c2f7
+Revises: 6cfc59777216
+Create Date: 2026-10-19 10:12:04.118233
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3d1e0a4c2f7'
+down_revision = '6cfc59777216'
+branch_labels = None
+depends_on = None
+
+# (name, table, columns) -- list indexes match paginate()'s ORDER BY created_at DESC, id DESC
+INDEXES = [
+    ('ix_clients_lawyer_id_created_at', 'clients', ['lawyer_id', sa.text('created_at DESC'), sa.text('id DESC')]),
+    ('ix_cases_lawyer_id_created_at', 'cases', ['lawyer_id', sa.text('created_at DESC'), sa.text('id DESC')]),
+    ('ix_tasks_assigned_to_created_at', 'tasks', ['assigned_to', sa.text('created_at DESC'), sa.text('id DESC')]),
+    ('ix_blog_posts_status_created_at', 'blog_posts', ['status', sa.text('created_at DESC'), sa.text('id DESC')]),
+    ('ix_cases_client_id', 'cases', ['client_id']),
+    ('ix_tasks_case_id', 'tasks', ['case_id']),
+]
+
+
+def upgrade():
+    # CONCURRENTLY cannot run inside a transaction. If a build fails it leaves an
+    # INVALID index behind; drop it and re-run the upgrade.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,87 @@
+"""Add year-partitioned archive tables for closed cases and finished tasks
+
+Revision ID: b8d2f6a4c917
+Revises: a5c3e8f1d640
+Create Date: 2026-10-19 18:12:40.917353
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8d2f6a4c917'
+down_revision = 'a5c3e8f1d640'
+branch_labels = None
+depends_on = None
+
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+)
+
+
+def _enum(name):
+    # Reuse the hot tables' enum types
+    return postgresql.ENUM(name=name, create_type=False)
+
+
+def upgrade():
+    op.create_table(
+        'cases_archive',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('client_id', sa.Integer(), nullable=False),
+        sa.Column('lawyer_id', sa.Integer(), nullable=True),
+        sa.Column('case_number', sa.String(length=100), nullable=False),
+        sa.Column('title', sa.String(length=255), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('status', _enum('casestatus'), nullable=False),
+        sa.Column('priority', _enum('casepriority'), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('closed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('archived_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(SEARCH_VECTOR, persisted=True), nullable=True),
+        sa.PrimaryKeyConstraint('id', 'created_at'),
+        postgresql_partition_by='RANGE (created_at)',
+    )
+    op.create_index('ix_cases_archive_client_id', 'cases_archive', ['client_id'])
+    op.create_index('ix_cases_archive_case_number', 'cases_archive', ['case_number'])
+    op.create_index(
+        'ix_cases_archive_lawyer_id_created_at', 'cases_archive',
+        ['lawyer_id', sa.text('created_at DESC'), sa.text('id DESC')]
+    )
+    op.create_index('ix_cases_archive_search_vector', 'cases_archive', ['search_vector'], postgresql_using='gin')
+
+    op.create_table(
+        'tasks_archive',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('case_id', sa.Integer(), nullable=False),
+        sa.Column('assigned_to', sa.Integer(), nullable=True),
+        sa.Column('title', sa.String(length=255), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('due_date', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('status', _enum('taskstatus'), nullable=False),
+        sa.Column('priority', _enum('taskpriority'), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('reminded_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('overdue_notified_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('archived_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id', 'created_at'),
+        postgresql_partition_by='RANGE (created_at)',
+    )
+    op.create_index('ix_tasks_archive_case_id', 'tasks_archive', ['case_id'])
+    op.create_index(
+        'ix_tasks_archive_assigned_to_created_at', 'tasks_archive',
+        ['assigned_to', sa.text('created_at DESC'), sa.text('id DESC')]
+    )
+    # Yearly partitions are created by the archival job as it reaches each year
+
+
+def downgrade():
+    op.drop_table('tasks_archive')
+    op.drop_table('cases_archive')
@@ -0,0 +1,54 @@
+"""Add full-text search vectors to cases and clients
+
+Revision ID: c7a2f9d81e35
+Revises: b3d1e0a4c2f7
+Create Date: 2026-10-19 11:03:47.502817
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7a2f9d81e35'
+down_revision = 'b3d1e0a4c2f7'
+branch_labels = None
+depends_on = None
+
+# (table, weight-A column, weight-B column) -- must match the Computed() in app/models
+SEARCH_DOCUMENTS = [
+    ('cases', 'title', 'description'),
+    ('clients', 'name', 'notes'),
+]
+
+
+def upgrade():
+    # A stored generated column is filled by a table rewrite under an exclusive lock;
+    # on very large tables run this in a maintenance window.
+    for table, primary, secondary in SEARCH_DOCUMENTS:
+        op.add_column(table, sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                f"setweight(to_tsvector('english', coalesce({primary}, '')), 'A') || "
+                f"setweight(to_tsvector('english', coalesce({secondary}, '')), 'B')",
+                persisted=True
+            ),
+            nullable=True
+        ))
+
+    with op.get_context().autocommit_block():
+        for table, _, _ in SEARCH_DOCUMENTS:
+            op.create_index(
+                f'ix_{table}_search_vector', table, ['search_vector'],
+                unique=False, postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for table, _, _ in reversed(SEARCH_DOCUMENTS):
+            op.drop_index(f'ix_{table}_search_vector', table_name=table, postgresql_concurrently=True, if_exists=True)
+    for table, _, _ in reversed(SEARCH_DOCUMENTS):
+        op.drop_column(table, 'search_vector')
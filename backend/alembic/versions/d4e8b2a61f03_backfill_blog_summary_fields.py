@@ -0,0 +1,35 @@
+"""Backfill blog post excerpts and publish dates
+
+Revision ID: d4e8b2a61f03
+Revises: c7a2f9d81e35
+Create Date: 2026-10-19 14:21:09.371552
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4e8b2a61f03'
+down_revision = 'c7a2f9d81e35'
+branch_labels = None
+depends_on = None
+
+# Must match EXCERPT_LENGTH in app/services/blog_publisher.py
+EXCERPT_LENGTH = 200
+
+
+def upgrade():
+    # The summary projection reads excerpt and published_at only; posts created before
+    # they were filled on publish get them derived once here
+    op.execute(sa.text(
+        "UPDATE blog_posts SET excerpt = left(content, :length) WHERE excerpt IS NULL OR excerpt = ''"
+    ).bindparams(length=EXCERPT_LENGTH))
+    op.execute(
+        "UPDATE blog_posts SET published_at = created_at WHERE status = 'PUBLISHED' AND published_at IS NULL"
+    )
+
+
+def downgrade():
+    # Data-only migration; the derived values are valid under the previous revision too
+    pass
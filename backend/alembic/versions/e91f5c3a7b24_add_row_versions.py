@@ -0,0 +1,29 @@
+"""Add optimistic-concurrency version to clients, cases and tasks
+
+Revision ID: e91f5c3a7b24
+Revises: d4e8b2a61f03
+Create Date: 2026-10-19 15:02:44.860193
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e91f5c3a7b24'
+down_revision = 'd4e8b2a61f03'
+branch_labels = None
+depends_on = None
+
+TABLES = ['clients', 'cases', 'tasks']
+
+
+def upgrade():
+    # A constant default is stored in the catalog (Postgres 11+): no table rewrite
+    for table in TABLES:
+        op.add_column(table, sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade():
+    for table in reversed(TABLES):
+        op.drop_column(table, 'version')
@@ -0,0 +1,42 @@
+"""Add reminder tracking to tasks and a partial index on open due dates
+
+Revision ID: f2b7c4d9a183
+Revises: e91f5c3a7b24
+Create Date: 2026-10-19 16:21:37.402815
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2b7c4d9a183'
+down_revision = 'e91f5c3a7b24'
+branch_labels = None
+depends_on = None
+
+# Open tasks that have not had their overdue notice yet: the only rows the reminder
+# scheduler ever reads, so the index shrinks as tasks are completed or notified
+OPEN_DUE_PREDICATE = "status IN ('PENDING', 'IN_PROGRESS') AND overdue_notified_at IS NULL"
+
+
+def upgrade():
+    op.add_column('tasks', sa.Column('reminded_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('tasks', sa.Column('overdue_notified_at', sa.DateTime(timezone=True), nullable=True))
+    # Open tasks that are long overdue are not notified retroactively (and stay out of the index)
+    op.execute(
+        "UPDATE tasks SET reminded_at = now(), overdue_notified_at = now() "
+        "WHERE status IN ('PENDING', 'IN_PROGRESS') AND due_date < now() - interval '1 day'"
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_tasks_open_due_date', 'tasks', ['due_date'], unique=False,
+            postgresql_where=sa.text(OPEN_DUE_PREDICATE), postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tasks_open_due_date', table_name='tasks', postgresql_concurrently=True, if_exists=True)
+    op.drop_column('tasks', 'overdue_notified_at')
+    op.drop_column('tasks', 'reminded_at')
@@ -1,23 +1,49 @@
-from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status
+from typing import Optional
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
+from fastapi.security.utils import get_authorization_scheme_param
 from jose import jwt, JWTError
 from pydantic import ValidationError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core import security
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import get_db, replica_router
 from app.models.user import User
+from app.services import user_service
 from app.schemas.token import TokenData
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
-def get_current_user(
-    db: Session = Depends(get_db),
+def _token_user_id(request: Request) -> Optional[int]:
+    # Read routing is decided before the endpoint's auth dependency runs. An invalid
+    # token only means no read-your-writes stickiness; authentication still rejects it.
+    scheme, token = get_authorization_scheme_param(request.headers.get("Authorization"))
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        user_id = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]).get("uid")
+    except JWTError:
+        return None
+    return user_id if isinstance(user_id, int) else None
+
+async def get_read_db(request: Request):
+    """
+    Yield a session for a read-only endpoint: on a read replica that is in sync, or on
+    the primary when there is none or the caller wrote recently (app/core/database.py).
+    Never write through it.
+    """
+    user_id = _token_user_id(request) if replica_router.enabled else None
+    session_factory = await replica_router.sessionmaker_for(user_id)
+    async with session_factory() as db:
+        yield db
+
+async def get_current_user(
+    db: AsyncSession = Depends(get_db),
     token: str = Depends(oauth2_scheme)
 ) -> User:
     """
-    Validate the access token and return the current user.
+    Validate the access token and return the current user. Warm requests are served
+    from the principal cache and never query the users table.
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -31,16 +57,19 @@ def get_current_user(
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
-        token_data = TokenData(email=email)
+        # Tokens issued before the uid claim existed fall back to an email lookup
+        token_data = TokenData(user_id=payload.get("uid"), email=email, role=payload.get("role"))
     except (JWTError, ValidationError):
         raise credentials_exception
-        
-    user = db.query(User).filter(User.email == token_data.email).first()
+
+    user = await user_service.get_principal(db, user_id=token_data.user_id, email=token_data.email)
     if user is None:
         raise credentials_exception
+    # The endpoint shares this session, so its commits keep the user's reads on the primary
+    db.info["user_id"] = user.id
     return user
 
-def get_current_active_user(
+async def get_current_active_user(
     current_user: User = Depends(get_current_user),
 ) -> User:
     """
@@ -2,44 +2,56 @@ from datetime import timedelta
 from typing import Any
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core import database, security
-from app.services.user_service import get_user_by_email, create_user
-from app.schemas.user import UserCreate, User as UserSchema
+from app.services.user_service import get_user_by_email, create_user, update_user
+from app.schemas.user import UserCreate, UserUpdate, User as UserSchema
 from app.schemas.token import Token
 from app.core.config import settings
 from app.api import deps
-from app.models.user import User
+from app.models.activity import ActivityAction
+from app.models.user import User, UserRole
+from app.services.activity_log import activity_log
 
 router = APIRouter()
 
 @router.post("/register", response_model=UserSchema, status_code=status.HTTP_201_CREATED)
-def register(
+async def register(
     user: UserCreate,
-    db: Session = Depends(database.get_db)
+    db: AsyncSession = Depends(database.get_db)
 ):
     """
     Create a new user.
     """
-    existing_user = get_user_by_email(db, email=user.email)
+    existing_user = await get_user_by_email(db, email=user.email)
     if existing_user:
         raise HTTPException(
             status_code=400,
             detail="User with this email already exists"
         )
-    user = create_user(db=db, user=user)
+    user = await create_user(db=db, user=user)
+    await activity_log.record(user.id, ActivityAction.REGISTER, "user", user.id)
     return user
 
 @router.post("/login", response_model=Token)
-def login(
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(database.get_db)
+    db: AsyncSession = Depends(database.get_db)
 ):
     """
     OAuth2 compatible token login, get an access token for future requests.
     """
-    user = get_user_by_email(db, email=form_data.username)
-    if not user or not security.verify_password(form_data.password, user.hashed_password):
+    user = await get_user_by_email(db, email=form_data.username)
+    valid, new_hash = (False, None)
+    if user:
+        # End the read transaction so the pooled connection is not held while bcrypt runs
+        await db.commit()
+        valid, new_hash = await security.check_password(form_data.password, user.hashed_password)
+    if not valid:
+        await activity_log.record(
+            user.id if user else None, ActivityAction.LOGIN_FAILED, "user", user.id if user else None,
+            {"email": form_data.username}
+        )
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -47,10 +59,18 @@ def login(
         )
     elif not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
-    
+
+    if new_hash:
+        # Stored hash predates the current BCRYPT_ROUNDS; upgrade it transparently
+        user.hashed_password = new_hash
+        await db.commit()
+
+    await activity_log.record(user.id, ActivityAction.LOGIN, "user", user.id)
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = security.create_access_token(
-        subject=user.email, expires_delta=access_token_expires
+        subject=user.email,
+        expires_delta=access_token_expires,
+        claims={"uid": user.id, "role": user.role.value}
     )
     return {
         "access_token": access_token,
@@ -58,10 +78,28 @@ def login(
     }
 
 @router.get("/me", response_model=UserSchema)
-def read_users_me(
+async def read_users_me(
     current_user: User = Depends(deps.get_current_active_user)
 ):
     """
     Get current logged in user.
     """
     return current_user
+
+@router.patch("/users/{id}", response_model=UserSchema)
+async def update_user_account(
+    *,
+    db: AsyncSession = Depends(database.get_db),
+    id: int,
+    user_in: UserUpdate,
+    current_user: User = Depends(deps.get_current_active_user)
+):
+    """
+    Update a user's role, activation or profile (Admins only).
+    """
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    user = await update_user(db, user_id=id, user=user_in)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
@@ -1,12 +1,19 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import select
+from sqlalchemy.orm import load_only
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.api import deps
+from app.core.config import settings
+from app.core.http_cache import conditional_json
+from app.core.pagination import NEXT_CURSOR_HEADER, paginate
+from app.core.read_cache import read_cache
 from app.models.blog import BlogStatus
 from app.models.user import User, UserRole
 from app.models import blog as blog_models
+from app.services import blog_publisher
 from pydantic import BaseModel
-from datetime import datetime
+from datetime import datetime, timezone
 
 router = APIRouter()
 
@@ -15,8 +22,8 @@ class BlogPostBase(BaseModel):
     title: str
     slug: str
     content: str
-    excerpt: str = None
-    category_id: int = None
+    excerpt: Optional[str] = None
+    category_id: Optional[int] = None
 
 class BlogPostCreate(BlogPostBase):
     pass
@@ -28,21 +35,85 @@ class BlogPostResponse(BlogPostBase):
     created_at: datetime
     class Config: from_attributes = True
 
+class BlogPostSummary(BaseModel):
+    title: str
+    slug: str
+    excerpt: Optional[str] = None
+    published_at: Optional[datetime] = None
+    class Config: from_attributes = True
+
+PUBLISHED = blog_models.BlogPost.status == BlogStatus.PUBLISHED
+
+def _page_headers(next_cursor: Optional[str]) -> Dict[str, str]:
+    return {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+
 @router.get("/", response_model=List[BlogPostResponse])
-def get_posts(
-    db: Session = Depends(deps.get_db),
-    skip: int = 0,
-    limit: int = 10,
+async def get_posts(
+    request: Request,
+    db: AsyncSession = Depends(deps.get_read_db),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=settings.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
 ):
-    """Get all published blog posts."""
-    return db.query(blog_models.BlogPost)\
-        .filter(blog_models.BlogPost.status == BlogStatus.PUBLISHED)\
-        .offset(skip).limit(limit).all()
+    """Get all published blog posts, newest first (cursor-paginated via X-Next-Cursor)."""
+    async def load():
+        page = await paginate(
+            db, select(blog_models.BlogPost).where(PUBLISHED), blog_models.BlogPost,
+            limit=limit, cursor=cursor, skip=skip
+        )
+        items = [BlogPostResponse.model_validate(p).model_dump(mode="json") for p in page.items]
+        return {"items": items, "next_cursor": page.next_cursor}
+
+    result = await read_cache.get_or_load(
+        "blog_posts", "blog", request.query_params.multi_items(), settings.BLOG_LIST_CACHE_TTL_SECONDS, load
+    )
+    return conditional_json(request, result["items"], headers=_page_headers(result["next_cursor"]))
+
+@router.get("/summaries", response_model=List[BlogPostSummary])
+async def get_post_summaries(
+    request: Request,
+    db: AsyncSession = Depends(deps.get_read_db),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=settings.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+):
+    """
+    Published posts without their bodies (title, slug, excerpt, published_at), newest
+    first, for listing pages. Cursor-paginated via X-Next-Cursor.
+    """
+    async def load():
+        stmt = select(blog_models.BlogPost).options(load_only(*blog_publisher.SUMMARY_COLUMNS)).where(PUBLISHED)
+        page = await paginate(db, stmt, blog_models.BlogPost, limit=limit, cursor=cursor, skip=skip)
+        items = [BlogPostSummary.model_validate(p).model_dump(mode="json") for p in page.items]
+        return {"items": items, "next_cursor": page.next_cursor}
+
+    result = await read_cache.get_or_load(
+        "blog_summaries", "blog", request.query_params.multi_items(), settings.BLOG_LIST_CACHE_TTL_SECONDS, load
+    )
+    return conditional_json(request, result["items"], headers=_page_headers(result["next_cursor"]))
+
+@router.get("/{slug}", response_model=BlogPostResponse)
+async def get_post(
+    request: Request,
+    slug: str,
+    db: AsyncSession = Depends(deps.get_read_db),
+):
+    """Get a published post by its slug."""
+    async def load():
+        post = await db.scalar(select(blog_models.BlogPost).where(blog_models.BlogPost.slug == slug, PUBLISHED))
+        return BlogPostResponse.model_validate(post).model_dump(mode="json") if post else None
+
+    post = await read_cache.get_or_load(
+        "blog_post", "blog", [("slug", slug)], settings.BLOG_LIST_CACHE_TTL_SECONDS, load
+    )
+    if post is None:
+        raise HTTPException(status_code=404, detail="Post not found")
+    return conditional_json(request, post)
 
 @router.post("/", response_model=BlogPostResponse)
-def create_post(
+async def create_post(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db),
     post_in: BlogPostCreate,
     current_user: User = Depends(deps.get_current_active_user),
 ):
@@ -53,11 +124,17 @@ def create_post(
     db_post = blog_models.BlogPost(
         **post_in.dict(),
         author_id=current_user.id,
-        status=BlogStatus.PUBLISHED # For MVP auto-publish
+        status=BlogStatus.PUBLISHED, # For MVP auto-publish
+        published_at=datetime.now(timezone.utc)
     )
+    # List pages show the excerpt only, so every post gets one
+    if not db_post.excerpt:
+        db_post.excerpt = blog_publisher.make_excerpt(db_post.content)
     db.add(db_post)
-    db.commit()
-    db.refresh(db_post)
+    await db.commit()
+    await db.refresh(db_post)
+    await read_cache.invalidate("blog")
+    await blog_publisher.publish(db, db_post)
     return db_post
 
 # Newsletter & Contact
@@ -65,16 +142,18 @@ class NewsletterSubscribe(BaseModel):
     email: str
 
 @router.post("/subscribe")
-def subscribe_newsletter(
+async def subscribe_newsletter(
     data: NewsletterSubscribe,
-    db: Session = Depends(deps.get_db)
+    db: AsyncSession = Depends(deps.get_db)
 ):
-    existing = db.query(blog_models.NewsletterSubscriber)\
-        .filter(blog_models.NewsletterSubscriber.email == data.email).first()
+    existing = await db.scalar(
+        select(blog_models.NewsletterSubscriber)
+        .where(blog_models.NewsletterSubscriber.email == data.email)
+    )
     if existing:
         return {"message": "Already subscribed"}
     
     sub = blog_models.NewsletterSubscriber(email=data.email)
     db.add(sub)
-    db.commit()
+    await db.commit()
     return {"message": "Subscribed successfully"}
@@ -1,71 +1,174 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Any, List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.api import deps
-from app.services import crm_service
-from app.schemas.case import Case, CaseCreate, CaseUpdate
+from app.core.config import settings
+from app.core.database import replica_router
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.read_cache import read_cache
+from app.services import crm_service, export_service, import_service
+from app.services.activity_log import activity_log
+from app.models.case import CasePriority, CaseStatus
+from app.schemas.case import (
+    Case, CaseClient, CaseCreate, CaseDetail, CaseFilter, CaseInclude, CaseSort, CaseUpdate
+)
+from app.schemas.task import Task
+from app.schemas.bulk_import import ImportResult
+from app.models.activity import ActivityAction
 from app.models.user import User
 
 router = APIRouter()
 
-@router.get("/", response_model=List[Case])
-def read_cases(
-    db: Session = Depends(deps.get_db),
-    skip: int = 0,
-    limit: int = 100,
+def _case_detail(case, include: List[str]) -> CaseDetail:
+    # Only touch relationships that were eagerly loaded; anything else would lazy-load per row
+    return CaseDetail(
+        **Case.model_validate(case).model_dump(),
+        client=CaseClient.model_validate(case.client) if "client" in include else None,
+        tasks=[Task.model_validate(t) for t in case.tasks] if "tasks" in include else None,
+    )
+
+@router.get("/", response_model=List[CaseDetail])
+async def read_cases(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(deps.get_read_db),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=settings.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    include: List[CaseInclude] = Query([]),
+    status: Optional[List[CaseStatus]] = Query(None),
+    priority: Optional[List[CasePriority]] = Query(None),
+    client_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    q: Optional[str] = Query(None, max_length=200),
+    sort: Optional[CaseSort] = None,
+    archived: bool = False,
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
-    Retrieve cases.
+    Retrieve cases, filtered and sorted on the server (newest first by default,
+    by relevance when searching with `q`). `status` and `priority` may repeat.
+    `include=client` / `include=tasks` embed each case's client and tasks.
+    `archived=true` lists archived cases instead of active ones.
+    Pass the X-Next-Cursor response header back as `cursor` for the next page.
     """
-    cases = crm_service.get_cases(db, lawyer_id=current_user.id, skip=skip, limit=limit)
-    return cases
+    filters = CaseFilter(
+        status=status, priority=priority, client_id=client_id,
+        created_from=created_from, created_to=created_to, q=q, sort=sort
+    )
+    async def load():
+        page = await crm_service.get_cases(
+            db, lawyer_id=current_user.id, skip=skip, limit=limit, cursor=cursor, filters=filters, include=include,
+            archived=archived
+        )
+        items = [_case_detail(case, include).model_dump(mode="json") for case in page.items]
+        return {"items": items, "next_cursor": page.next_cursor}
+
+    # Task writes do not invalidate case lists, so lists embedding tasks are not cached
+    ttl = 0 if "tasks" in include else settings.CASE_LIST_CACHE_TTL_SECONDS
+    result = await read_cache.get_or_load(
+        "cases", f"cases:{current_user.id}", request.query_params.multi_items(), ttl, load
+    )
+    if result["next_cursor"]:
+        response.headers[NEXT_CURSOR_HEADER] = result["next_cursor"]
+    return result["items"]
 
 @router.post("/", response_model=Case, status_code=status.HTTP_201_CREATED)
-def create_case(
+async def create_case(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db),
     case_in: CaseCreate,
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Create new case.
     """
-    case = crm_service.create_case(db, case=case_in, lawyer_id=current_user.id)
+    case = await crm_service.create_case(db, case=case_in, lawyer_id=current_user.id)
     return case
 
-@router.get("/{id}", response_model=Case)
-def read_case(
+@router.get("/export")
+async def export_cases(
+    format: Literal["csv", "ndjson"] = "csv",
+    status: Optional[List[CaseStatus]] = Query(None),
+    priority: Optional[List[CasePriority]] = Query(None),
+    client_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    q: Optional[str] = Query(None, max_length=200),
+    sort: Optional[CaseSort] = None,
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Download all matching cases as CSV or NDJSON (same filters and order as the list).
+    Rows are streamed from a server-side cursor as they are read.
+    """
+    filters = CaseFilter(
+        status=status, priority=priority, client_id=client_id,
+        created_from=created_from, created_to=created_to, q=q, sort=sort
+    )
+    stmt = export_service.cases_select(current_user.id, filters)
+    await activity_log.record(
+        current_user.id, ActivityAction.EXPORT, "case", None,
+        {"format": format, **filters.model_dump(mode="json", exclude_none=True)}
+    )
+    return StreamingResponse(
+        export_service.stream_rows(stmt, format, await replica_router.sessionmaker_for(current_user.id)),
+        media_type=export_service.MEDIA_TYPES[format],
+        headers={"Content-Disposition": export_service.attachment("cases", format)},
+    )
+
+@router.post("/import", response_model=ImportResult)
+async def import_cases(
+    request: Request,
+    db: AsyncSession = Depends(deps.get_db),
+    format: Optional[Literal["csv", "ndjson"]] = None,
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Bulk-import cases from a CSV (with header row) or NDJSON request body, detected from
+    Content-Type unless `format` is given. Columns: case_number, title, client_id or
+    client_email (required), description, status, priority.
+    Valid rows are committed in chunks; each rejected row is listed with its row number.
+    """
+    fmt = import_service.detect_format(request.headers.get("content-type"), format)
+    return await import_service.import_cases(db, current_user.id, request.stream(), fmt)
+
+@router.get("/{id}", response_model=CaseDetail)
+async def read_case(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_read_db),
     id: int,
+    include: List[CaseInclude] = Query([]),
+    archived: bool = False,
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
-    Get case by ID.
+    Get case by ID. `include=client&include=tasks` returns the expanded matter view
+    (case, client and tasks) in one request and two queries.
+    `archived=true` looks the case up in the archive.
     """
-    case = crm_service.get_case(db, case_id=id)
+    case = await crm_service.get_case(db, case_id=id, include=include, archived=archived)
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
     if case.lawyer_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
-    return case
+    await activity_log.record(current_user.id, ActivityAction.VIEW, "case", id)
+    return _case_detail(case, include)
 
 @router.put("/{id}", response_model=Case)
-def update_case(
+async def update_case(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db),
     id: int,
     case_in: CaseUpdate,
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
-    Update a case.
+    Update a case with a single UPDATE ... RETURNING. The `version` last read is
+    required; a stale one gets 409 Conflict instead of overwriting someone else's change.
     """
-    case = crm_service.get_case(db, case_id=id)
-    if not case:
-        raise HTTPException(status_code=404, detail="Case not found")
-    if case.lawyer_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
-    case = crm_service.update_case(db, case_id=id, case=case_in)
+    case = await crm_service.update_case(db, case_id=id, case=case_in, lawyer_id=current_user.id)
     return case
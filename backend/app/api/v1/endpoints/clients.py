@@ -1,71 +1,142 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Any, List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.api import deps
-from app.services import crm_service
-from app.schemas.client import Client, ClientCreate, ClientUpdate
+from app.core.config import settings
+from app.core.database import replica_router
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.read_cache import read_cache
+from app.services import crm_service, export_service, import_service
+from app.services.activity_log import activity_log
+from app.models.client import ClientStatus
+from app.schemas.client import Client, ClientCreate, ClientFilter, ClientSort, ClientUpdate
+from app.schemas.bulk_import import ImportResult
+from app.models.activity import ActivityAction
 from app.models.user import User
 
 router = APIRouter()
 
 @router.get("/", response_model=List[Client])
-def read_clients(
-    db: Session = Depends(deps.get_db),
-    skip: int = 0,
-    limit: int = 100,
+async def read_clients(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(deps.get_read_db),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=settings.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    status: Optional[List[ClientStatus]] = Query(None),
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    q: Optional[str] = Query(None, max_length=200),
+    sort: Optional[ClientSort] = None,
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
-    Retrieve clients.
+    Retrieve clients, filtered and sorted on the server (newest first by default,
+    by relevance when searching with `q`). `status` may repeat.
+    Pass the X-Next-Cursor response header back as `cursor` for the next page.
     """
-    clients = crm_service.get_clients(db, lawyer_id=current_user.id, skip=skip, limit=limit)
-    return clients
+    filters = ClientFilter(status=status, created_from=created_from, created_to=created_to, q=q, sort=sort)
+    async def load():
+        page = await crm_service.get_clients(
+            db, lawyer_id=current_user.id, skip=skip, limit=limit, cursor=cursor, filters=filters
+        )
+        items = [Client.model_validate(client).model_dump(mode="json") for client in page.items]
+        return {"items": items, "next_cursor": page.next_cursor}
+
+    result = await read_cache.get_or_load(
+        "clients", f"clients:{current_user.id}", request.query_params.multi_items(),
+        settings.CLIENT_LIST_CACHE_TTL_SECONDS, load
+    )
+    if result["next_cursor"]:
+        response.headers[NEXT_CURSOR_HEADER] = result["next_cursor"]
+    return result["items"]
 
 @router.post("/", response_model=Client, status_code=status.HTTP_201_CREATED)
-def create_client(
+async def create_client(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db),
     client_in: ClientCreate,
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Create new client.
     """
-    client = crm_service.create_client(db, client=client_in, lawyer_id=current_user.id)
+    client = await crm_service.create_client(db, client=client_in, lawyer_id=current_user.id)
     return client
 
+@router.get("/export")
+async def export_clients(
+    format: Literal["csv", "ndjson"] = "csv",
+    status: Optional[List[ClientStatus]] = Query(None),
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    q: Optional[str] = Query(None, max_length=200),
+    sort: Optional[ClientSort] = None,
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Download all matching clients as CSV or NDJSON (same filters and order as the list).
+    Rows are streamed from a server-side cursor as they are read.
+    """
+    filters = ClientFilter(status=status, created_from=created_from, created_to=created_to, q=q, sort=sort)
+    stmt = export_service.clients_select(current_user.id, filters)
+    await activity_log.record(
+        current_user.id, ActivityAction.EXPORT, "client", None,
+        {"format": format, **filters.model_dump(mode="json", exclude_none=True)}
+    )
+    return StreamingResponse(
+        export_service.stream_rows(stmt, format, await replica_router.sessionmaker_for(current_user.id)),
+        media_type=export_service.MEDIA_TYPES[format],
+        headers={"Content-Disposition": export_service.attachment("clients", format)},
+    )
+
+@router.post("/import", response_model=ImportResult)
+async def import_clients(
+    request: Request,
+    db: AsyncSession = Depends(deps.get_db),
+    format: Optional[Literal["csv", "ndjson"]] = None,
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Bulk-import clients from a CSV (with header row) or NDJSON request body, detected from
+    Content-Type unless `format` is given. Columns: name (required), email, phone, address, status, notes.
+    Valid rows are committed in chunks; each rejected row is listed with its row number.
+    """
+    fmt = import_service.detect_format(request.headers.get("content-type"), format)
+    return await import_service.import_clients(db, current_user.id, request.stream(), fmt)
+
 @router.get("/{id}", response_model=Client)
-def read_client(
+async def read_client(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_read_db),
     id: int,
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Get client by ID.
     """
-    client = crm_service.get_client(db, client_id=id)
+    client = await crm_service.get_client(db, client_id=id)
     if not client:
         raise HTTPException(status_code=404, detail="Client not found")
     if client.lawyer_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
+    await activity_log.record(current_user.id, ActivityAction.VIEW, "client", id)
     return client
 
 @router.put("/{id}", response_model=Client)
-def update_client(
+async def update_client(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db),
     id: int,
     client_in: ClientUpdate,
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
-    Update a client.
+    Update a client with a single UPDATE ... RETURNING. The `version` last read is
+    required; a stale one gets 409 Conflict instead of overwriting someone else's change.
     """
-    client = crm_service.get_client(db, client_id=id)
-    if not client:
-        raise HTTPException(status_code=404, detail="Client not found")
-    if client.lawyer_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
-    client = crm_service.update_client(db, client_id=id, client=client_in)
+    client = await crm_service.update_client(db, client_id=id, client=client_in, lawyer_id=current_user.id)
     return client
@@ -0,0 +1,19 @@
+from typing import Any
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api import deps
+from app.services import dashboard_service
+from app.schemas.dashboard import DashboardSummary
+from app.models.user import User
+
+router = APIRouter()
+
+@router.get("/summary", response_model=DashboardSummary)
+async def read_summary(
+    db: AsyncSession = Depends(deps.get_read_db),
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Case, client and task aggregates and upcoming deadlines for the current user's dashboard.
+    """
+    return await dashboard_service.get_summary(db, current_user.id)
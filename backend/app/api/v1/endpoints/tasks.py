@@ -1,71 +1,139 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from typing import Any, List, Literal, Optional
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.api import deps
-from app.services import crm_service
-from app.schemas.task import Task, TaskCreate, TaskUpdate
+from app.core.config import settings
+from app.core.database import replica_router
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.services import crm_service, export_service
+from app.services.activity_log import activity_log
+from app.schemas.task import Task, TaskBatchItem, TaskBatchResult, TaskBatchUpdateItem, TaskCreate, TaskUpdate
+from app.models.activity import ActivityAction
 from app.models.user import User
 
 router = APIRouter()
 
 @router.get("/", response_model=List[Task])
-def read_tasks(
-    db: Session = Depends(deps.get_db),
-    skip: int = 0,
-    limit: int = 100,
+async def read_tasks(
+    response: Response,
+    db: AsyncSession = Depends(deps.get_read_db),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=settings.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    archived: bool = False,
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
-    Retrieve tasks assigned to current user.
+    Retrieve tasks assigned to current user, newest first (archived ones with `archived=true`).
+    Pass the X-Next-Cursor response header back as `cursor` for the next page.
     """
-    tasks = crm_service.get_tasks(db, user_id=current_user.id, skip=skip, limit=limit)
-    return tasks
+    page = await crm_service.get_tasks(
+        db, user_id=current_user.id, skip=skip, limit=limit, cursor=cursor, archived=archived
+    )
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return page.items
 
 @router.post("/", response_model=Task, status_code=status.HTTP_201_CREATED)
-def create_task(
+async def create_task(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db),
     task_in: TaskCreate,
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Create new task.
     """
-    task = crm_service.create_task(db, task=task_in, assigned_to=current_user.id)
+    task = await crm_service.create_task(db, task=task_in, assigned_to=current_user.id)
     return task
 
+def _batch_result(results: List[crm_service.BatchResult]) -> TaskBatchResult:
+    items = [
+        TaskBatchItem(index=i, status_code=code, task=task, error=error)
+        for i, (code, task, error) in enumerate(results)
+    ]
+    succeeded = sum(1 for item in items if item.status_code < 400)
+    return TaskBatchResult(succeeded=succeeded, failed=len(items) - succeeded, results=items)
+
+@router.post("/batch", response_model=TaskBatchResult)
+async def create_tasks_batch(
+    *,
+    db: AsyncSession = Depends(deps.get_db),
+    tasks_in: List[TaskCreate] = Body(..., min_length=1, max_length=settings.TASK_BATCH_MAX_SIZE),
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Create up to TASK_BATCH_MAX_SIZE tasks in one multi-row INSERT and transaction.
+    Every case_id must be one of the current user's cases; items that are not fail
+    with 404 in `results` while the others are created.
+    """
+    results = await crm_service.create_tasks(db, tasks=tasks_in, assigned_to=current_user.id)
+    return _batch_result(results)
+
+@router.patch("/batch", response_model=TaskBatchResult)
+async def update_tasks_batch(
+    *,
+    db: AsyncSession = Depends(deps.get_db),
+    tasks_in: List[TaskBatchUpdateItem] = Body(..., min_length=1, max_length=settings.TASK_BATCH_MAX_SIZE),
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Partially update many tasks in one UPDATE and transaction. Each item names the
+    task `id`, the `version` last read and the fields to change. Per-item
+    results report 404/403 for unknown or foreign tasks and 409 for stale versions.
+    """
+    results = await crm_service.update_tasks(db, tasks=tasks_in, assigned_to=current_user.id)
+    return _batch_result(results)
+
+@router.get("/export")
+async def export_tasks(
+    format: Literal["csv", "ndjson"] = "csv",
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Download all tasks assigned to the current user as CSV or NDJSON, newest first.
+    Rows are streamed from a server-side cursor as they are read.
+    """
+    await activity_log.record(current_user.id, ActivityAction.EXPORT, "task", None, {"format": format})
+    return StreamingResponse(
+        export_service.stream_rows(
+            export_service.tasks_select(current_user.id), format,
+            await replica_router.sessionmaker_for(current_user.id)
+        ),
+        media_type=export_service.MEDIA_TYPES[format],
+        headers={"Content-Disposition": export_service.attachment("tasks", format)},
+    )
+
 @router.get("/{id}", response_model=Task)
-def read_task(
+async def read_task(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_read_db),
     id: int,
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Get task by ID.
     """
-    task = crm_service.get_task(db, task_id=id)
+    task = await crm_service.get_task(db, task_id=id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     if task.assigned_to != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
+    await activity_log.record(current_user.id, ActivityAction.VIEW, "task", id)
     return task
 
 @router.put("/{id}", response_model=Task)
-def update_task(
+async def update_task(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_db),
     id: int,
     task_in: TaskUpdate,
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
-    Update a task.
+    Update a task with a single UPDATE ... RETURNING. The `version` last read is
+    required; a stale one gets 409 Conflict instead of overwriting someone else's change.
     """
-    task = crm_service.get_task(db, task_id=id)
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    if task.assigned_to != current_user.id:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
-    task = crm_service.update_task(db, task_id=id, task=task_in)
+    task = await crm_service.update_task(db, task_id=id, task=task_in, assigned_to=current_user.id)
     return task
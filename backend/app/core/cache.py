@@ -0,0 +1,152 @@
+"""
+Shared cache used across API workers. Values are JSON and live in Redis (REDIS_URL);
+when Redis is not configured or unreachable the cache degrades to a bounded
+per-process LRU, so a Redis outage costs hit ratio, not availability.
+"""
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+import json
+import logging
+import time
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class LocalCache:
+    """Bounded in-process LRU with per-entry TTL."""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str, ttl: float):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def delete(self, *keys: str):
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def add(self, key: str, value: str, ttl: float) -> bool:
+        if self.get(key) is not None:
+            return False
+        self.set(key, value, ttl)
+        return True
+
+    def incr(self, key: str, ttl: float) -> int:
+        value = int(self.get(key) or 0) + 1
+        self.set(key, str(value), ttl)
+        return value
+
+
+class Cache:
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        prefix: str = "oscar",
+        max_local_entries: int = 10000,
+        redis_retry_seconds: float = 30
+    ):
+        self.redis_url = redis_url
+        self.prefix = prefix
+        self.redis_retry_seconds = redis_retry_seconds
+        self.local = LocalCache(max_local_entries)
+        self._redis = None
+        self._redis_down_until = 0.0
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    def _client(self):
+        if not self.redis_url or time.monotonic() < self._redis_down_until:
+            return None
+        if self._redis is None:
+            import redis.asyncio as redis
+            self._redis = redis.from_url(self.redis_url, socket_timeout=0.25, socket_connect_timeout=0.25)
+        return self._redis
+
+    def _redis_failed(self, error: Exception):
+        logger.warning("Cache falling back to in-process storage: %s", error)
+        self._redis_down_until = time.monotonic() + self.redis_retry_seconds
+
+    async def get(self, key: str) -> Optional[Any]:
+        key = self._key(key)
+        client = self._client()
+        if client is not None:
+            try:
+                raw = await client.get(key)
+                return json.loads(raw) if raw is not None else None
+            except Exception as e:
+                self._redis_failed(e)
+        raw = self.local.get(key)
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Any, ttl: float):
+        key = self._key(key)
+        raw = json.dumps(value, default=str)
+        client = self._client()
+        if client is not None:
+            try:
+                await client.set(key, raw, px=int(ttl * 1000))
+                return
+            except Exception as e:
+                self._redis_failed(e)
+        self.local.set(key, raw, ttl)
+
+    async def delete(self, *keys: str):
+        keys = tuple(self._key(k) for k in keys)
+        # Always clear the local copy too, in case it was written while Redis was down
+        self.local.delete(*keys)
+        client = self._client()
+        if client is not None and keys:
+            try:
+                await client.delete(*keys)
+            except Exception as e:
+                self._redis_failed(e)
+
+    async def add(self, key: str, value: Any, ttl: float) -> bool:
+        """Set `key` only if it does not exist; returns whether it was set (a lock primitive)."""
+        key = self._key(key)
+        raw = json.dumps(value, default=str)
+        client = self._client()
+        if client is not None:
+            try:
+                return bool(await client.set(key, raw, px=int(ttl * 1000), nx=True))
+            except Exception as e:
+                self._redis_failed(e)
+        return self.local.add(key, raw, ttl)
+
+    async def incr(self, key: str, ttl: float) -> int:
+        """Atomically increment a counter, (re)setting its expiry to `ttl`."""
+        key = self._key(key)
+        client = self._client()
+        if client is not None:
+            try:
+                async with client.pipeline(transaction=True) as pipe:
+                    value, _ = await pipe.incr(key).pexpire(key, int(ttl * 1000)).execute()
+                return int(value)
+            except Exception as e:
+                self._redis_failed(e)
+        return self.local.incr(key, ttl)
+
+    async def close(self):
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+cache = Cache(settings.REDIS_URL, prefix=settings.CACHE_PREFIX)
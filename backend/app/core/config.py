@@ -16,12 +16,98 @@ class Settings(BaseSettings):
     
     # Internal Database URL (constructed from above)
     SQLALCHEMY_DATABASE_URL: Optional[str] = None
+    # asyncpg URL used by the application (derived from SQLALCHEMY_DATABASE_URL)
+    ASYNC_SQLALCHEMY_DATABASE_URL: Optional[str] = None
+
+    # Connection pool for the application's async engine (per worker process)
+    DB_POOL_SIZE: int = Field(10, description="Connections kept open in the pool")
+    DB_MAX_OVERFLOW: int = Field(5, description="Extra connections allowed above the pool size under bursts")
+    DB_POOL_TIMEOUT: float = Field(10.0, description="Seconds to wait for a free connection before failing")
+    DB_POOL_RECYCLE: int = Field(1800, description="Seconds after which a connection is replaced")
+    DB_POOL_PRE_PING: bool = Field(True, description="Test connections on checkout and drop dead ones")
+    DB_STATEMENT_TIMEOUT_MS: int = Field(15000, description="Server-side statement_timeout for API queries (0 disables)")
+
+    # Read replicas (app/core/database.py): read-only endpoints use these while their
+    # replication lag is within REPLICA_MAX_LAG_SECONDS; empty sends everything to the primary
+    DATABASE_REPLICA_URLS: List[str] = Field([], description="JSON list of postgresql:// URLs")
+    REPLICA_MAX_LAG_SECONDS: float = Field(5.0, gt=0, description="Lag above which reads fall back to the primary")
+    REPLICA_LAG_CHECK_SECONDS: float = Field(1.0, gt=0, description="How often replica lag is measured")
+
+    # SQL instrumentation (app/core/instrumentation.py): statements at least this slow are
+    # logged to "app.sql.slow" with normalized SQL
+    SLOW_QUERY_THRESHOLD_MS: float = Field(250.0, ge=0, description="Slow-query log threshold (0 disables)")
+    SLOW_QUERY_LOG_MAX_CHARS: int = Field(2000, ge=1, description="Normalized SQL is truncated to this length")
 
     # Security - CRITICAL: Must be in .env
     SECRET_KEY: str = Field("changeme", description="Secret key for JWT")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
-    
+
+    # Password hashing: bcrypt work factor and the process pool that runs it
+    BCRYPT_ROUNDS: int = Field(12, ge=4, le=31, description="bcrypt cost; existing hashes are upgraded on login")
+    PASSWORD_HASH_WORKERS: int = Field(2, ge=1, description="Processes dedicated to bcrypt per API worker")
+
+    # Shared cache (falls back to per-process memory when unset or unreachable)
+    REDIS_URL: Optional[str] = Field(None, description="Redis URL for the shared cache")
+    CACHE_PREFIX: str = "oscar"
+    PRINCIPAL_CACHE_TTL_SECONDS: int = Field(300, description="How long an authenticated user is cached")
+    DASHBOARD_CACHE_TTL_SECONDS: int = Field(60, description="How long a dashboard summary is cached")
+
+    # Read-through cache for list endpoints (per-route TTLs; 0 disables a route)
+    READ_CACHE_ENABLED: bool = True
+    BLOG_LIST_CACHE_TTL_SECONDS: int = Field(60, ge=0, description="Public blog list")
+    CASE_LIST_CACHE_TTL_SECONDS: int = Field(30, ge=0, description="Per-lawyer case list")
+    CLIENT_LIST_CACHE_TTL_SECONDS: int = Field(30, ge=0, description="Per-lawyer client list")
+
+    # Pre-rendered blog pages served by nginx (disabled when unset)
+    BLOG_STATIC_DIR: Optional[str] = Field(None, description="Directory nginx serves under /blog/")
+    BLOG_STATIC_INDEX_SIZE: int = Field(50, ge=1, description="Posts listed on the static index page")
+
+    # Dashboard: tasks due within this many days are listed as upcoming deadlines
+    DASHBOARD_UPCOMING_DAYS: int = Field(14, ge=1)
+    DASHBOARD_UPCOMING_LIMIT: int = Field(10, ge=1)
+
+    # Bulk import: rows validated and inserted per transaction, and errors returned inline
+    IMPORT_CHUNK_SIZE: int = Field(2000, ge=1, description="Rows per validation batch and transaction")
+    IMPORT_MAX_REPORTED_ERRORS: int = Field(1000, ge=0, description="Row errors included in an import response")
+
+    # Export: rows fetched per server-side cursor round trip, and the statement timeout for
+    # export reads (they outlive DB_STATEMENT_TIMEOUT_MS on large accounts; 0 disables)
+    EXPORT_BATCH_SIZE: int = Field(1000, ge=1, description="Rows fetched from the cursor at a time")
+    EXPORT_STATEMENT_TIMEOUT_MS: int = Field(0, ge=0, description="statement_timeout for export queries")
+
+    # List endpoints: largest page a request may ask for with `limit`
+    MAX_PAGE_SIZE: int = Field(100, ge=1, description="Upper bound for the limit query parameter")
+
+    # Batch task endpoints: most items accepted in one request
+    TASK_BATCH_MAX_SIZE: int = Field(500, ge=1, description="Tasks per POST/PATCH /tasks/batch request")
+
+    # Task reminders: a reminder REMINDER_LEAD_MINUTES before due_date, then an overdue notice
+    # at due_date (app/services/reminder_scheduler.py). Notices go to the log, or are appended
+    # as JSON lines to REMINDER_SINK_FILE when set.
+    REMINDER_SCHEDULER_ENABLED: bool = True
+    REMINDER_LEAD_MINUTES: int = Field(24 * 60, ge=0, description="How long before due_date to remind")
+    REMINDER_RECONCILE_SECONDS: int = Field(300, ge=1, description="How often upcoming tasks are reloaded")
+    REMINDER_BATCH_SIZE: int = Field(500, ge=1, description="Notices claimed per UPDATE")
+    REMINDER_CATCHUP_HOURS: int = Field(24, ge=0, description="Missed notices older than this are skipped")
+    REMINDER_SINK_FILE: Optional[str] = None
+
+    # Activity log (audit trail): events are queued in memory and written in batches
+    ACTIVITY_LOG_ENABLED: bool = True
+    ACTIVITY_QUEUE_SIZE: int = Field(10000, ge=1, description="Queued events before record() waits")
+    ACTIVITY_BATCH_SIZE: int = Field(500, ge=1, description="Events per INSERT")
+    ACTIVITY_FLUSH_INTERVAL_SECONDS: float = Field(1.0, gt=0, description="Longest an event waits in the queue")
+    ACTIVITY_PARTITION_MONTHS_AHEAD: int = Field(2, ge=1, description="Monthly partitions created in advance")
+    ACTIVITY_SHUTDOWN_TIMEOUT_SECONDS: float = Field(30.0, gt=0, description="Time allowed to drain at shutdown")
+    ACTIVITY_WRITE_ATTEMPTS: int = Field(8, ge=1, description="Tries per batch before it is dead-lettered")
+    ACTIVITY_DEAD_LETTER_FILE: Optional[str] = None
+
+    # Archival (app/scripts/archive_data.py): closed cases and finished tasks that have been
+    # cold this long move to the year-partitioned archive tables, in batches
+    ARCHIVE_CASES_AFTER_DAYS: int = Field(365, ge=0, description="Days since a case was closed")
+    ARCHIVE_TASKS_AFTER_DAYS: int = Field(180, ge=0, description="Days since a task was completed")
+    ARCHIVE_BATCH_SIZE: int = Field(1000, ge=1, description="Rows moved per transaction")
+
     # CORS - Allow list of strings or Any Http Url
     BACKEND_CORS_ORIGINS: List[str] = []
 
@@ -50,6 +136,16 @@ class Settings(BaseSettings):
         
         return f"postgresql://{user}:{password}@{host}:{port}/{db}"
 
+    @field_validator("ASYNC_SQLALCHEMY_DATABASE_URL", mode="before")
+    @classmethod
+    def assemble_async_db_connection(cls, v: Optional[str], info: Any) -> Any:
+        if isinstance(v, str) and v:
+            return v
+
+        url = info.data.get("SQLALCHEMY_DATABASE_URL") or ""
+        scheme, _, rest = url.partition("://")
+        return f"postgresql+asyncpg://{rest}" if scheme.startswith("postgresql") else url
+
     class Config:
         case_sensitive = True
         env_file = ".env"
@@ -1,19 +1,299 @@
-from sqlalchemy import create_engine
+from decimal import Decimal
+from typing import List, Optional
+import asyncio
+import itertools
+import logging
+import time
+from sqlalchemy import create_engine, event, exc, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from app.core.cache import cache
 from app.core.config import settings
+from app.core.instrumentation import instrument_engine
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
 
 SQLALCHEMY_DATABASE_URL = settings.SQLALCHEMY_DATABASE_URL
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+# Synchronous engine, used by Alembic and the maintenance scripts in app/scripts
+engine = create_engine(SQLALCHEMY_DATABASE_URL, pool_pre_ping=True)
+instrument_engine(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+pool_checkout_wait = registry.histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+pool_checkout_timeouts = registry.counter("db_pool_checkout_timeouts_total", "Checkouts that hit DB_POOL_TIMEOUT")
+pool_connections_opened = registry.counter("db_pool_connections_opened_total", "New database connections opened")
+pool_connections_closed = registry.counter("db_pool_connections_closed_total", "Database connections closed by the pool")
+pool_connections_invalidated = registry.counter("db_pool_connections_invalidated_total", "Connections dropped as broken or stale")
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_checkout_timeouts.inc()
+            raise
+        finally:
+            pool_checkout_wait.observe(time.perf_counter() - started)
+
+
+def _async_connect_args(url: str) -> dict:
+    if not url.startswith("postgresql+asyncpg"):
+        return {}
+    server_settings = {"application_name": settings.PROJECT_NAME[:63]}
+    if settings.DB_STATEMENT_TIMEOUT_MS > 0:
+        server_settings["statement_timeout"] = str(settings.DB_STATEMENT_TIMEOUT_MS)
+    return {"server_settings": server_settings}
+
+
+def _create_async_engine(url: str, poolclass=AsyncAdaptedQueuePool):
+    async_engine = create_async_engine(
+        url,
+        poolclass=poolclass,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args=_async_connect_args(url),
+    )
+    instrument_engine(async_engine.sync_engine)
+    return async_engine
+
+
+def _async_sessionmaker(engine, session_class=AsyncSession) -> async_sessionmaker:
+    return async_sessionmaker(
+        bind=engine,
+        class_=session_class,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
+
+class PrimarySession(AsyncSession):
+    """
+    Session on the primary. Once it commits for a user (deps.get_current_user puts
+    their id in info["user_id"]), that user's reads stay on the primary until the
+    replicas have the write, marked before the handler returns its response.
+    """
+
+    async def commit(self):
+        await super().commit()
+        user_id = self.info.get("user_id")
+        if user_id is not None:
+            await replica_router.mark_write(user_id)
+
+
+# Async engine used by the API so requests never block the event loop on the database
+async_engine = _create_async_engine(settings.ASYNC_SQLALCHEMY_DATABASE_URL, InstrumentedAsyncPool)
+
+AsyncSessionLocal = _async_sessionmaker(async_engine, PrimarySession)
+
+
+@event.listens_for(async_engine.sync_engine, "connect")
+def _on_connect(dbapi_connection, connection_record):
+    pool_connections_opened.inc()
+
+
+@event.listens_for(async_engine.sync_engine, "close")
+def _on_close(dbapi_connection, connection_record):
+    pool_connections_closed.inc()
+
+
+@event.listens_for(async_engine.sync_engine, "invalidate")
+def _on_invalidate(dbapi_connection, connection_record, exception):
+    pool_connections_invalidated.inc()
+
+
+def _pool_utilization() -> float:
+    capacity = settings.DB_POOL_SIZE + max(settings.DB_MAX_OVERFLOW, 0)
+    return async_engine.pool.checkedout() / capacity if capacity else 0.0
+
+registry.gauge("db_pool_size", "Configured pool size", lambda: async_engine.pool.size())
+registry.gauge("db_pool_checked_out", "Connections currently checked out", lambda: async_engine.pool.checkedout())
+registry.gauge("db_pool_checked_in", "Idle connections in the pool", lambda: async_engine.pool.checkedin())
+registry.gauge("db_pool_overflow", "Connections open beyond the pool size", lambda: max(async_engine.pool.overflow(), 0))
+registry.gauge("db_pool_utilization", "Checked-out connections / (pool size + max overflow)", _pool_utilization)
+
+
+# Read replicas
+#
+# With DATABASE_REPLICA_URLS set, read-only endpoints (deps.get_read_db) run on a
+# replica and everything else on the primary. A background task measures each
+# replica's lag every REPLICA_LAG_CHECK_SECONDS; a replica is used only while its lag,
+# plus the time since it was measured, is within REPLICA_MAX_LAG_SECONDS. Lag that
+# cannot be measured (replica down, WAL receiver not streaming, checker not running)
+# counts as too high, so reads fall back to the primary rather than to stale data.
+#
+# Lag is measured against the primary, not the replica's own view: a replica that
+# has replayed up to the primary's current WAL position has no lag; otherwise it is
+# the time since the last transaction it replayed was committed. A replica cut off
+# from the primary never looks caught up once the primary writes again.
+#
+# That bound also gives read-your-writes: a usable replica has replayed everything
+# committed more than REPLICA_MAX_LAG_SECONDS ago, so a user's reads stay on the
+# primary for that long after a request of theirs commits (PrimarySession.commit).
+# The marker lives in the shared cache, so it holds across API workers. Shared caches
+# filled from reads (read_cache, the dashboard) get the same window per key through
+# mark_changed(), which also covers readers other than the writer.
+
+# WAL positions as byte offsets, which bind as plain numbers
+PRIMARY_LSN_QUERY = text("SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), '0/0')")
+
+REPLICA_LAG_QUERY = text(
+    "SELECT CASE "
+    "WHEN NOT pg_is_in_recovery() "
+    "OR NOT EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming') THEN NULL "
+    "WHEN pg_wal_lsn_diff(pg_last_wal_replay_lsn(), '0/0') >= :primary_lsn THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+read_sessions = registry.counter(
+    "db_read_sessions_total", "Read-only sessions by where they were routed", ("route",)
+)
+replica_check_failures = registry.counter("db_replica_check_failures_total", "Failed replica lag checks")
+
+
+def _to_async_url(url: str) -> str:
+    scheme, _, rest = url.partition("://")
+    return f"postgresql+asyncpg://{rest}" if scheme.startswith("postgresql") else url
+
+
+class Replica:
+    def __init__(self, url: str):
+        self.engine = _create_async_engine(url)
+        self.sessionmaker = _async_sessionmaker(self.engine)
+        self.lag: Optional[float] = None
+        self.checked_at = 0.0
+
+    def usable(self, now: float) -> bool:
+        return self.lag is not None and self.lag + (now - self.checked_at) <= settings.REPLICA_MAX_LAG_SECONDS
+
+    async def check(self, primary_lsn: Optional[Decimal]):
+        """Measure lag against `primary_lsn`, the primary's WAL position read just before."""
+        if primary_lsn is None:
+            self.lag = None
+            self.checked_at = time.monotonic()
+            return
+        try:
+            async with self.engine.connect() as conn:
+                lag = await conn.scalar(REPLICA_LAG_QUERY, {"primary_lsn": primary_lsn})
+        except Exception as e:
+            replica_check_failures.inc()
+            logger.warning("Replica %s lag check failed: %s", self.engine.url.render_as_string(), e)
+            lag = None
+        self.lag = float(lag) if lag is not None else None
+        self.checked_at = time.monotonic()
+
+
+class ReplicaRouter:
+    def __init__(self, urls: List[str]):
+        self.replicas = [Replica(_to_async_url(url)) for url in urls]
+        self._next = itertools.count()
+        self._runner: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.replicas)
+
+    def available(self) -> List[Replica]:
+        now = time.monotonic()
+        return [r for r in self.replicas if r.usable(now)]
+
+    @staticmethod
+    def sticky_key(user_id: int) -> str:
+        return f"read_primary:{user_id}"
+
+    async def mark_write(self, user_id: int):
+        """Keep `user_id`'s reads on the primary until replicas have caught up with their write."""
+        if self.enabled:
+            await cache.set(self.sticky_key(user_id), 1, settings.REPLICA_MAX_LAG_SECONDS)
+
+    @staticmethod
+    def _changed_key(key: str) -> str:
+        return f"replica_behind:{key}"
+
+    async def mark_changed(self, key: str):
+        """Record that the data cached under `key` just changed; see changed_recently()."""
+        if self.enabled:
+            await cache.set(self._changed_key(key), 1, settings.REPLICA_MAX_LAG_SECONDS)
+
+    async def changed_recently(self, key: str) -> bool:
+        """
+        Whether `key` changed within REPLICA_MAX_LAG_SECONDS, so a replica may not have
+        the change yet. Caches do not store values loaded in that window: a stale read
+        would otherwise be served for the entry's whole TTL, to every reader.
+        """
+        return self.enabled and bool(await cache.get(self._changed_key(key)))
+
+    async def sessionmaker_for(self, user_id: Optional[int] = None) -> async_sessionmaker:
+        """The session factory a read-only request should use."""
+        if not self.enabled:
+            return AsyncSessionLocal
+        replicas = self.available()
+        if not replicas:
+            read_sessions.inc(route="primary_lag")
+            return AsyncSessionLocal
+        if user_id is not None and await cache.get(self.sticky_key(user_id)):
+            read_sessions.inc(route="primary_sticky")
+            return AsyncSessionLocal
+        read_sessions.inc(route="replica")
+        return replicas[next(self._next) % len(replicas)].sessionmaker
+
+    async def check(self):
+        try:
+            async with async_engine.connect() as conn:
+                primary_lsn = await conn.scalar(PRIMARY_LSN_QUERY)
+        except Exception as e:
+            replica_check_failures.inc()
+            logger.warning("Reading the primary's WAL position failed: %s", e)
+            primary_lsn = None
+        await asyncio.gather(*(r.check(primary_lsn) for r in self.replicas))
+
+    async def run(self):
+        while True:
+            await self.check()
+            await asyncio.sleep(settings.REPLICA_LAG_CHECK_SECONDS)
+
+    def start(self):
+        if self.enabled and self._runner is None:
+            self._runner = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+replica_router = ReplicaRouter(settings.DATABASE_REPLICA_URLS)
+
+registry.gauge("db_replicas", "Configured read replicas", lambda: len(replica_router.replicas))
+registry.gauge("db_replicas_available", "Replicas within REPLICA_MAX_LAG_SECONDS", lambda: len(replica_router.available()))
+
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    """
+    Yield a session for the request. The session takes a pooled connection only when
+    it runs its first statement and returns it on close, so handlers that never query
+    (or fail validation first) never touch the pool.
+    """
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
@@ -0,0 +1,192 @@
+"""
+Request and SQL instrumentation.
+
+RequestMetricsMiddleware times every HTTP request and labels it with the route
+template (/api/v1/cases/{id}), never the raw path, so /metrics stays bounded. Engines
+passed to instrument_engine() time each statement between before_cursor_execute and
+after_cursor_execute. The time is charged to the request running it, through a
+context variable, which gives statements and DB time per request. Statements slower
+than SLOW_QUERY_THRESHOLD_MS are logged to the "app.sql.slow" logger with their SQL
+normalized: literals and parameters become ?, and IN lists and VALUES rows are
+collapsed, so repeats of one query log identically.
+
+track_statements() and query_budget() reuse the same hooks in checks and tests, e.g.
+    with query_budget(2, "case detail"):
+        await client.get(f"/api/v1/cases/{case_id}?include=client&include=tasks")
+raises QueryBudgetExceeded (an AssertionError) listing the statements if more ran.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional
+import logging
+import re
+import time
+
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.core.metrics import registry
+
+slow_query_logger = logging.getLogger("app.sql.slow")
+
+request_duration = registry.histogram(
+    "http_request_duration_seconds", "Request latency until the response is fully sent", ("method", "route")
+)
+requests_total = registry.counter(
+    "http_requests_total", "Requests by route and status code", ("method", "route", "status")
+)
+request_statements = registry.histogram(
+    "http_request_db_statements", "SQL statements run per request", ("method", "route"),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+)
+request_db_time = registry.histogram(
+    "http_request_db_seconds", "Time spent in SQL statements per request", ("method", "route")
+)
+statement_duration = registry.histogram(
+    "db_statement_duration_seconds", "SQL statement execution time",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+slow_statements = registry.counter("db_slow_statements_total", "Statements slower than SLOW_QUERY_THRESHOLD_MS")
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w$.])-?\d+(?:\.\d+)?\b")
+_PARAMETER = re.compile(r"\$\d+|%\(\w+\)s|%s|(?<![:\w]):\w+|\?")
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_ROWS = re.compile(r"(\(\.\.\.\))(?:\s*,\s*\(\.\.\.\))+")
+_SPACE = re.compile(r"\s+")
+
+
+def normalize_sql(statement: str) -> str:
+    """Replace literals and parameters with ? and collapse lists, so one query shape reads the same."""
+    sql = _STRING.sub("?", statement)
+    sql = _PARAMETER.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _LIST.sub("(...)", sql)
+    sql = _ROWS.sub(r"\1, ...", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+class StatementStats:
+    """Statements and DB time charged to a request or a tracked block; nested blocks also charge their parent."""
+
+    def __init__(self, parent: Optional["StatementStats"] = None, record: bool = False):
+        self.parent = parent
+        self.statements = 0
+        self.db_seconds = 0.0
+        # ASGI scope of the request being served, for labelling slow-query log lines
+        self.scope = parent.scope if parent is not None else None
+        # Normalized SQL of each statement, kept only when tracking explicitly
+        self.sql: Optional[List[str]] = [] if record else None
+
+    def add(self, statement: str, seconds: float):
+        stats = self
+        while stats is not None:
+            stats.statements += 1
+            stats.db_seconds += seconds
+            if stats.sql is not None:
+                stats.sql.append(normalize_sql(statement))
+            stats = stats.parent
+
+
+_current: ContextVar[Optional[StatementStats]] = ContextVar("statement_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._started
+    statement_duration.observe(elapsed)
+    stats = _current.get()
+    if stats is not None:
+        stats.add(statement, elapsed)
+    threshold = settings.SLOW_QUERY_THRESHOLD_MS
+    if threshold > 0 and elapsed * 1000 >= threshold:
+        slow_statements.inc()
+        where = f" in {stats.scope['method']} {_route(stats.scope)}" if stats is not None and stats.scope else ""
+        slow_query_logger.warning(
+            "Slow query: %.1f ms%s: %s",
+            elapsed * 1000, where, normalize_sql(statement)[:settings.SLOW_QUERY_LOG_MAX_CHARS],
+        )
+
+
+def instrument_engine(engine):
+    """Time every statement run on `engine` (an Engine, or an AsyncEngine's sync_engine)."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class QueryBudgetExceeded(AssertionError):
+    def __init__(self, message: str, stats: StatementStats):
+        super().__init__(message)
+        self.stats = stats
+
+
+@contextmanager
+def track_statements() -> Iterator[StatementStats]:
+    """Count the statements run inside the block, including by requests sent in-process."""
+    stats = StatementStats(_current.get(), record=True)
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def query_budget(max_statements: int, description: str = "block") -> Iterator[StatementStats]:
+    """Fail (QueryBudgetExceeded) when the block runs more than `max_statements` statements."""
+    with track_statements() as stats:
+        yield stats
+    if stats.statements > max_statements:
+        listing = "\n".join(f"  {sql}" for sql in stats.sql)
+        raise QueryBudgetExceeded(
+            f"{description} ran {stats.statements} SQL statements (budget {max_statements}):\n{listing}", stats
+        )
+
+
+class RequestMetricsMiddleware:
+    """Pure ASGI middleware, so streamed bodies are timed to the end and share the request's stats."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = StatementStats(_current.get())
+        stats.scope = scope
+        token = _current.set(stats)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            method, route = scope["method"], _route(scope)
+            request_duration.observe(time.perf_counter() - started, method=method, route=route)
+            requests_total.inc(method=method, route=route, status=str(status_code))
+            request_statements.observe(stats.statements, method=method, route=route)
+            request_db_time.observe(stats.db_seconds, method=method, route=route)
+
+
+def _route(scope) -> str:
+    """The matched route's template, e.g. /api/v1/cases/{id}; unmatched paths share one label."""
+    template = getattr(scope.get("route"), "path", None)
+    if not template:
+        return "unmatched"
+    # Routes of an included router may report their path without the router's prefix.
+    # The prefix has no parameters, so it is the part of the request path before them.
+    relative = [segment for segment in template.split("/") if segment]
+    segments = [segment for segment in scope["path"].split("/") if segment]
+    full = "/" + "/".join(segments[:len(segments) - len(relative)] + relative)
+    return full + "/" if template.endswith("/") and full != "/" else full
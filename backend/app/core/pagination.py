@@ -0,0 +1,132 @@
+"""
+Keyset pagination: rows are ordered by a sort key with the primary key as tie-breaker,
+newest first by default ((created_at, id) descending).
+
+The cursor is an opaque token encoding the sort key of the last row returned, so the
+next page is a range scan that starts where the previous one ended: its cost does not
+grow with depth, and rows inserted or deleted between requests cannot shift pages.
+"""
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from typing import Any, List, Optional, Tuple
+import base64
+import json
+
+from sqlalchemy import Select, literal, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursor(ValueError):
+    """The client sent a cursor this API did not issue (or one for a different sort)."""
+
+
+@dataclass
+class Page:
+    items: List[Any] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class SortKey:
+    """
+    A sort order for keyset pagination. `expression` must be non-null for every row
+    (NULLs never satisfy the cursor comparison); the model's id breaks ties.
+    """
+    name: str
+    expression: Any
+    descending: bool = True
+
+
+def default_sort(model: Any) -> SortKey:
+    return SortKey("-created_at", model.created_at)
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, Enum):
+        # Enum columns store member names
+        return value.name
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+
+def encode_cursor(sort: SortKey, value: Any, id: int) -> str:
+    raw = json.dumps([sort.name, _encode_value(value), id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: SortKey) -> Tuple[Any, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        name, value, id = json.loads(raw)
+        value, id = _decode_value(value), int(id)
+    except (ValueError, TypeError, KeyError):
+        raise InvalidCursor("Invalid pagination cursor")
+    if name != sort.name:
+        raise InvalidCursor("Pagination cursor belongs to a different sort order")
+    return value, id
+
+
+def keyset_select(
+    stmt: Select,
+    model: Any,
+    *,
+    limit: int,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    sort: Optional[SortKey] = None
+) -> Select:
+    """
+    Apply the page ordering and bounds to `stmt`, fetching one extra row (see paginate).
+    The sort key is added as the last selected column so the cursor can be built from it.
+    """
+    sort = sort or default_sort(model)
+    if sort.descending:
+        stmt = stmt.order_by(sort.expression.desc(), model.id.desc())
+    else:
+        stmt = stmt.order_by(sort.expression.asc(), model.id.asc())
+    if cursor:
+        value, last_id = decode_cursor(cursor, sort)
+        key = tuple_(sort.expression, model.id)
+        bound = tuple_(literal(value, sort.expression.type), literal(last_id, model.id.type))
+        stmt = stmt.where(key < bound if sort.descending else key > bound)
+    elif skip:
+        stmt = stmt.offset(skip)
+    return stmt.add_columns(sort.expression.label("_sort_key")).limit(limit + 1)
+
+
+async def paginate(
+    db: AsyncSession,
+    stmt: Select,
+    model: Any,
+    *,
+    limit: int,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    sort: Optional[SortKey] = None
+) -> Page:
+    """
+    Run `stmt` (a select of `model`) one page at a time. `cursor` continues from a
+    previous page; without one, the legacy `skip` offset is honoured so existing
+    clients keep working, on the same stable ordering.
+    """
+    if limit < 1:
+        # Endpoints bound limit to 1..MAX_PAGE_SIZE; an empty page has no last row to continue from
+        return Page(items=[])
+    sort = sort or default_sort(model)
+    # The extra row tells us whether there is a next page without a COUNT
+    rows = (await db.execute(keyset_select(stmt, model, limit=limit, cursor=cursor, skip=skip, sort=sort))).all()
+    if len(rows) <= limit:
+        return Page(items=[row[0] for row in rows])
+    rows = rows[:limit]
+    last, last_key = rows[-1][0], rows[-1][-1]
+    return Page(items=[row[0] for row in rows], next_cursor=encode_cursor(sort, last_key, last.id))
@@ -0,0 +1,37 @@
+"""
+Helpers for Postgres range-partitioned tables (activity_log, cases_archive, tasks_archive).
+
+Partitions are plain tables named <parent>_<suffix>, created on demand before rows for
+their range arrive. Several workers may race to create the same one; the loser's
+error is ignored.
+"""
+from datetime import date
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def create_range_partition(db: AsyncSession, parent: str, suffix: str, start: date, end: date) -> bool:
+    """Create partition <parent>_<suffix> for [start, end) unless it exists; commits. True if created."""
+    name = f"{parent}_{suffix}"
+    if await db.scalar(text("SELECT to_regclass(:name)"), {"name": name}) is not None:
+        return False
+    try:
+        await db.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {parent} "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        ))
+        await db.commit()
+        return True
+    except DBAPIError:
+        # Another worker created it first
+        await db.rollback()
+        return False
+
+
+async def ensure_yearly_partitions(db: AsyncSession, parent: str, years) -> int:
+    created = 0
+    for year in sorted(set(years)):
+        created += await create_range_partition(db, parent, f"{year:04d}", date(year, 1, 1), date(year + 1, 1, 1))
+    return created
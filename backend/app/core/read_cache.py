@@ -0,0 +1,127 @@
+"""
+Read-through cache for list endpoints, on top of the shared cache.
+
+Entries are keyed by route, a namespace version and the request's query string. Writes
+never delete entries; they bump the namespace version (e.g. "cases:42" for lawyer 42's
+cases), so every older entry becomes unreachable at once and simply expires. With
+read replicas, values loaded within REPLICA_MAX_LAG_SECONDS of a bump are returned but
+not stored, since a replica may not have the write yet.
+
+A miss is computed once per key: concurrent misses in the same worker await the same
+load, and across workers a short-lived lock lets one worker load while the others
+poll for its result (falling back to loading themselves if it does not arrive).
+
+Metrics: read_cache_requests_total{route,result} gives the hit ratio
+(result="hit" / all), and read_cache_saved_seconds_total{route} the load time that
+hits avoided, based on how long the cached value took to compute.
+"""
+from typing import Any, Awaitable, Callable, Dict, Iterable, Tuple
+import asyncio
+import hashlib
+import time
+
+from app.core.cache import Cache, cache
+from app.core.config import settings
+from app.core.database import replica_router
+from app.core.metrics import registry
+
+requests_total = registry.counter(
+    "read_cache_requests_total", "Read-through cache lookups by route and result (hit, miss, coalesced)",
+    ["route", "result"]
+)
+saved_seconds = registry.counter(
+    "read_cache_saved_seconds_total", "Load time avoided by read-through cache hits", ["route"]
+)
+load_seconds = registry.histogram(
+    "read_cache_load_seconds", "Time to compute a read-through cache miss", ["route"]
+)
+
+# Versions outlive any entry that embeds them
+VERSION_TTL_SECONDS = 7 * 24 * 3600
+LOCK_POLL_SECONDS = 0.05
+
+
+class ReadCache:
+    def __init__(self, backend: Cache, lock_seconds: float = 5.0):
+        self.backend = backend
+        self.lock_seconds = lock_seconds
+        self._inflight: Dict[str, "asyncio.Future[Any]"] = {}
+
+    async def _version(self, namespace: str) -> int:
+        return int(await self.backend.get(f"ver:{namespace}") or 0)
+
+    async def invalidate(self, *namespaces: str):
+        for namespace in namespaces:
+            await self.backend.incr(f"ver:{namespace}", ttl=VERSION_TTL_SECONDS)
+            await replica_router.mark_changed(f"ver:{namespace}")
+
+    async def get_or_load(
+        self,
+        route: str,
+        namespace: str,
+        params: Iterable[Tuple[str, str]],
+        ttl: float,
+        load: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Return the cached JSON value for these params, or `await load()` and cache it."""
+        if not settings.READ_CACHE_ENABLED or ttl <= 0:
+            return await load()
+        digest = hashlib.sha1(repr(sorted(params)).encode("utf-8")).hexdigest()[:20]
+        key = f"rt:{route}:{namespace}:v{await self._version(namespace)}:{digest}"
+
+        entry = await self.backend.get(key)
+        if entry is not None:
+            requests_total.inc(route=route, result="hit")
+            saved_seconds.inc(entry["cost"], route=route)
+            return entry["value"]
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            requests_total.inc(route=route, result="coalesced")
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await self._load(route, namespace, key, ttl, load)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            # Waiters see the exception; nobody else needs to retrieve it
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def _load(
+        self, route: str, namespace: str, key: str, ttl: float, load: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        locked = await self.backend.add(f"lock:{key}", 1, ttl=self.lock_seconds)
+        if not locked:
+            # Another worker is loading this key; wait for its result rather than piling on
+            deadline = time.monotonic() + self.lock_seconds
+            while time.monotonic() < deadline:
+                await asyncio.sleep(LOCK_POLL_SECONDS)
+                entry = await self.backend.get(key)
+                if entry is not None:
+                    requests_total.inc(route=route, result="coalesced")
+                    return entry["value"]
+
+        requests_total.inc(route=route, result="miss")
+        # Checked before loading: what matters is when the load reads
+        store = not await replica_router.changed_recently(f"ver:{namespace}")
+        started = time.perf_counter()
+        try:
+            value = await load()
+            cost = time.perf_counter() - started
+            load_seconds.observe(cost, route=route)
+            if store:
+                await self.backend.set(key, {"value": value, "cost": cost}, ttl=ttl)
+            return value
+        finally:
+            if locked:
+                await self.backend.delete(f"lock:{key}")
+
+
+read_cache = ReadCache(cache)
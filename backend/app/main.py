@@ -1,7 +1,17 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.v1.endpoints import auth, clients, cases, blog, tasks
+from fastapi.responses import JSONResponse, PlainTextResponse
+from app.api.v1.endpoints import auth, clients, cases, blog, tasks, dashboard
+from app.core.cache import cache
 from app.core.config import settings
+from app.core.database import async_engine, replica_router
+from app.core.instrumentation import RequestMetricsMiddleware
+from app.core.security import shutdown_hash_executor
+from app.core.metrics import registry
+from app.core.pagination import NEXT_CURSOR_HEADER, InvalidCursor
+from app.services.crm_service import NotOwner, NullField, RecordNotFound, VersionConflict
+from app.services.activity_log import activity_log
+from app.services.reminder_scheduler import reminder_scheduler
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -16,13 +26,38 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
+# Per-route latency, status codes, and SQL statements / DB time per request (/metrics)
+app.add_middleware(RequestMetricsMiddleware)
+
+@app.exception_handler(InvalidCursor)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursor):
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
+@app.exception_handler(RecordNotFound)
+async def record_not_found_handler(request: Request, exc: RecordNotFound):
+    return JSONResponse(status_code=404, content={"detail": str(exc)})
+
+@app.exception_handler(NotOwner)
+async def not_owner_handler(request: Request, exc: NotOwner):
+    return JSONResponse(status_code=403, content={"detail": str(exc)})
+
+@app.exception_handler(NullField)
+async def null_field_handler(request: Request, exc: NullField):
+    return JSONResponse(status_code=422, content={"detail": str(exc)})
+
+@app.exception_handler(VersionConflict)
+async def version_conflict_handler(request: Request, exc: VersionConflict):
+    return JSONResponse(status_code=409, content={"detail": str(exc), "current_version": exc.current_version})
+
 app.include_router(auth.router, prefix=f"{settings.API_V1_STR}/auth", tags=["auth"])
 app.include_router(clients.router, prefix=f"{settings.API_V1_STR}/clients", tags=["clients"])
 app.include_router(cases.router, prefix=f"{settings.API_V1_STR}/cases", tags=["cases"])
 app.include_router(blog.router, prefix=f"{settings.API_V1_STR}/blog", tags=["blog"])
 app.include_router(tasks.router, prefix=f"{settings.API_V1_STR}/tasks", tags=["tasks"])
+app.include_router(dashboard.router, prefix=f"{settings.API_V1_STR}/dashboard", tags=["dashboard"])
 
 @app.get("/")
 def read_root():
@@ -31,3 +66,26 @@ def read_root():
 @app.get("/health")
 def health_check():
     return {"status": "healthy"}
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    # Not routed through nginx; scraped directly from the backend container
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.on_event("startup")
+async def start_background_jobs():
+    replica_router.start()
+    if settings.ACTIVITY_LOG_ENABLED:
+        activity_log.start()
+    if settings.REMINDER_SCHEDULER_ENABLED:
+        reminder_scheduler.start()
+
+@app.on_event("shutdown")
+async def dispose_engine():
+    await reminder_scheduler.stop()
+    # Writes out queued audit events, so it must run before the engine is disposed
+    await activity_log.stop()
+    await replica_router.stop()
+    await async_engine.dispose()
+    await cache.close()
+    shutdown_hash_executor()
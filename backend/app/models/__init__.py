@@ -4,6 +4,8 @@ from app.models.client import Client, ClientStatus
 from app.models.case import Case, CaseStatus, CasePriority
 from app.models.task import Task, TaskStatus, TaskPriority
 from app.models.blog import BlogCategory, BlogPost, NewsletterSubscriber, ContactInquiry, BlogStatus
+from app.models.activity import ActivityAction, ActivityEvent
+from app.models.archive import ArchivedCase, ArchivedTask
 
 # Export all models for Alembic
 __all__ = [
@@ -23,4 +25,8 @@ __all__ = [
     "NewsletterSubscriber",
     "ContactInquiry",
     "BlogStatus",
+    "ActivityAction",
+    "ActivityEvent",
+    "ArchivedCase",
+    "ArchivedTask",
 ]
@@ -0,0 +1,40 @@
+from sqlalchemy import BigInteger, Column, DateTime, Identity, Index, Integer, String
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from app.core.database import Base
+import enum
+
+class ActivityAction(str, enum.Enum):
+    VIEW = "view"
+    CREATE = "create"
+    UPDATE = "update"
+    IMPORT = "import"
+    EXPORT = "export"
+    LOGIN = "login"
+    LOGIN_FAILED = "login_failed"
+    REGISTER = "register"
+
+class ActivityEvent(Base):
+    """
+    One audit-trail entry; rows are only ever inserted. The table is range-partitioned
+    by month on occurred_at (see app/services/activity_log.py), so the primary key
+    includes it.
+    """
+    __tablename__ = "activity_log"
+
+    id = Column(BigInteger, Identity(), primary_key=True)
+    occurred_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
+    # No foreign key: the trail outlives the users and records it mentions
+    user_id = Column(Integer, nullable=True)
+    # An ActivityAction value; stored as text so new actions need no enum migration
+    action = Column(String(32), nullable=False)
+    entity_type = Column(String(16), nullable=True)
+    entity_id = Column(Integer, nullable=True)
+    details = Column(JSONB, nullable=True)
+
+    __table_args__ = (
+        # "Who touched this case?" and "what did this user do?", newest first
+        Index("ix_activity_log_entity", entity_type, entity_id, occurred_at.desc()),
+        Index("ix_activity_log_user_id", user_id, occurred_at.desc()),
+        {"postgresql_partition_by": "RANGE (occurred_at)"},
+    )
@@ -0,0 +1,69 @@
+from sqlalchemy import Column, Computed, Index, Integer, String, Text, Enum, DateTime
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
+from app.core.database import Base
+from app.models.case import CasePriority, CaseStatus
+from app.models.task import TaskPriority, TaskStatus
+
+# Closed matters and finished tasks moved out of the hot tables by
+# app/services/archive_service.py. Both tables are range-partitioned by created_at year,
+# so the primary keys include it. They have no foreign keys: archived rows are frozen
+# copies and must not pin (or cascade with) the rows they mention.
+
+class ArchivedCase(Base):
+    __tablename__ = "cases_archive"
+
+    id = Column(Integer, primary_key=True)
+    client_id = Column(Integer, nullable=False, index=True)
+    lawyer_id = Column(Integer, nullable=True)
+    case_number = Column(String(100), nullable=False, index=True)
+    title = Column(String(255), nullable=False)
+    description = Column(Text, nullable=True)
+    status = Column(Enum(CaseStatus), nullable=False)
+    priority = Column(Enum(CasePriority), nullable=False)
+    created_at = Column(DateTime(timezone=True), primary_key=True)
+    updated_at = Column(DateTime(timezone=True))
+    closed_at = Column(DateTime(timezone=True), nullable=True)
+    version = Column(Integer, nullable=False)
+    archived_at = Column(DateTime(timezone=True), nullable=False)
+
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'B')",
+        persisted=True
+    )))
+
+    __table_args__ = (
+        Index("ix_cases_archive_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_cases_archive_lawyer_id_created_at", lawyer_id, created_at.desc(), id.desc()),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+    # Read-only links for include=client / include=tasks on archived cases
+    client = relationship("Client", primaryjoin="foreign(ArchivedCase.client_id) == Client.id", viewonly=True)
+    tasks = relationship(
+        "ArchivedTask", primaryjoin="ArchivedCase.id == foreign(ArchivedTask.case_id)", viewonly=True
+    )
+
+class ArchivedTask(Base):
+    __tablename__ = "tasks_archive"
+
+    id = Column(Integer, primary_key=True)
+    case_id = Column(Integer, nullable=False, index=True)
+    assigned_to = Column(Integer, nullable=True)
+    title = Column(String(255), nullable=False)
+    description = Column(Text, nullable=True)
+    due_date = Column(DateTime(timezone=True), nullable=True)
+    status = Column(Enum(TaskStatus), nullable=False)
+    priority = Column(Enum(TaskPriority), nullable=False)
+    created_at = Column(DateTime(timezone=True), primary_key=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    version = Column(Integer, nullable=False)
+    reminded_at = Column(DateTime(timezone=True), nullable=True)
+    overdue_notified_at = Column(DateTime(timezone=True), nullable=True)
+    archived_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index("ix_tasks_archive_assigned_to_created_at", assigned_to, created_at.desc(), id.desc()),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Enum, DateTime, Boolean
+from sqlalchemy import Column, Index, Integer, String, Text, ForeignKey, Enum, DateTime, Boolean
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -36,6 +36,11 @@ class BlogPost(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # Serves list queries: filter on status, newest first (see app/core/pagination.py)
+    __table_args__ = (
+        Index("ix_blog_posts_status_created_at", status, created_at.desc(), id.desc()),
+    )
+
     # Relationships
     author = relationship("User", back_populates="blog_posts")
     category = relationship("BlogCategory", back_populates="posts")
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Enum, DateTime
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Computed, Index, Integer, String, Text, ForeignKey, Enum, DateTime
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
 import enum
@@ -20,7 +21,7 @@ class Case(Base):
     __tablename__ = "cases"
 
     id = Column(Integer, primary_key=True, index=True)
-    client_id = Column(Integer, ForeignKey("clients.id", ondelete="CASCADE"), nullable=False)
+    client_id = Column(Integer, ForeignKey("clients.id", ondelete="CASCADE"), nullable=False, index=True)
     lawyer_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
     case_number = Column(String(100), unique=True, index=True, nullable=False)
     title = Column(String(255), nullable=False)
@@ -30,6 +31,21 @@ class Case(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     closed_at = Column(DateTime(timezone=True), nullable=True)
+    # Bumped by every update; writes that carry a stale version are rejected
+    version = Column(Integer, nullable=False, server_default="1")
+
+    # Full-text search document, maintained by Postgres on every write; never loaded by default
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'B')",
+        persisted=True
+    )))
+
+    __table_args__ = (
+        Index("ix_cases_search_vector", "search_vector", postgresql_using="gin"),
+        # Serves list queries: filter on lawyer_id, newest first (see app/core/pagination.py)
+        Index("ix_cases_lawyer_id_created_at", lawyer_id, created_at.desc(), id.desc()),
+    )
 
     # Relationships
     client = relationship("Client", back_populates="cases")
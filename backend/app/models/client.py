@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Enum, DateTime
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Computed, Index, Integer, String, Text, ForeignKey, Enum, DateTime
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
 import enum
@@ -22,6 +23,21 @@ class Client(Base):
     notes = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Bumped by every update; writes that carry a stale version are rejected
+    version = Column(Integer, nullable=False, server_default="1")
+
+    # Full-text search document, maintained by Postgres on every write; never loaded by default
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(notes, '')), 'B')",
+        persisted=True
+    )))
+
+    __table_args__ = (
+        Index("ix_clients_search_vector", "search_vector", postgresql_using="gin"),
+        # Serves list queries: filter on lawyer_id, newest first (see app/core/pagination.py)
+        Index("ix_clients_lawyer_id_created_at", lawyer_id, created_at.desc(), id.desc()),
+    )
 
     # Relationships
     lawyer = relationship("User", back_populates="clients")
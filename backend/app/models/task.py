@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Enum, DateTime
+from sqlalchemy import Column, Index, Integer, String, Text, ForeignKey, Enum, DateTime, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -16,11 +16,14 @@ class TaskPriority(str, enum.Enum):
     HIGH = "high"
     URGENT = "urgent"
 
+# Tasks that still need doing (and so can become overdue)
+OPEN_TASK_STATUSES = (TaskStatus.PENDING, TaskStatus.IN_PROGRESS)
+
 class Task(Base):
     __tablename__ = "tasks"
 
     id = Column(Integer, primary_key=True, index=True)
-    case_id = Column(Integer, ForeignKey("cases.id", ondelete="CASCADE"), nullable=False)
+    case_id = Column(Integer, ForeignKey("cases.id", ondelete="CASCADE"), nullable=False, index=True)
     assigned_to = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
     title = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
@@ -29,6 +32,21 @@ class Task(Base):
     priority = Column(Enum(TaskPriority), default=TaskPriority.MEDIUM, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     completed_at = Column(DateTime(timezone=True), nullable=True)
+    # Bumped by every update; writes that carry a stale version are rejected
+    version = Column(Integer, nullable=False, server_default="1")
+    # Set when the due-date reminder / overdue notice is sent; cleared when due_date changes
+    reminded_at = Column(DateTime(timezone=True), nullable=True)
+    overdue_notified_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # Serves list queries: filter on assigned_to, newest first (see app/core/pagination.py)
+        Index("ix_tasks_assigned_to_created_at", assigned_to, created_at.desc(), id.desc()),
+        # Due-date range scans of the reminder scheduler (app/services/reminder_scheduler.py)
+        Index(
+            "ix_tasks_open_due_date", due_date,
+            postgresql_where=text("status IN ('PENDING', 'IN_PROGRESS') AND overdue_notified_at IS NULL")
+        ),
+    )
 
     # Relationships
     case = relationship("Case", back_populates="tasks")
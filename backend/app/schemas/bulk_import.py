@@ -0,0 +1,17 @@
+from typing import List
+from pydantic import BaseModel
+
+class ImportRowError(BaseModel):
+    row: int
+    errors: List[str]
+
+class ImportResult(BaseModel):
+    total: int
+    imported: int
+    failed: int
+    # At most IMPORT_MAX_REPORTED_ERRORS rows; errors_truncated is set when more failed
+    errors: List[ImportRowError] = []
+    errors_truncated: bool = False
+
+    class Config:
+        from_attributes = True
@@ -1,7 +1,9 @@
-from typing import Optional
+from typing import List, Literal, Optional
 from pydantic import BaseModel
 from datetime import datetime
 from app.models.case import CaseStatus, CasePriority
+from app.models.client import ClientStatus
+from app.schemas.task import Task
 
 class CaseBase(BaseModel):
     client_id: int
@@ -20,6 +22,8 @@ class CaseUpdate(CaseBase):
     title: Optional[str] = None
     status: Optional[CaseStatus] = None
     priority: Optional[CasePriority] = None
+    # The version last read; the update fails with 409 if the record changed since
+    version: int
 
 class CaseInDBBase(CaseBase):
     id: int
@@ -27,9 +31,44 @@ class CaseInDBBase(CaseBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
     closed_at: Optional[datetime] = None
+    version: int
 
     class Config:
         from_attributes = True
 
 class Case(CaseInDBBase):
     pass
+
+# Related records that can be loaded alongside cases with include=
+CaseInclude = Literal["client", "tasks"]
+
+class CaseClient(BaseModel):
+    id: int
+    name: str
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    status: ClientStatus
+
+    class Config:
+        from_attributes = True
+
+class CaseDetail(Case):
+    # Only present when requested with include=
+    client: Optional[CaseClient] = None
+    tasks: Optional[List[Task]] = None
+
+CaseSort = Literal[
+    "-created_at", "created_at", "-title", "title", "-priority", "priority",
+    "-status", "status", "-case_number", "case_number", "relevance"
+]
+
+class CaseFilter(BaseModel):
+    status: Optional[List[CaseStatus]] = None
+    priority: Optional[List[CasePriority]] = None
+    client_id: Optional[int] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+    # Full-text search over title and description (web-search syntax: "quoted", -exclude, or)
+    q: Optional[str] = None
+    # Defaults to relevance when searching, newest first otherwise
+    sort: Optional[CaseSort] = None
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Literal, Optional
 from pydantic import BaseModel, EmailStr
 from datetime import datetime
 from app.models.client import ClientStatus
@@ -17,15 +17,29 @@ class ClientCreate(ClientBase):
 class ClientUpdate(ClientBase):
     name: Optional[str] = None
     status: Optional[ClientStatus] = None
+    # The version last read; the update fails with 409 if the record changed since
+    version: int
 
 class ClientInDBBase(ClientBase):
     id: int
     lawyer_id: Optional[int] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
+    version: int
 
     class Config:
         from_attributes = True
 
 class Client(ClientInDBBase):
     pass
+
+ClientSort = Literal["-created_at", "created_at", "-name", "name", "-status", "status", "relevance"]
+
+class ClientFilter(BaseModel):
+    status: Optional[List[ClientStatus]] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+    # Full-text search over name and notes
+    q: Optional[str] = None
+    # Defaults to relevance when searching, newest first otherwise
+    sort: Optional[ClientSort] = None
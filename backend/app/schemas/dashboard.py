@@ -0,0 +1,25 @@
+from typing import Dict, List, Optional
+from pydantic import BaseModel
+from datetime import datetime
+from app.models.task import TaskStatus, TaskPriority
+
+class UpcomingDeadline(BaseModel):
+    task_id: int
+    case_id: int
+    title: str
+    due_date: datetime
+    status: TaskStatus
+    priority: TaskPriority
+
+class DashboardSummary(BaseModel):
+    # Every case status and priority is present, zero when there are none
+    cases_by_status: Dict[str, int]
+    # Priorities of active (open or in progress) cases only
+    active_cases_by_priority: Dict[str, int]
+    active_cases: int
+    total_clients: int
+    active_clients: int
+    open_tasks: int
+    overdue_tasks: int
+    upcoming_deadlines: List[UpcomingDeadline] = []
+    generated_at: Optional[datetime] = None
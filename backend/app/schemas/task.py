@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime
 from app.models.task import TaskStatus, TaskPriority
@@ -19,15 +19,37 @@ class TaskUpdate(TaskBase):
     title: Optional[str] = None
     status: Optional[TaskStatus] = None
     priority: Optional[TaskPriority] = None
+    # The version last read; the update fails with 409 if the record changed since
+    version: int
 
 class TaskInDBBase(TaskBase):
     id: int
     assigned_to: Optional[int] = None
     created_at: datetime
     completed_at: Optional[datetime] = None
+    reminded_at: Optional[datetime] = None
+    overdue_notified_at: Optional[datetime] = None
+    version: int
 
     class Config:
         from_attributes = True
 
 class Task(TaskInDBBase):
     pass
+
+# Batch endpoints
+class TaskBatchUpdateItem(TaskUpdate):
+    id: int
+
+class TaskBatchItem(BaseModel):
+    # Position of the item in the request list
+    index: int
+    # HTTP status the item would have had as a single request (201, 200, 403, 404, 409, 422)
+    status_code: int
+    task: Optional[Task] = None
+    error: Optional[str] = None
+
+class TaskBatchResult(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[TaskBatchItem]
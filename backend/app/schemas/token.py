@@ -6,5 +6,6 @@ class Token(BaseModel):
     token_type: str
 
 class TokenData(BaseModel):
+    user_id: Optional[int] = None
     email: Optional[str] = None
     role: Optional[str] = None
@@ -11,7 +11,11 @@ class UserBase(BaseModel):
 class UserCreate(UserBase):
     password: str
 
-class UserUpdate(UserBase):
+class UserUpdate(BaseModel):
+    email: Optional[EmailStr] = None
+    role: Optional[UserRole] = None
+    full_name: Optional[str] = None
+    is_active: Optional[bool] = None
     password: Optional[str] = None
 
 class UserInDBBase(UserBase):
@@ -0,0 +1,50 @@
+"""
+Move cold rows out of the hot cases and tasks tables into the year-partitioned
+archives (see app/services/archive_service.py). Safe to run while the API serves
+traffic, and to re-run; schedule it nightly, e.g. from cron:
+    python app/scripts/archive_data.py [--cases-after-days 365] [--tasks-after-days 180]
+"""
+import sys
+import os
+
+# Add the parent directory to sys.path to allow imports from app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import argparse
+import asyncio
+import time
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, async_engine
+from app.services import archive_service
+
+
+async def run() -> int:
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        report = await archive_service.archive(db)
+    await async_engine.dispose()
+    print(
+        f"Archived {report.cases} cases and {report.tasks} tasks "
+        f"in {report.batches} batches ({time.perf_counter() - started:.1f}s)"
+    )
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Archive closed cases and finished tasks")
+    parser.add_argument("--cases-after-days", type=int, help="defaults to ARCHIVE_CASES_AFTER_DAYS")
+    parser.add_argument("--tasks-after-days", type=int, help="defaults to ARCHIVE_TASKS_AFTER_DAYS")
+    parser.add_argument("--batch-size", type=int, help="defaults to ARCHIVE_BATCH_SIZE")
+    args = parser.parse_args()
+    if args.cases_after_days is not None:
+        settings.ARCHIVE_CASES_AFTER_DAYS = args.cases_after_days
+    if args.tasks_after_days is not None:
+        settings.ARCHIVE_TASKS_AFTER_DAYS = args.tasks_after_days
+    if args.batch_size is not None:
+        settings.ARCHIVE_BATCH_SIZE = args.batch_size
+    return asyncio.run(run())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
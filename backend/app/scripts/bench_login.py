@@ -0,0 +1,68 @@
+"""
+Login-burst benchmark: fires concurrent logins and, at the same time, probes /health
+to show whether password hashing starves unrelated requests on the worker.
+
+Usage (against a running backend):
+    python app/scripts/bench_login.py --logins 200 --concurrency 50
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[max(int(len(values) * q) - 1, 0)] * 1000 if values else float("nan")
+
+
+async def run(args):
+    limits = httpx.Limits(max_connections=args.concurrency + 5)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=120) as client:
+        login_latencies, probe_latencies, errors = [], [], 0
+        remaining = args.logins
+        done = asyncio.Event()
+
+        async def login_worker():
+            nonlocal remaining, errors
+            while remaining > 0:
+                remaining -= 1
+                started = time.perf_counter()
+                response = await client.post(
+                    "/api/v1/auth/login", data={"username": args.email, "password": args.password}
+                )
+                if response.status_code != 200:
+                    errors += 1
+                login_latencies.append(time.perf_counter() - started)
+
+        async def probe():
+            while not done.is_set():
+                started = time.perf_counter()
+                await client.get("/health")
+                probe_latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(0.05)
+
+        prober = asyncio.create_task(probe())
+        started = time.perf_counter()
+        await asyncio.gather(*(login_worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await prober
+
+    print(f"{args.logins} logins, concurrency {args.concurrency}")
+    print(f"  throughput: {args.logins / elapsed:.1f} logins/s ({elapsed:.2f}s total, {errors} errors)")
+    print(f"  login p50/p95: {statistics.median(login_latencies) * 1000:.0f} / {percentile(login_latencies, 0.95):.0f} ms")
+    print(f"  /health during burst p50/p95/max: {statistics.median(probe_latencies) * 1000:.0f} / "
+          f"{percentile(probe_latencies, 0.95):.0f} / {max(probe_latencies) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", default="counselor@oscarlegal.com")
+    parser.add_argument("--password", default="password123")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,83 @@
+"""
+Query-count regression check for endpoints that embed related records, and for
+single-statement writes.
+
+Each request is sent in-process to the API as the given lawyer, and every SQL
+statement it issues is counted (app.core.instrumentation.track_statements). A
+relationship that falls back to lazy loading shows up as one extra query per row, so
+the count exceeds the budget; the statements of a failing request are listed.
+
+Run against a seeded database, e.g. in CI:
+    alembic upgrade head && python app/scripts/seed_db.py && python app/scripts/check_query_counts.py
+Exits non-zero if any endpoint exceeded its budget.
+"""
+import sys
+import os
+
+# Add the parent directory to sys.path to allow imports from app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import argparse
+import asyncio
+
+import httpx
+from sqlalchemy import select
+from app.core.database import SessionLocal, async_engine
+from app.core.instrumentation import track_statements
+from app.core.security import create_access_token
+from app.main import app
+from app.models.case import Case
+from app.models.user import User
+
+
+def budgets(case_id: int, version: int):
+    # (description, method, path, JSON body, maximum statements)
+    return [
+        ("case list", "GET", "/api/v1/cases/?limit=50", None, 1),
+        ("case list with client and tasks", "GET", "/api/v1/cases/?limit=50&include=client&include=tasks", None, 2),
+        ("case detail with client and tasks", "GET", f"/api/v1/cases/{case_id}?include=client&include=tasks", None, 2),
+        # An update with no fields only bumps the version: one UPDATE ... RETURNING
+        ("case update", "PUT", f"/api/v1/cases/{case_id}", {"version": version}, 1),
+    ]
+
+
+async def run(email: str) -> int:
+    with SessionLocal() as db:
+        user = db.scalar(select(User).where(User.email == email))
+        if user is None:
+            print(f"No user with email {email}", file=sys.stderr)
+            return 2
+        case = db.execute(select(Case.id, Case.version).where(Case.lawyer_id == user.id).limit(1)).first()
+        if case is None:
+            print(f"{email} has no cases to check", file=sys.stderr)
+            return 2
+        token = create_access_token(user.email, claims={"uid": user.id, "role": user.role.value})
+
+    headers = {"Authorization": f"Bearer {token}"}
+    failures = 0
+    checks = budgets(*case)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://check") as client:
+        # Warm the principal cache so only the endpoint's own queries are counted
+        await client.get("/api/v1/auth/me", headers=headers)
+        for description, method, path, body, budget in checks:
+            with track_statements() as stats:
+                response = await client.request(method, path, json=body, headers=headers)
+            ok = response.status_code == 200 and stats.statements <= budget
+            print(f"[{'ok' if ok else 'FAIL'}] {description}: {stats.statements} queries (budget {budget}), "
+                  f"HTTP {response.status_code}")
+            if stats.statements > budget:
+                print("\n".join(f"    {sql}" for sql in stats.sql))
+            failures += not ok
+    await async_engine.dispose()
+    print(f"{len(checks) - failures}/{len(checks)} query budgets ok")
+    return 1 if failures else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check per-endpoint SQL query budgets")
+    parser.add_argument("--email", default="counselor@oscarlegal.com", help="lawyer to run the requests as")
+    return asyncio.run(run(parser.parse_args().email))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
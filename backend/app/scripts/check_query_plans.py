@@ -0,0 +1,103 @@
+"""
+Query-plan regression check for the API's hot queries.
+
+Each query is EXPLAINed against the configured database with sequential scans
+disabled, so the planner only falls back to a Seq Scan when no usable index
+exists (a small dev table would otherwise legitimately prefer one). Paginated
+list queries must also be served in index order, without a Sort node, with
+their filters and cursor bound applied as index conditions.
+
+Run after migrations, e.g. in CI:
+    alembic upgrade head && python app/scripts/check_query_plans.py
+Exits non-zero if any query regressed.
+"""
+import sys
+import os
+
+# Add the parent directory to sys.path to allow imports from app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, List, Tuple
+from sqlalchemy import event, func, select, text
+from app.core.database import engine
+from app.core.pagination import default_sort, encode_cursor, keyset_select
+from app.models.blog import BlogPost, BlogStatus
+from app.models.case import Case
+from app.models.client import Client
+from app.models.task import Task
+from app.services.dashboard_service import summary_query
+from app.services.reminder_scheduler import upcoming_query
+
+CURSOR = encode_cursor(default_sort(Case), datetime(2024, 1, 1, tzinfo=timezone.utc), 1000)
+
+# (description, statement, must_avoid_sort)
+CHECKS = [
+    ("clients by lawyer, first page", keyset_select(select(Client).where(Client.lawyer_id == 1), Client, limit=100), True),
+    ("clients by lawyer, cursor page", keyset_select(select(Client).where(Client.lawyer_id == 1), Client, limit=100, cursor=CURSOR), True),
+    ("cases by lawyer, first page", keyset_select(select(Case).where(Case.lawyer_id == 1), Case, limit=100), True),
+    ("cases by lawyer, cursor page", keyset_select(select(Case).where(Case.lawyer_id == 1), Case, limit=100, cursor=CURSOR), True),
+    ("tasks by assignee, first page", keyset_select(select(Task).where(Task.assigned_to == 1), Task, limit=100), True),
+    ("tasks by assignee, cursor page", keyset_select(select(Task).where(Task.assigned_to == 1), Task, limit=100, cursor=CURSOR), True),
+    ("published posts, first page", keyset_select(select(BlogPost).where(BlogPost.status == BlogStatus.PUBLISHED), BlogPost, limit=10), True),
+    ("cases of a client", select(Case).where(Case.client_id == 1), False),
+    ("tasks of a case", select(Task).where(Task.case_id == 1), False),
+    ("case full-text search", select(Case).where(Case.search_vector.op("@@")(func.websearch_to_tsquery("english", "lease"))), False),
+    ("client full-text search", select(Client).where(Client.search_vector.op("@@")(func.websearch_to_tsquery("english", "smith"))), False),
+    ("tasks joined to a client's cases", select(Task).join(Case, Task.case_id == Case.id).where(Case.client_id == 1), False),
+    ("blog post by slug", select(BlogPost).where(BlogPost.slug == "x", BlogPost.status == BlogStatus.PUBLISHED), False),
+    ("dashboard summary", summary_query(1, datetime(2024, 1, 1, tzinfo=timezone.utc)), False),
+    ("tasks with upcoming reminders", upcoming_query(
+        datetime(2024, 1, 1, tzinfo=timezone.utc), datetime(2024, 1, 1, 0, 10, tzinfo=timezone.utc), timedelta(days=1)
+    ), False),
+]
+
+
+def plan_nodes(plan: dict) -> Iterator[dict]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def _explain(conn, cursor, statement, parameters, context, executemany):
+    # Plan the exact SQL and bound parameters the application would send
+    return "EXPLAIN (FORMAT JSON) " + statement, parameters
+
+
+def check(conn, statement, must_avoid_sort: bool) -> Tuple[List[str], str]:
+    event.listen(conn, "before_cursor_execute", _explain, retval=True)
+    try:
+        plan = conn.execute(statement).scalar()[0]["Plan"]
+    finally:
+        event.remove(conn, "before_cursor_execute", _explain)
+    problems = []
+    for node in plan_nodes(plan):
+        if node["Node Type"] == "Seq Scan":
+            problems.append(f"sequential scan on {node['Relation Name']}")
+        if must_avoid_sort and node["Node Type"] in ("Sort", "Incremental Sort"):
+            problems.append("sort instead of index order")
+        if must_avoid_sort and "Index Name" in node and "Filter" in node:
+            # The cursor bound must be an index condition, or deep pages scan every earlier row
+            problems.append(f"rows filtered after {node['Index Name']}: {node['Filter']}")
+    summary = " -> ".join(
+        n["Node Type"] + (f" using {n['Index Name']}" if "Index Name" in n else "") for n in plan_nodes(plan)
+    )
+    return problems, summary
+
+
+def main() -> int:
+    failures = 0
+    with engine.connect() as conn:
+        conn.execute(text("SET enable_seqscan = off"))
+        for description, statement, must_avoid_sort in CHECKS:
+            problems, summary = check(conn, statement, must_avoid_sort)
+            status = "FAIL" if problems else "ok"
+            print(f"[{status}] {description}: {summary}")
+            for problem in problems:
+                print(f"       {problem}")
+            failures += bool(problems)
+    print(f"{len(CHECKS) - failures}/{len(CHECKS)} query plans ok")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""
+Read-replica routing check, run against a primary and at least one streaming replica
+(DATABASE_REPLICA_URLS), e.g. the two-node setup in docker-compose.replica.yml:
+    docker compose -f docker-compose.yml -f docker-compose.replica.yml up -d
+    docker compose exec backend python app/scripts/check_replica_routing.py
+
+Requests are sent in-process to the API as the given lawyer, and every SQL statement
+is attributed to the node that ran it. Checks that reads go to a replica, writes to
+the primary, that the writer's next reads stay on the primary, and that reads fall
+back to the primary when the replica lags. Exits non-zero if any check fails.
+"""
+import sys
+import os
+
+# Add the parent directory to sys.path to allow imports from app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import argparse
+import asyncio
+from collections import Counter
+
+import httpx
+from sqlalchemy import event, select
+from app.core.cache import cache
+from app.core.config import settings
+from app.core.database import SessionLocal, async_engine, replica_router
+from app.core.security import create_access_token
+from app.main import app
+from app.models.case import Case
+from app.models.user import User
+
+
+async def run(email: str) -> int:
+    if not replica_router.enabled:
+        print("DATABASE_REPLICA_URLS is not set", file=sys.stderr)
+        return 2
+    with SessionLocal() as db:
+        user = db.scalar(select(User).where(User.email == email))
+        if user is None:
+            print(f"No user with email {email}", file=sys.stderr)
+            return 2
+        case = db.execute(select(Case.id, Case.version).where(Case.lawyer_id == user.id).limit(1)).first()
+        if case is None:
+            print(f"{email} has no cases to check", file=sys.stderr)
+            return 2
+        token = create_access_token(user.email, claims={"uid": user.id, "role": user.role.value})
+
+    headers = {"Authorization": f"Bearer {token}"}
+    statements = Counter()
+    listeners = [(async_engine.sync_engine, "primary")]
+    listeners += [(replica.engine.sync_engine, "replica") for replica in replica_router.replicas]
+
+    def counter(node: str):
+        def count(conn, cursor, statement, parameters, context, executemany):
+            statements[node] += 1
+        return count
+
+    results = []
+
+    async def expect(description: str, method: str, path: str, body, node: str):
+        statements.clear()
+        response = await client.request(method, path, json=body, headers=headers)
+        ok = response.status_code == 200 and statements[node] > 0 and sum(statements.values()) == statements[node]
+        print(f"[{'ok' if ok else 'FAIL'}] {description}: primary {statements['primary']}, "
+              f"replica {statements['replica']} statements, HTTP {response.status_code}")
+        results.append(ok)
+
+    await replica_router.check()
+    for replica in replica_router.replicas:
+        ok = replica.usable(replica.checked_at)
+        print(f"[{'ok' if ok else 'FAIL'}] replica {replica.engine.url.render_as_string()}: "
+              f"lag {replica.lag}s (limit {settings.REPLICA_MAX_LAG_SECONDS}s)")
+        results.append(ok)
+
+    await cache.delete(replica_router.sticky_key(user.id))
+    handlers = [(engine, counter(node)) for engine, node in listeners]
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://check") as client:
+        # Warm the principal cache so only the endpoint's own queries are counted
+        await client.get("/api/v1/auth/me", headers=headers)
+        for engine, handler in handlers:
+            event.listen(engine, "before_cursor_execute", handler)
+        try:
+            # Task lists are not read-cached, so every request reaches the database
+            await expect("read", "GET", "/api/v1/tasks/?limit=5", None, "replica")
+            # An update with no fields only bumps the version
+            await expect("write", "PUT", f"/api/v1/cases/{case.id}", {"version": case.version}, "primary")
+            await expect("read after own write", "GET", "/api/v1/tasks/?limit=5", None, "primary")
+            await cache.delete(replica_router.sticky_key(user.id))
+            await expect("read once the write has replicated", "GET", "/api/v1/tasks/?limit=5", None, "replica")
+            for replica in replica_router.replicas:
+                replica.lag = settings.REPLICA_MAX_LAG_SECONDS + 1
+            await expect("read while replicas lag", "GET", "/api/v1/tasks/?limit=5", None, "primary")
+        finally:
+            for engine, handler in handlers:
+                event.remove(engine, "before_cursor_execute", handler)
+    await replica_router.stop()
+    await async_engine.dispose()
+    failures = results.count(False)
+    print(f"{len(results) - failures}/{len(results)} replica routing checks ok")
+    return 1 if failures else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check read-replica routing")
+    parser.add_argument("--email", default="counselor@oscarlegal.com", help="lawyer to run the requests as")
+    return asyncio.run(run(parser.parse_args().email))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""
+Bulk-import clients or cases for a lawyer from a CSV or NDJSON file, straight into the
+database (same code path as POST /api/v1/{clients,cases}/import).
+
+Usage:
+    python app/scripts/import_data.py clients clients.csv --lawyer-email counselor@oscarlegal.com
+    python app/scripts/import_data.py cases cases.ndjson --lawyer-id 1 --errors errors.ndjson
+
+Every rejected row is written to --errors (one JSON object per line); the summary is
+printed at the end. Exits non-zero if any row failed.
+"""
+import sys
+import os
+
+# Add the parent directory to sys.path to allow imports from app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import argparse
+import asyncio
+import json
+import time
+
+from sqlalchemy import select
+from app.core.database import AsyncSessionLocal, async_engine
+from app.models.user import User
+from app.services import import_service
+
+READ_SIZE = 1 << 16
+
+
+async def read_file(path: str):
+    with open(path, "rb") as f:
+        while chunk := f.read(READ_SIZE):
+            yield chunk
+
+
+async def run(args) -> int:
+    fmt = args.format or (import_service.NDJSON if args.path.endswith((".ndjson", ".jsonl")) else import_service.CSV)
+    errors_file = open(args.errors, "w") if args.errors else None
+
+    def on_error(error):
+        if errors_file:
+            errors_file.write(json.dumps(error) + "\n")
+
+    try:
+        async with AsyncSessionLocal() as db:
+            if args.lawyer_id is not None:
+                lawyer_id = args.lawyer_id
+            else:
+                lawyer_id = await db.scalar(select(User.id).where(User.email == args.lawyer_email))
+                if lawyer_id is None:
+                    print(f"No user with email {args.lawyer_email}", file=sys.stderr)
+                    return 2
+            importer = import_service.import_clients if args.kind == "clients" else import_service.import_cases
+            started = time.perf_counter()
+            report = await importer(db, lawyer_id, read_file(args.path), fmt, on_error=on_error)
+            elapsed = time.perf_counter() - started
+    finally:
+        if errors_file:
+            errors_file.close()
+        await async_engine.dispose()
+
+    rate = report.total / elapsed * 60 if elapsed else 0
+    print(f"{report.total} rows, {report.imported} imported, {report.failed} failed "
+          f"in {elapsed:.1f}s ({rate:,.0f} rows/min)")
+    for error in report.errors[:10]:
+        print(f"  row {error['row']}: {'; '.join(error['errors'])}")
+    return 1 if report.failed else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("kind", choices=["clients", "cases"])
+    parser.add_argument("path")
+    owner = parser.add_mutually_exclusive_group(required=True)
+    owner.add_argument("--lawyer-id", type=int)
+    owner.add_argument("--lawyer-email")
+    parser.add_argument("--format", choices=[import_service.CSV, import_service.NDJSON])
+    parser.add_argument("--errors", help="write every rejected row to this NDJSON file")
+    return asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
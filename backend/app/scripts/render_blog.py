@@ -0,0 +1,50 @@
+"""
+Rebuild the pre-rendered blog pages (one <slug>.html per published post, plus
+index.html) in BLOG_STATIC_DIR, e.g. after deploying a template change:
+    python app/scripts/render_blog.py [--dir /path/to/output]
+"""
+import sys
+import os
+
+# Add the parent directory to sys.path to allow imports from app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import argparse
+import asyncio
+
+from sqlalchemy import select
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, async_engine
+from app.models.blog import BlogPost, BlogStatus
+from app.services import blog_publisher
+
+
+async def run() -> int:
+    if not settings.BLOG_STATIC_DIR:
+        print("BLOG_STATIC_DIR is not set", file=sys.stderr)
+        return 2
+    rendered = 0
+    async with AsyncSessionLocal() as db:
+        result = await db.stream_scalars(
+            select(BlogPost).where(BlogPost.status == BlogStatus.PUBLISHED).execution_options(yield_per=100)
+        )
+        async for post in result:
+            await blog_publisher.write_post(post)
+            rendered += 1
+        await blog_publisher.write_index(db)
+    await async_engine.dispose()
+    print(f"Rendered {rendered} posts and the index into {settings.BLOG_STATIC_DIR}")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rebuild the static blog pages")
+    parser.add_argument("--dir", help="output directory (defaults to BLOG_STATIC_DIR)")
+    args = parser.parse_args()
+    if args.dir:
+        settings.BLOG_STATIC_DIR = args.dir
+    return asyncio.run(run())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
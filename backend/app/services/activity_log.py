@@ -0,0 +1,202 @@
+"""
+Append-only activity log (audit trail) with write-behind batching.
+
+record() stamps the event and puts it on a bounded in-memory queue; a background task
+writes queued events to activity_log with multi-row INSERTs of up to
+ACTIVITY_BATCH_SIZE, at least every ACTIVITY_FLUSH_INTERVAL_SECONDS, so a request
+never waits for an audit write.
+
+When the queue is full (the database is slow or down) record() waits for room rather
+than dropping the event: the slowdown reaches callers instead of the trail losing
+entries. Failed writes are retried with the same batch, with backoff, up to
+ACTIVITY_WRITE_ATTEMPTS times. A batch that still fails (a bad row fails every time)
+is dead-lettered: appended to ACTIVITY_DEAD_LETTER_FILE as JSON lines, or logged, so
+it cannot stall the queue and block record() for good. stop() drains the queue before
+returning, so a graceful shutdown loses nothing; a crash loses what was still queued.
+
+activity_log is range-partitioned by month on occurred_at. Partitions are created
+ACTIVITY_PARTITION_MONTHS_AHEAD months in advance; old months can be detached or
+dropped as a whole for retention, without DELETEs on the live table.
+"""
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Optional
+import asyncio
+import json
+import logging
+
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import registry
+from app.core.partitions import create_range_partition
+from app.models.activity import ActivityAction, ActivityEvent
+
+logger = logging.getLogger(__name__)
+
+MAX_RETRY_SECONDS = 30.0
+
+events_written = registry.counter("activity_log_written_total", "Activity events written to the database")
+events_dropped = registry.counter(
+    "activity_log_dropped_total", "Activity events discarded (logger not running, or lost at shutdown)"
+)
+backpressure_waits = registry.counter(
+    "activity_log_backpressure_total", "record() calls that waited because the queue was full"
+)
+write_failures = registry.counter("activity_log_write_failures_total", "Failed activity batch write attempts")
+events_dead_lettered = registry.counter(
+    "activity_log_dead_lettered_total", "Activity events not written after ACTIVITY_WRITE_ATTEMPTS tries"
+)
+
+
+def _next_month(year: int, month: int):
+    return (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+async def ensure_partitions(months_ahead: int, today: Optional[date] = None):
+    """Create the monthly partitions from this month to `months_ahead` months on, if missing."""
+    today = today or datetime.now(timezone.utc).date()
+    year, month = today.year, today.month
+    async with AsyncSessionLocal() as db:
+        for _ in range(months_ahead + 1):
+            next_year, next_month = _next_month(year, month)
+            await create_range_partition(
+                db, "activity_log", f"{year:04d}_{month:02d}", date(year, month, 1), date(next_year, next_month, 1)
+            )
+            year, month = next_year, next_month
+
+
+class ActivityLog:
+    def __init__(self):
+        self._queue: Optional["asyncio.Queue[Dict[str, Any]]"] = None
+        self._wake = asyncio.Event()
+        self._closing = asyncio.Event()
+        self._runner: Optional[asyncio.Task] = None
+        self._partitions_checked: Optional[date] = None
+        # Events taken off the queue but not yet committed
+        self._writing = 0
+
+    def __len__(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def record(
+        self,
+        user_id: Optional[int],
+        action: ActivityAction,
+        entity_type: Optional[str] = None,
+        entity_id: Optional[int] = None,
+        details: Optional[Dict[str, Any]] = None,
+    ):
+        if self._queue is None or self._closing.is_set():
+            # Only the API process runs the writer; scripts and in-process checks do not
+            events_dropped.inc()
+            return
+        event = {
+            "occurred_at": datetime.now(timezone.utc),
+            "user_id": user_id,
+            "action": action.value,
+            "entity_type": entity_type,
+            "entity_id": entity_id,
+            "details": details,
+        }
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            backpressure_waits.inc()
+            self._wake.set()
+            await self._queue.put(event)
+        if self._queue.qsize() >= settings.ACTIVITY_BATCH_SIZE:
+            self._wake.set()
+
+    def _take_batch(self) -> List[Dict[str, Any]]:
+        batch = []
+        while len(batch) < settings.ACTIVITY_BATCH_SIZE:
+            try:
+                batch.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return batch
+
+    async def _write(self, batch: List[Dict[str, Any]]):
+        delay = 0.5
+        for attempt in range(1, settings.ACTIVITY_WRITE_ATTEMPTS + 1):
+            try:
+                today = datetime.now(timezone.utc).date()
+                if self._partitions_checked != today:
+                    await ensure_partitions(settings.ACTIVITY_PARTITION_MONTHS_AHEAD, today)
+                    self._partitions_checked = today
+                async with AsyncSessionLocal() as db:
+                    await db.execute(insert(ActivityEvent), batch)
+                    await db.commit()
+                events_written.inc(len(batch))
+                return
+            except Exception:
+                write_failures.inc()
+                # Re-check partitions too: a missing one makes every insert fail
+                self._partitions_checked = None
+                if attempt == settings.ACTIVITY_WRITE_ATTEMPTS:
+                    logger.exception("Writing %d activity events failed %d times; giving up", len(batch), attempt)
+                    break
+                logger.exception("Writing %d activity events failed; retrying in %.1fs", len(batch), delay)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_RETRY_SECONDS)
+        await self._dead_letter(batch)
+
+    @staticmethod
+    def _append(path: str, lines: str):
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+    async def _dead_letter(self, batch: List[Dict[str, Any]]):
+        events_dead_lettered.inc(len(batch))
+        lines = "".join(json.dumps(event, default=str) + "\n" for event in batch)
+        path = settings.ACTIVITY_DEAD_LETTER_FILE
+        if path:
+            try:
+                await asyncio.to_thread(self._append, path, lines)
+                return
+            except OSError:
+                logger.exception("Appending to %s failed; logging the events instead", path)
+        logger.error("Unwritten activity events:\n%s", lines.rstrip("\n"))
+
+    async def run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=settings.ACTIVITY_FLUSH_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            while self._queue.qsize():
+                batch = self._take_batch()
+                self._writing = len(batch)
+                await self._write(batch)
+                self._writing = 0
+            # Producers that were waiting for room may still be adding their events
+            if self._closing.is_set() and not self._queue.qsize():
+                return
+
+    def start(self):
+        if self._runner is None:
+            self._queue = asyncio.Queue(maxsize=settings.ACTIVITY_QUEUE_SIZE)
+            self._closing.clear()
+            self._runner = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Stop accepting events and write out everything already queued."""
+        if self._runner is None:
+            return
+        self._closing.set()
+        self._wake.set()
+        try:
+            await asyncio.wait_for(self._runner, timeout=settings.ACTIVITY_SHUTDOWN_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            lost = self._queue.qsize() + self._writing
+            events_dropped.inc(lost)
+            logger.error("Activity log shutdown timed out; %d queued events were not written", lost)
+        self._runner = None
+        self._queue = None
+
+
+activity_log = ActivityLog()
+
+registry.gauge("activity_log_queue_size", "Activity events waiting to be written", lambda: len(activity_log))
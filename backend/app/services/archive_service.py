@@ -0,0 +1,147 @@
+"""
+Archival of cold rows out of the hot cases and tasks tables.
+
+Closed and archived cases (with all their tasks) and completed or cancelled tasks
+are moved, once they have been cold for ARCHIVE_CASES_AFTER_DAYS /
+ARCHIVE_TASKS_AFTER_DAYS, into cases_archive and tasks_archive. Those tables are
+range-partitioned by created_at year, so a year can later be detached or dropped
+whole. The hot tables keep only active or recent rows, and their indexes stay sized
+to the active workload however much history accumulates.
+
+The hot tables themselves are not partitioned. Postgres requires the partition key in
+every unique constraint, so a partitioned cases table could no longer keep cases.id
+(referenced by tasks.case_id) or case_number unique on their own. Partitioning by
+status would also turn every close and reopen into a cross-partition row move.
+
+Rows are moved in batches of ARCHIVE_BATCH_SIZE, one transaction per batch: copy into
+the archive, then delete from the hot table (deleting a case cascades to its tasks).
+Batch rows are locked FOR UPDATE SKIP LOCKED, so the job never waits on, or blocks,
+requests editing other rows, and runs can overlap safely.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Set
+
+from sqlalchemy import DateTime, delete, extract, func, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import replica_router
+from app.core.partitions import ensure_yearly_partitions
+from app.core.read_cache import read_cache
+from app.models.archive import ArchivedCase, ArchivedTask
+from app.models.case import Case, CaseStatus
+from app.models.task import Task, TaskStatus
+from app.services import dashboard_service
+
+COLD_CASE_STATUSES = (CaseStatus.CLOSED, CaseStatus.ARCHIVED)
+COLD_TASK_STATUSES = (TaskStatus.COMPLETED, TaskStatus.CANCELLED)
+
+# Columns copied as-is; created_at is the archives' partition key and cannot be NULL
+CASE_COLUMNS = [c.name for c in Case.__table__.columns if c.name not in ("search_vector", "created_at")]
+TASK_COLUMNS = [c.name for c in Task.__table__.columns if c.name != "created_at"]
+
+
+@dataclass
+class ArchiveReport:
+    cases: int = 0
+    tasks: int = 0
+    batches: int = 0
+
+
+def _copy(source, archive, columns: List[str], where, now: datetime):
+    # INSERT INTO <archive> (...) SELECT ... FROM <hot> WHERE ...
+    rows = select(
+        *[getattr(source, c) for c in columns],
+        func.coalesce(source.created_at, now),
+        literal(now, DateTime(timezone=True)),
+    ).where(where)
+    return insert(archive).from_select([*columns, "created_at", "archived_at"], rows)
+
+
+async def _years(db: AsyncSession, created_at, where) -> Set[int]:
+    years = (await db.scalars(select(extract("year", created_at)).where(where).distinct())).all()
+    return {int(y) for y in years if y is not None} | {datetime.now(timezone.utc).year}
+
+
+async def _invalidate(lawyer_ids: Set[Optional[int]]):
+    lawyer_ids.discard(None)
+    if lawyer_ids:
+        await dashboard_service.invalidate(*lawyer_ids)
+        await read_cache.invalidate(*(f"cases:{uid}" for uid in lawyer_ids))
+        # Their cases and tasks just moved; keep their reads off replicas that lack the move
+        for uid in lawyer_ids:
+            await replica_router.mark_write(uid)
+
+
+async def archive_cases(db: AsyncSession, cutoff: datetime, batch_size: int, report: ArchiveReport):
+    """Move cold cases, with all of their tasks, batch by batch in id order."""
+    last_activity = func.coalesce(Case.closed_at, Case.updated_at, Case.created_at)
+    cold = Case.status.in_(COLD_CASE_STATUSES) & (last_activity < cutoff)
+    last_id = 0
+    while True:
+        candidates = list((await db.scalars(
+            select(Case.id).where(cold, Case.id > last_id).order_by(Case.id).limit(batch_size)
+        )).all())
+        if not candidates:
+            await db.rollback()
+            return
+        last_id = candidates[-1]
+        # Partitions first: creating one commits
+        task_years = await _years(db, Task.created_at, Task.case_id.in_(candidates))
+        case_years = await _years(db, Case.created_at, Case.id.in_(candidates))
+        await ensure_yearly_partitions(db, "tasks_archive", task_years)
+        await ensure_yearly_partitions(db, "cases_archive", case_years)
+
+        batch = (await db.execute(
+            select(Case.id, Case.lawyer_id).where(Case.id.in_(candidates), cold).with_for_update(skip_locked=True)
+        )).all()
+        ids = [case_id for case_id, _ in batch]
+        if ids:
+            now = datetime.now(timezone.utc)
+            tasks = await db.execute(_copy(Task, ArchivedTask, TASK_COLUMNS, Task.case_id.in_(ids), now))
+            await db.execute(_copy(Case, ArchivedCase, CASE_COLUMNS, Case.id.in_(ids), now))
+            # Cascades to the tasks copied above
+            await db.execute(delete(Case).where(Case.id.in_(ids)))
+            report.tasks += tasks.rowcount
+            report.cases += len(ids)
+        await db.commit()
+        report.batches += 1
+        await _invalidate({lawyer_id for _, lawyer_id in batch})
+
+
+async def archive_tasks(db: AsyncSession, cutoff: datetime, batch_size: int, report: ArchiveReport):
+    """Move completed and cancelled tasks of cases that stay active, batch by batch in id order."""
+    cold = Task.status.in_(COLD_TASK_STATUSES) & (func.coalesce(Task.completed_at, Task.created_at) < cutoff)
+    last_id = 0
+    while True:
+        candidates = list((await db.scalars(
+            select(Task.id).where(cold, Task.id > last_id).order_by(Task.id).limit(batch_size)
+        )).all())
+        if not candidates:
+            await db.rollback()
+            return
+        last_id = candidates[-1]
+        # Partitions first: creating one commits
+        await ensure_yearly_partitions(db, "tasks_archive", await _years(db, Task.created_at, Task.id.in_(candidates)))
+
+        batch = (await db.execute(
+            select(Task.id, Task.assigned_to).where(Task.id.in_(candidates), cold).with_for_update(skip_locked=True)
+        )).all()
+        ids = [task_id for task_id, _ in batch]
+        if ids:
+            await db.execute(_copy(Task, ArchivedTask, TASK_COLUMNS, Task.id.in_(ids), datetime.now(timezone.utc)))
+            await db.execute(delete(Task).where(Task.id.in_(ids)))
+            report.tasks += len(ids)
+        await db.commit()
+        report.batches += 1
+        await _invalidate({assigned_to for _, assigned_to in batch})
+
+
+async def archive(db: AsyncSession, now: Optional[datetime] = None) -> ArchiveReport:
+    now = now or datetime.now(timezone.utc)
+    batch_size = settings.ARCHIVE_BATCH_SIZE
+    report = ArchiveReport()
+    await archive_cases(db, now - timedelta(days=settings.ARCHIVE_CASES_AFTER_DAYS), batch_size, report)
+    await archive_tasks(db, now - timedelta(days=settings.ARCHIVE_TASKS_AFTER_DAYS), batch_size, report)
+    return report
@@ -0,0 +1,123 @@
+"""
+Pre-rendered static pages for published blog posts.
+
+When BLOG_STATIC_DIR is set, publishing a post writes <slug>.html and refreshes
+index.html in that directory; nginx serves them under /blog/ without touching the
+API. Files are written to a temporary name and renamed, so nginx never serves a
+partial page. `app/scripts/render_blog.py` rebuilds the whole directory.
+"""
+from typing import Iterable, Optional
+import asyncio
+import html
+import os
+import tempfile
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+
+from app.core.config import settings
+from app.models.blog import BlogPost, BlogStatus
+
+EXCERPT_LENGTH = 200
+
+# Columns of the lightweight list projection
+SUMMARY_COLUMNS = (BlogPost.title, BlogPost.slug, BlogPost.excerpt, BlogPost.published_at, BlogPost.created_at)
+
+PAGE = """<!DOCTYPE html>
+<html lang="en">
+
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{title} | Oscar Legal Practitioners</title>
+    <meta name="description" content="{description}">
+    <link rel="stylesheet" href="/assets/css/main.css">
+</head>
+
+<body>
+    <div class="container" style="max-width:800px; padding:60px 20px">
+        <p><a href="/blog.html">&larr; All insights</a></p>
+{body}
+    </div>
+</body>
+
+</html>
+"""
+
+
+def make_excerpt(content: str) -> str:
+    text = " ".join(content.split())
+    return text if len(text) <= EXCERPT_LENGTH else text[:EXCERPT_LENGTH - 3].rstrip() + "..."
+
+
+def _date(post: BlogPost) -> str:
+    published = post.published_at or post.created_at
+    return published.strftime("%d %B %Y") if published else ""
+
+
+def render_post(post: BlogPost) -> str:
+    # Content is stored as plain text with blank lines between paragraphs
+    paragraphs = "\n".join(
+        f"        <p>{html.escape(p.strip())}</p>" for p in post.content.split("\n\n") if p.strip()
+    )
+    body = (
+        f"        <h1>{html.escape(post.title)}</h1>\n"
+        f"        <p class=\"meta\">{_date(post)}</p>\n"
+        f"{paragraphs}"
+    )
+    return PAGE.format(title=html.escape(post.title), description=html.escape(post.excerpt or ""), body=body)
+
+
+def render_index(posts: Iterable[BlogPost]) -> str:
+    items = "\n".join(
+        f"        <article class=\"blog-card\"><h3><a href=\"/blog/{html.escape(p.slug)}\">{html.escape(p.title)}</a></h3>"
+        f"<span class=\"meta\">{_date(p)}</span><p>{html.escape(p.excerpt or '')}</p></article>"
+        for p in posts
+    )
+    body = "        <h1>Legal Insights</h1>\n" + (items or "        <p>Check back soon for our first legal insight!</p>")
+    return PAGE.format(title="Legal Insights", description="Legal insights from Oscar Legal Practitioners", body=body)
+
+
+def _write_atomic(directory: str, name: str, content: str):
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".html")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, os.path.join(directory, name))
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _safe_name(slug: str) -> Optional[str]:
+    # Slugs come from users; never let one escape the output directory
+    name = os.path.basename(slug)
+    return f"{name}.html" if name and name == slug and not name.startswith(".") else None
+
+
+async def write_post(post: BlogPost):
+    name = _safe_name(post.slug)
+    if settings.BLOG_STATIC_DIR and name:
+        await asyncio.to_thread(_write_atomic, settings.BLOG_STATIC_DIR, name, render_post(post))
+
+
+async def write_index(db: AsyncSession):
+    if not settings.BLOG_STATIC_DIR:
+        return
+    posts = (await db.scalars(
+        select(BlogPost)
+        .options(load_only(*SUMMARY_COLUMNS))
+        .where(BlogPost.status == BlogStatus.PUBLISHED)
+        .order_by(BlogPost.created_at.desc(), BlogPost.id.desc())
+        .limit(settings.BLOG_STATIC_INDEX_SIZE)
+    )).all()
+    await asyncio.to_thread(_write_atomic, settings.BLOG_STATIC_DIR, "index.html", render_index(posts))
+
+
+async def publish(db: AsyncSession, post: BlogPost):
+    """Render a newly published post and the index that links to it."""
+    await write_post(post)
+    await write_index(db)
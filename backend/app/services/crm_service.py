@@ -1,88 +1,377 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy import Boolean, Float, Integer, Select, cast, column, func, insert, null, select, update
+from sqlalchemy import case as sql_case, values as sql_values
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from app.core.pagination import Page, SortKey, paginate
+from app.core.read_cache import read_cache
+from app.models.activity import ActivityAction
+from app.models.archive import ArchivedCase, ArchivedTask
 from app.models.client import Client
 from app.models.case import Case
 from app.models.task import Task
-from app.schemas.client import ClientCreate, ClientUpdate
-from app.schemas.case import CaseCreate, CaseUpdate
-from app.schemas.task import TaskCreate, TaskUpdate
+from app.schemas.client import ClientCreate, ClientFilter, ClientUpdate
+from app.schemas.case import CaseCreate, CaseFilter, CaseUpdate
+from app.schemas.task import TaskBatchUpdateItem, TaskCreate, TaskUpdate
+from app.services import dashboard_service
+from app.services.activity_log import activity_log
+from app.services.reminder_scheduler import reminder_scheduler
 
-# Client Operations
-def get_client(db: Session, client_id: int):
-    return db.query(Client).filter(Client.id == client_id).first()
+# Filtering, sorting and search
+
+CLIENT_SORTS = {"created_at": Client.created_at, "name": Client.name, "status": Client.status}
+CASE_SORT_COLUMNS = ("created_at", "title", "priority", "status", "case_number")
+
+def _search(stmt, search_vector, q: Optional[str]):
+    """Restrict to rows matching a web-search style query; returns (stmt, rank expression)."""
+    if not q or not q.strip():
+        return stmt, None
+    query = func.websearch_to_tsquery("english", q)
+    rank = func.ts_rank_cd(search_vector, query, type_=Float)
+    return stmt.where(search_vector.op("@@")(query)), rank
+
+def _sort_key(sort: Optional[str], columns: Dict[str, Any], rank) -> Optional[SortKey]:
+    if rank is not None and sort in (None, "relevance"):
+        return SortKey("relevance", rank)
+    if sort in (None, "relevance", "-created_at"):
+        return None  # paginate's default: newest first
+    return SortKey(sort, columns[sort.lstrip("-")], descending=sort.startswith("-"))
+
+# Writes
+#
+# Creates are a single INSERT ... RETURNING and updates a single ownership-scoped
+# UPDATE ... WHERE id = :id AND <owner> = :uid AND version = :version RETURNING,
+# which also bumps the row's version. Only when the UPDATE matches nothing is the row
+# looked up again, to tell a missing record from someone else's or a stale version.
+
+class RecordNotFound(LookupError):
+    pass
+
+class NotOwner(PermissionError):
+    pass
+
+class NullField(ValueError):
+    """An update set a NOT NULL column to null."""
+
+class VersionConflict(Exception):
+    def __init__(self, message: str, current_version: int):
+        super().__init__(message)
+        self.current_version = current_version
 
-def get_clients(db: Session, lawyer_id: int, skip: int = 0, limit: int = 100):
-    return db.query(Client).filter(Client.lawyer_id == lawyer_id).offset(skip).limit(limit).all()
+def _changed_fields(values: Dict[str, Any]) -> List[str]:
+    """Field names for the activity log (values are not recorded)."""
+    return sorted(k for k in values if k != "version")
 
-def create_client(db: Session, client: ClientCreate, lawyer_id: int):
-    db_client = Client(
-        **client.dict(),
-        lawyer_id=lawyer_id
+async def _insert(db: AsyncSession, model: Any, values: Dict[str, Any]):
+    row = await db.scalar(insert(model).values(**values).returning(model))
+    await db.commit()
+    return row
+
+async def _update_owned(
+    db: AsyncSession, model: Any, owner_column: Any, record_id: int, owner_id: int, values: Dict[str, Any], label: str
+):
+    version = values.pop("version")
+    null_fields = sorted(k for k, v in values.items() if v is None and not model.__table__.c[k].nullable)
+    if null_fields:
+        raise NullField(f"{', '.join(null_fields)} cannot be null")
+    stmt = (
+        update(model)
+        .where(model.id == record_id, owner_column == owner_id, model.version == version)
+        .values(**values, version=model.version + 1)
+        .returning(model)
+        .execution_options(synchronize_session=False, populate_existing=True)
     )
-    db.add(db_client)
-    db.commit()
-    db.refresh(db_client)
+    row = await db.scalar(stmt)
+    if row is None:
+        await db.rollback()
+        current = (await db.execute(select(owner_column, model.version).where(model.id == record_id))).first()
+        if current is None:
+            raise RecordNotFound(f"{label} not found")
+        if current[0] != owner_id:
+            raise NotOwner("Not enough permissions")
+        raise VersionConflict(f"{label} was changed by another request", current_version=current[1])
+    await db.commit()
+    return row
+
+def client_query(lawyer_id: int, filters: Optional[ClientFilter] = None) -> Tuple[Select, Optional[SortKey]]:
+    """A lawyer's clients matching `filters`, and the requested sort (None for newest first)."""
+    filters = filters or ClientFilter()
+    stmt = select(Client).where(Client.lawyer_id == lawyer_id)
+    if filters.status:
+        stmt = stmt.where(Client.status.in_(filters.status))
+    if filters.created_from:
+        stmt = stmt.where(Client.created_at >= filters.created_from)
+    if filters.created_to:
+        stmt = stmt.where(Client.created_at < filters.created_to)
+    stmt, rank = _search(stmt, Client.search_vector, filters.q)
+    return stmt, _sort_key(filters.sort, CLIENT_SORTS, rank)
+
+def case_query(
+    lawyer_id: int, filters: Optional[CaseFilter] = None, model: Any = Case
+) -> Tuple[Select, Optional[SortKey]]:
+    """
+    A lawyer's cases matching `filters`, and the requested sort (None for newest first).
+    Pass model=ArchivedCase to query the archive instead.
+    """
+    filters = filters or CaseFilter()
+    stmt = select(model).where(model.lawyer_id == lawyer_id)
+    if filters.status:
+        stmt = stmt.where(model.status.in_(filters.status))
+    if filters.priority:
+        stmt = stmt.where(model.priority.in_(filters.priority))
+    if filters.client_id is not None:
+        stmt = stmt.where(model.client_id == filters.client_id)
+    if filters.created_from:
+        stmt = stmt.where(model.created_at >= filters.created_from)
+    if filters.created_to:
+        stmt = stmt.where(model.created_at < filters.created_to)
+    stmt, rank = _search(stmt, model.search_vector, filters.q)
+    return stmt, _sort_key(filters.sort, {c: getattr(model, c) for c in CASE_SORT_COLUMNS}, rank)
+
+# Client Operations
+async def get_client(db: AsyncSession, client_id: int):
+    return await db.scalar(select(Client).where(Client.id == client_id))
+
+async def get_clients(
+    db: AsyncSession,
+    lawyer_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    filters: Optional[ClientFilter] = None
+) -> Page:
+    stmt, sort = client_query(lawyer_id, filters)
+    return await paginate(db, stmt, Client, limit=limit, cursor=cursor, skip=skip, sort=sort)
+
+async def create_client(db: AsyncSession, client: ClientCreate, lawyer_id: int):
+    db_client = await _insert(db, Client, {**client.dict(), "lawyer_id": lawyer_id})
+    await activity_log.record(lawyer_id, ActivityAction.CREATE, "client", db_client.id)
+    await dashboard_service.invalidate(lawyer_id)
+    await read_cache.invalidate(f"clients:{lawyer_id}")
     return db_client
 
-def update_client(db: Session, client_id: int, client: ClientUpdate):
-    db_client = get_client(db, client_id)
-    if not db_client:
-        return None
-    
-    update_data = client.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_client, key, value)
-    
-    db.commit()
-    db.refresh(db_client)
+async def update_client(db: AsyncSession, client_id: int, client: ClientUpdate, lawyer_id: int):
+    values = client.dict(exclude_unset=True)
+    fields = _changed_fields(values)
+    db_client = await _update_owned(db, Client, Client.lawyer_id, client_id, lawyer_id, values, "Client")
+    await activity_log.record(lawyer_id, ActivityAction.UPDATE, "client", client_id, {"fields": fields})
+    await dashboard_service.invalidate(db_client.lawyer_id)
+    # Case lists can embed the client (include=client)
+    await read_cache.invalidate(f"clients:{db_client.lawyer_id}", f"cases:{db_client.lawyer_id}")
     return db_client
 
 # Case Operations
-def get_case(db: Session, case_id: int):
-    return db.query(Case).filter(Case.id == case_id).first()
+def _case_loaders(include: Sequence[str], model: Any = Case) -> list:
+    """
+    Eager-load the requested relationships: the client is joined into the case query,
+    tasks come from one extra SELECT ... WHERE case_id IN (...) for the whole page.
+    """
+    options = []
+    if "client" in include:
+        options.append(joinedload(model.client))
+    if "tasks" in include:
+        options.append(selectinload(model.tasks))
+    return options
 
-def get_cases(db: Session, lawyer_id: int, skip: int = 0, limit: int = 100):
-    return db.query(Case).filter(Case.lawyer_id == lawyer_id).offset(skip).limit(limit).all()
+async def get_case(db: AsyncSession, case_id: int, include: Sequence[str] = (), archived: bool = False):
+    model = ArchivedCase if archived else Case
+    return await db.scalar(select(model).where(model.id == case_id).options(*_case_loaders(include, model)))
 
-def create_case(db: Session, case: CaseCreate, lawyer_id: int):
-    db_case = Case(
-        **case.dict(),
-        lawyer_id=lawyer_id
-    )
-    db.add(db_case)
-    db.commit()
-    db.refresh(db_case)
-    return db_case
+async def get_cases(
+    db: AsyncSession,
+    lawyer_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    filters: Optional[CaseFilter] = None,
+    include: Sequence[str] = (),
+    archived: bool = False
+) -> Page:
+    model = ArchivedCase if archived else Case
+    stmt, sort = case_query(lawyer_id, filters, model)
+    stmt = stmt.options(*_case_loaders(include, model))
+    return await paginate(db, stmt, model, limit=limit, cursor=cursor, skip=skip, sort=sort)
 
+async def create_case(db: AsyncSession, case: CaseCreate, lawyer_id: int):
+    db_case = await _insert(db, Case, {**case.dict(), "lawyer_id": lawyer_id})
+    await activity_log.record(lawyer_id, ActivityAction.CREATE, "case", db_case.id)
+    await dashboard_service.invalidate(lawyer_id)
+    await read_cache.invalidate(f"cases:{lawyer_id}")
+    return db_case
 
+async def update_case(db: AsyncSession, case_id: int, case: CaseUpdate, lawyer_id: int):
+    values = case.dict(exclude_unset=True)
+    fields = _changed_fields(values)
+    db_case = await _update_owned(db, Case, Case.lawyer_id, case_id, lawyer_id, values, "Case")
+    await activity_log.record(lawyer_id, ActivityAction.UPDATE, "case", case_id, {"fields": fields})
+    await dashboard_service.invalidate(db_case.lawyer_id)
+    await read_cache.invalidate(f"cases:{db_case.lawyer_id}")
+    return db_case
 
 # Task Operations
-def get_task(db: Session, task_id: int):
-    return db.query(Task).filter(Task.id == task_id).first()
+async def get_task(db: AsyncSession, task_id: int):
+    return await db.scalar(select(Task).where(Task.id == task_id))
 
-def get_tasks(db: Session, user_id: int, skip: int = 0, limit: int = 100):
-    """Retrieve tasks assigned to a specific user."""
-    return db.query(Task).filter(Task.assigned_to == user_id).offset(skip).limit(limit).all()
+async def get_tasks(
+    db: AsyncSession,
+    user_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    archived: bool = False
+) -> Page:
+    """Retrieve tasks assigned to a specific user (archived ones when `archived`)."""
+    model = ArchivedTask if archived else Task
+    stmt = select(model).where(model.assigned_to == user_id)
+    return await paginate(db, stmt, model, limit=limit, cursor=cursor, skip=skip)
 
-def create_task(db: Session, task: TaskCreate, assigned_to: int):
-    db_task = Task(
-        **task.dict(),
-        assigned_to=assigned_to
-    )
-    db.add(db_task)
-    db.commit()
-    db.refresh(db_task)
+async def create_task(db: AsyncSession, task: TaskCreate, assigned_to: int):
+    db_task = await _insert(db, Task, {**task.dict(), "assigned_to": assigned_to})
+    reminder_scheduler.task_changed(db_task)
+    await activity_log.record(assigned_to, ActivityAction.CREATE, "task", db_task.id)
+    await dashboard_service.invalidate(assigned_to)
     return db_task
 
-def update_task(db: Session, task_id: int, task: TaskUpdate):
-    db_task = get_task(db, task_id)
-    if not db_task:
-        return None
-    
-    update_data = task.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_task, key, value)
-    
-    db.commit()
-    db.refresh(db_task)
+async def update_task(db: AsyncSession, task_id: int, task: TaskUpdate, assigned_to: int):
+    values = task.dict(exclude_unset=True)
+    fields = _changed_fields(values)
+    if "due_date" in values:
+        # A new due date gets its own reminder and overdue notice
+        values.update(reminded_at=None, overdue_notified_at=None)
+    db_task = await _update_owned(db, Task, Task.assigned_to, task_id, assigned_to, values, "Task")
+    reminder_scheduler.task_changed(db_task)
+    await activity_log.record(assigned_to, ActivityAction.UPDATE, "task", task_id, {"fields": fields})
+    await dashboard_service.invalidate(db_task.assigned_to)
     return db_task
+
+# Batch task writes
+#
+# Each item gets a (status_code, task, error) result in request order. Referenced cases
+# are checked in one query, and all valid items are written by one statement in one
+# transaction; items that fail are reported and do not stop the rest of the batch.
+
+BatchResult = Tuple[int, Optional[Task], Optional[str]]
+
+# Fields a batch update can set, and those that cannot be set to null
+TASK_BATCH_FIELDS = ("case_id", "title", "description", "due_date", "status", "priority")
+TASK_REQUIRED_FIELDS = {"case_id", "title", "status", "priority"}
+
+async def _owned_case_ids(db: AsyncSession, lawyer_id: int, case_ids: set) -> set:
+    if not case_ids:
+        return set()
+    return set((await db.scalars(
+        select(Case.id).where(Case.lawyer_id == lawyer_id, Case.id.in_(case_ids))
+    )).all())
+
+async def create_tasks(db: AsyncSession, tasks: List[TaskCreate], assigned_to: int) -> List[BatchResult]:
+    owned = await _owned_case_ids(db, assigned_to, {t.case_id for t in tasks})
+    results: List[Optional[BatchResult]] = [None] * len(tasks)
+    positions, rows = [], []
+    for index, task in enumerate(tasks):
+        if task.case_id not in owned:
+            results[index] = (404, None, f"Case {task.case_id} not found")
+            continue
+        positions.append(index)
+        rows.append({**task.dict(), "assigned_to": assigned_to})
+
+    if rows:
+        # One multi-row INSERT; RETURNING rows come back in parameter order
+        stmt = insert(Task).returning(Task, sort_by_parameter_order=True)
+        created = (await db.scalars(stmt, rows)).all()
+        await db.commit()
+        for index, db_task in zip(positions, created):
+            results[index] = (201, db_task, None)
+            reminder_scheduler.task_changed(db_task)
+            await activity_log.record(assigned_to, ActivityAction.CREATE, "task", db_task.id)
+        await dashboard_service.invalidate(assigned_to)
+    return results
+
+async def update_tasks(db: AsyncSession, tasks: List[TaskBatchUpdateItem], assigned_to: int) -> List[BatchResult]:
+    """
+    Apply partial updates to many tasks with one UPDATE tasks ... FROM (VALUES ...).
+    Each VALUES row carries the new value and a set_<field> flag per field, so items
+    may change different fields; ownership and the version are checked per row.
+    Values are cast to the column types: a VALUES column that is NULL in every row is text.
+    """
+    results: List[Optional[BatchResult]] = [None] * len(tasks)
+    changes: Dict[int, Tuple[int, int, Dict[str, Any]]] = {}
+    for index, item in enumerate(tasks):
+        data = item.dict(exclude_unset=True)
+        task_id, version = data.pop("id"), data.pop("version")
+        null_fields = sorted(f for f in TASK_REQUIRED_FIELDS if f in data and data[f] is None)
+        if null_fields:
+            results[index] = (422, None, f"{', '.join(null_fields)} cannot be null")
+        elif task_id in changes:
+            results[index] = (422, None, f"Task {task_id} repeated in this batch")
+        else:
+            changes[task_id] = (index, version, data)
+
+    owned = await _owned_case_ids(
+        db, assigned_to, {data["case_id"] for _, _, data in changes.values() if "case_id" in data}
+    )
+    for task_id, (index, _, data) in list(changes.items()):
+        if "case_id" in data and data["case_id"] not in owned:
+            results[index] = (404, None, f"Case {data['case_id']} not found")
+            del changes[task_id]
+
+    if changes:
+        fields = [f for f in TASK_BATCH_FIELDS if any(f in data for _, _, data in changes.values())]
+        columns = [column("id", Integer), column("version", Integer)]
+        for f in fields:
+            columns += [column(f, Task.__table__.c[f].type), column(f"set_{f}", Boolean)]
+        rows = []
+        for task_id, (_, version, data) in changes.items():
+            row = [task_id, version]
+            for f in fields:
+                row += [data.get(f), f in data]
+            rows.append(tuple(row))
+        v = sql_values(*columns, name="v").data(rows)
+        assignments = {
+            f: sql_case((v.c[f"set_{f}"], cast(v.c[f], Task.__table__.c[f].type)), else_=Task.__table__.c[f])
+            for f in fields
+        }
+        if "due_date" in fields:
+            # A new due date gets its own reminder and overdue notice
+            for marker in (Task.reminded_at, Task.overdue_notified_at):
+                assignments[marker.key] = sql_case((v.c.set_due_date, null()), else_=marker)
+
+        stmt = (
+            update(Task)
+            .where(
+                Task.id == v.c.id,
+                Task.assigned_to == assigned_to,
+                Task.version == v.c.version,
+            )
+            .values(**assignments, version=Task.version + 1)
+            .returning(Task)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        updated = {t.id: t for t in (await db.scalars(stmt)).all()}
+        await db.commit()
+        for task_id, db_task in updated.items():
+            index, _, data = changes[task_id]
+            results[index] = (200, db_task, None)
+            reminder_scheduler.task_changed(db_task)
+            await activity_log.record(
+                assigned_to, ActivityAction.UPDATE, "task", task_id, {"fields": _changed_fields(data)}
+            )
+
+        # Only items that matched nothing are looked up again, to say why
+        missing = [task_id for task_id in changes if task_id not in updated]
+        if missing:
+            current = {
+                task_id: (owner, version) for task_id, owner, version in await db.execute(
+                    select(Task.id, Task.assigned_to, Task.version).where(Task.id.in_(missing))
+                )
+            }
+            for task_id in missing:
+                index = changes[task_id][0]
+                if task_id not in current:
+                    results[index] = (404, None, "Task not found")
+                elif current[task_id][0] != assigned_to:
+                    results[index] = (403, None, "Not enough permissions")
+                else:
+                    results[index] = (409, None, f"Task was changed by another request (version {current[task_id][1]})")
+        if updated:
+            await dashboard_service.invalidate(assigned_to)
+    return results
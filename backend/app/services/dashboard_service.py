@@ -0,0 +1,113 @@
+"""
+Dashboard aggregates for a lawyer, computed in a single SQL round trip and cached.
+
+Each table is aggregated once with FILTERed counts, the upcoming deadlines are folded
+into a JSON array, and the one-row results are cross-joined into one statement. The
+summary is cached per user; writes to that user's clients, cases or tasks call
+invalidate(), and the TTL bounds staleness from the clock (tasks becoming overdue).
+"""
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, literal_column, select, true
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import cache
+from app.core.config import settings
+from app.core.database import replica_router
+from app.models.case import Case, CasePriority, CaseStatus
+from app.models.client import Client, ClientStatus
+from app.models.task import OPEN_TASK_STATUSES, Task, TaskPriority, TaskStatus
+from app.schemas.dashboard import DashboardSummary, UpcomingDeadline
+
+ACTIVE_CASE_STATUSES = (CaseStatus.OPEN, CaseStatus.IN_PROGRESS)
+
+
+def _summary_key(user_id: int) -> str:
+    return f"dashboard:{user_id}"
+
+
+def summary_query(user_id: int, now: datetime):
+    cases = select(
+        *[func.count().filter(Case.status == s).label(f"status_{s.name}") for s in CaseStatus],
+        *[
+            func.count().filter(Case.status.in_(ACTIVE_CASE_STATUSES), Case.priority == p).label(f"priority_{p.name}")
+            for p in CasePriority
+        ],
+    ).where(Case.lawyer_id == user_id).subquery("case_counts")
+
+    clients = select(
+        func.count().label("total_clients"),
+        func.count().filter(Client.status == ClientStatus.ACTIVE).label("active_clients"),
+    ).where(Client.lawyer_id == user_id).subquery("client_counts")
+
+    open_task = Task.status.in_(OPEN_TASK_STATUSES)
+    tasks = select(
+        func.count().filter(open_task).label("open_tasks"),
+        func.count().filter(open_task, Task.due_date < now).label("overdue_tasks"),
+    ).where(Task.assigned_to == user_id).subquery("task_counts")
+
+    upcoming = (
+        select(Task.id, Task.case_id, Task.title, Task.due_date, Task.status, Task.priority)
+        .where(
+            Task.assigned_to == user_id, open_task,
+            Task.due_date >= now, Task.due_date < now + timedelta(days=settings.DASHBOARD_UPCOMING_DAYS)
+        )
+        .order_by(Task.due_date, Task.id)
+        .limit(settings.DASHBOARD_UPCOMING_LIMIT)
+        .subquery("upcoming")
+    )
+    deadline = func.json_build_object(
+        "task_id", upcoming.c.id, "case_id", upcoming.c.case_id, "title", upcoming.c.title,
+        "due_date", upcoming.c.due_date, "status", upcoming.c.status, "priority", upcoming.c.priority,
+    )
+    deadlines = select(
+        func.coalesce(
+            func.json_agg(aggregate_order_by(deadline, upcoming.c.due_date, upcoming.c.id)),
+            literal_column("'[]'::json")
+        )
+    ).scalar_subquery().label("upcoming_deadlines")
+
+    # Each side is exactly one row
+    return select(cases, clients, tasks, deadlines).select_from(cases.join(clients, true()).join(tasks, true()))
+
+
+async def compute_summary(db: AsyncSession, user_id: int) -> DashboardSummary:
+    now = datetime.now(timezone.utc)
+    row = (await db.execute(summary_query(user_id, now))).one()._mapping
+    by_status = {s.value: row[f"status_{s.name}"] for s in CaseStatus}
+    return DashboardSummary(
+        cases_by_status=by_status,
+        active_cases_by_priority={p.value: row[f"priority_{p.name}"] for p in CasePriority},
+        active_cases=sum(by_status[s.value] for s in ACTIVE_CASE_STATUSES),
+        total_clients=row["total_clients"],
+        active_clients=row["active_clients"],
+        open_tasks=row["open_tasks"],
+        overdue_tasks=row["overdue_tasks"],
+        # Enum columns are stored (and so serialized by json_build_object) by member name
+        upcoming_deadlines=[
+            UpcomingDeadline(**{**d, "status": TaskStatus[d["status"]], "priority": TaskPriority[d["priority"]]})
+            for d in row["upcoming_deadlines"]
+        ],
+        generated_at=now,
+    )
+
+
+async def get_summary(db: AsyncSession, user_id: int) -> DashboardSummary:
+    cached = await cache.get(_summary_key(user_id))
+    if cached is not None:
+        return DashboardSummary(**cached)
+    # A replica may still lack a change invalidated moments ago; don't cache its view
+    store = not await replica_router.changed_recently(_summary_key(user_id))
+    summary = await compute_summary(db, user_id)
+    if store:
+        await cache.set(_summary_key(user_id), summary.model_dump(mode="json"), ttl=settings.DASHBOARD_CACHE_TTL_SECONDS)
+    return summary
+
+
+async def invalidate(*user_ids) -> None:
+    keys = [_summary_key(u) for u in user_ids if u is not None]
+    if keys:
+        await cache.delete(*keys)
+        for key in keys:
+            await replica_router.mark_changed(key)
@@ -0,0 +1,107 @@
+"""
+Streaming export of clients, cases and tasks as CSV or NDJSON.
+
+Rows are read through a server-side cursor EXPORT_BATCH_SIZE at a time and encoded as
+plain column tuples (no ORM objects, no pydantic), and each batch is sent before the
+next is fetched, so memory use does not depend on how many rows are exported.
+"""
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, AsyncIterator, List, Optional, Sequence
+import csv
+import io
+import json
+
+from sqlalchemy import Select, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.pagination import SortKey, default_sort
+from app.models.case import Case
+from app.models.client import Client
+from app.models.task import Task
+from app.schemas.case import CaseFilter
+from app.schemas.client import ClientFilter
+from app.services import crm_service
+
+CSV, NDJSON = "csv", "ndjson"
+MEDIA_TYPES = {CSV: "text/csv; charset=utf-8", NDJSON: "application/x-ndjson"}
+
+# Exported columns, in output order
+CLIENT_COLUMNS = [
+    Client.id, Client.name, Client.email, Client.phone, Client.address, Client.status,
+    Client.notes, Client.created_at, Client.updated_at,
+]
+CASE_COLUMNS = [
+    Case.id, Case.case_number, Case.title, Case.client_id, Case.description, Case.status,
+    Case.priority, Case.created_at, Case.updated_at, Case.closed_at,
+]
+TASK_COLUMNS = [
+    Task.id, Task.case_id, Task.title, Task.description, Task.due_date, Task.status,
+    Task.priority, Task.created_at, Task.completed_at,
+]
+
+
+def export_select(stmt: Select, model: Any, columns: Sequence, sort: Optional[SortKey] = None) -> Select:
+    """Narrow a list query to `columns`, keeping its filters and the list endpoint's order."""
+    sort = sort or default_sort(model)
+    if sort.descending:
+        order = (sort.expression.desc(), model.id.desc())
+    else:
+        order = (sort.expression.asc(), model.id.asc())
+    return stmt.with_only_columns(*columns).order_by(*order)
+
+
+def clients_select(lawyer_id: int, filters: Optional[ClientFilter] = None) -> Select:
+    stmt, sort = crm_service.client_query(lawyer_id, filters)
+    return export_select(stmt, Client, CLIENT_COLUMNS, sort)
+
+
+def cases_select(lawyer_id: int, filters: Optional[CaseFilter] = None) -> Select:
+    stmt, sort = crm_service.case_query(lawyer_id, filters)
+    return export_select(stmt, Case, CASE_COLUMNS, sort)
+
+
+def tasks_select(user_id: int) -> Select:
+    return export_select(select(Task).where(Task.assigned_to == user_id), Task, TASK_COLUMNS)
+
+
+def attachment(name: str, fmt: str) -> str:
+    return f'attachment; filename="{name}-{date.today().isoformat()}.{fmt}"'
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _encode(rows: List[Sequence], names: List[str], fmt: str) -> bytes:
+    if fmt == NDJSON:
+        return "".join(
+            json.dumps({n: _plain(v) for n, v in zip(names, row)}, separators=(",", ":")) + "\n" for row in rows
+        ).encode("utf-8")
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([_plain(v) for v in row] for row in rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+async def stream_rows(
+    stmt: Select, fmt: str = CSV, session_factory: async_sessionmaker = AsyncSessionLocal
+) -> AsyncIterator[bytes]:
+    """
+    Yield the encoded result of `stmt`, batch by batch. Opens its own session from
+    `session_factory`: a streaming response outlives the request's dependencies.
+    """
+    names = [c.name for c in stmt.selected_columns]
+    if fmt == CSV:
+        yield _encode([names], names, CSV)
+    async with session_factory() as db:
+        # SET LOCAL only lasts for this read-only transaction
+        await db.execute(text(f"SET LOCAL statement_timeout = {int(settings.EXPORT_STATEMENT_TIMEOUT_MS)}"))
+        result = await db.stream(stmt, execution_options={"yield_per": settings.EXPORT_BATCH_SIZE})
+        async for rows in result.partitions():
+            yield _encode(rows, names, fmt)
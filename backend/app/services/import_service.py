@@ -0,0 +1,259 @@
+"""
+Bulk import of clients and cases from CSV or NDJSON streams.
+
+Input is consumed incrementally and handled in chunks of IMPORT_CHUNK_SIZE rows: each
+chunk is validated against the pydantic schemas and written with one multi-row INSERT
+in its own transaction, so memory stays bounded by the chunk size and a bad chunk
+never rolls back rows already imported. Every rejected row is reported with its row
+number and reasons.
+"""
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+import codecs
+import csv
+import json
+
+from pydantic import ValidationError
+from sqlalchemy import func, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.read_cache import read_cache
+from app.models.activity import ActivityAction
+from app.models.case import Case
+from app.models.client import Client
+from app.schemas.case import CaseCreate
+from app.schemas.client import ClientCreate
+from app.services import dashboard_service
+from app.services.activity_log import activity_log
+
+CSV, NDJSON = "csv", "ndjson"
+
+# Raw row as parsed from the input, with its 1-based row number
+RawRow = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+
+@dataclass
+class ImportReport:
+    total: int = 0
+    imported: int = 0
+    failed: int = 0
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+    errors_truncated: bool = False
+
+    def reject(self, row: int, reasons: List[str], on_error: Optional[Callable[[Dict], None]] = None):
+        error = {"row": row, "errors": reasons}
+        self.failed += 1
+        if on_error is not None:
+            on_error(error)
+        if len(self.errors) < settings.IMPORT_MAX_REPORTED_ERRORS:
+            self.errors.append(error)
+        else:
+            self.errors_truncated = True
+
+
+def detect_format(content_type: Optional[str], explicit: Optional[str] = None) -> str:
+    if explicit in (CSV, NDJSON):
+        return explicit
+    content_type = (content_type or "").lower()
+    if "json" in content_type:
+        return NDJSON
+    return CSV
+
+
+async def _iter_records(chunks: AsyncIterator[bytes], fmt: str = CSV) -> AsyncIterator[str]:
+    """
+    Yield complete input records. NDJSON records are single lines. A newline inside a
+    quoted CSV field does not end the record: a CSV record is complete once it contains
+    an even number of quote characters (RFC 4180 escapes quotes by doubling them, which
+    keeps the count even).
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    tail, pending = "", ""
+    async for chunk in chunks:
+        lines = (tail + decoder.decode(chunk)).split("\n")
+        tail = lines.pop()
+        for line in lines:
+            pending = pending + line + "\n"
+            # JSON escapes quotes as \", so counting them means nothing there
+            if fmt != CSV or pending.count('"') % 2 == 0:
+                yield pending
+                pending = ""
+    rest = pending + tail + decoder.decode(b"", final=True)
+    if rest.strip():
+        yield rest
+
+
+def _parse_csv(records: List[str], header: List[str], first_row: int) -> Iterator[RawRow]:
+    for offset, values in enumerate(csv.reader(records)):
+        row_number = first_row + offset
+        if len(values) != len(header):
+            yield row_number, None, f"expected {len(header)} columns, got {len(values)}"
+            continue
+        # Empty CSV cells mean "not provided", so optional fields fall back to their defaults
+        yield row_number, {k: v.strip() for k, v in zip(header, values) if k and v.strip() != ""}, None
+
+
+def _parse_ndjson(records: List[str], first_row: int) -> Iterator[RawRow]:
+    for offset, record in enumerate(records):
+        try:
+            data = json.loads(record)
+        except ValueError as e:
+            yield first_row + offset, None, f"invalid JSON: {e}"
+            continue
+        if not isinstance(data, dict):
+            yield first_row + offset, None, "expected a JSON object"
+            continue
+        yield first_row + offset, data, None
+
+
+async def iter_row_chunks(chunks: AsyncIterator[bytes], fmt: str, chunk_size: int) -> AsyncIterator[List[RawRow]]:
+    """Group parsed input rows into lists of at most `chunk_size`."""
+    header: Optional[List[str]] = None
+    buffered: List[str] = []
+    row_number = 1
+
+    def flush() -> List[RawRow]:
+        nonlocal row_number
+        if fmt == CSV:
+            rows = list(_parse_csv(buffered, header, row_number))
+        else:
+            rows = list(_parse_ndjson(buffered, row_number))
+        row_number += len(buffered)
+        buffered.clear()
+        return rows
+
+    async for record in _iter_records(chunks, fmt):
+        if not record.strip():
+            continue
+        if fmt == CSV and header is None:
+            header = [h.strip() for h in next(csv.reader([record]))]
+            continue
+        buffered.append(record)
+        if len(buffered) >= chunk_size:
+            yield flush()
+    if buffered:
+        yield flush()
+
+
+def _import_details(report: ImportReport) -> Dict[str, int]:
+    return {"total": report.total, "imported": report.imported, "failed": report.failed}
+
+
+def _validation_messages(error: ValidationError) -> List[str]:
+    return [f"{'.'.join(str(p) for p in e['loc']) or 'row'}: {e['msg']}" for e in error.errors()]
+
+
+async def import_clients(
+    db: AsyncSession,
+    lawyer_id: int,
+    chunks: AsyncIterator[bytes],
+    fmt: str = CSV,
+    on_error: Optional[Callable[[Dict], None]] = None
+) -> ImportReport:
+    """Columns: name (required), email, phone, address, status, notes."""
+    report = ImportReport()
+    async for rows in iter_row_chunks(chunks, fmt, settings.IMPORT_CHUNK_SIZE):
+        values = []
+        for row_number, data, parse_error in rows:
+            report.total += 1
+            if parse_error:
+                report.reject(row_number, [parse_error], on_error)
+                continue
+            try:
+                client = ClientCreate(**data)
+            except ValidationError as e:
+                report.reject(row_number, _validation_messages(e), on_error)
+                continue
+            values.append({**client.dict(), "lawyer_id": lawyer_id})
+
+        if values:
+            await db.execute(insert(Client), values)
+            await db.commit()
+            await dashboard_service.invalidate(lawyer_id)
+            await read_cache.invalidate(f"clients:{lawyer_id}")
+            report.imported += len(values)
+    await activity_log.record(lawyer_id, ActivityAction.IMPORT, "client", None, _import_details(report))
+    return report
+
+
+async def _owned_clients(db: AsyncSession, lawyer_id: int, ids: set, emails: set) -> Tuple[set, Dict[str, int]]:
+    """Resolve which referenced client ids / emails belong to the importing lawyer."""
+    owned_ids, by_email = set(), {}
+    if ids:
+        owned_ids = set((await db.scalars(
+            select(Client.id).where(Client.lawyer_id == lawyer_id, Client.id.in_(ids))
+        )).all())
+    if emails:
+        # Import emails are lowercased; stored ones keep the case they were entered with
+        result = await db.execute(
+            select(Client.email, Client.id)
+            .where(Client.lawyer_id == lawyer_id, func.lower(Client.email).in_(emails))
+            .order_by(Client.id)
+        )
+        for email, client_id in result:
+            by_email.setdefault(email.lower(), client_id)
+    return owned_ids, by_email
+
+
+async def import_cases(
+    db: AsyncSession,
+    lawyer_id: int,
+    chunks: AsyncIterator[bytes],
+    fmt: str = CSV,
+    on_error: Optional[Callable[[Dict], None]] = None
+) -> ImportReport:
+    """
+    Columns: case_number, title (required), client_id or client_email (one required,
+    must be one of the lawyer's clients), description, status, priority.
+    Rows whose case_number already exists are reported and skipped.
+    """
+    report = ImportReport()
+    async for rows in iter_row_chunks(chunks, fmt, settings.IMPORT_CHUNK_SIZE):
+        candidates = []
+        for row_number, data, parse_error in rows:
+            report.total += 1
+            if parse_error:
+                report.reject(row_number, [parse_error], on_error)
+                continue
+            client_email = str(data.pop("client_email", "") or "").strip().lower() or None
+            if "client_id" not in data and client_email is None:
+                report.reject(row_number, ["client_id or client_email is required"], on_error)
+                continue
+            try:
+                case = CaseCreate(**{"client_id": 0, **data})
+            except ValidationError as e:
+                report.reject(row_number, _validation_messages(e), on_error)
+                continue
+            candidates.append((row_number, case, client_email if "client_id" not in data else None))
+
+        owned_ids, by_email = await _owned_clients(
+            db, lawyer_id,
+            {c.client_id for _, c, email in candidates if email is None},
+            {email for _, _, email in candidates if email is not None}
+        )
+        values, row_numbers = [], {}
+        for row_number, case, client_email in candidates:
+            client_id = by_email.get(client_email) if client_email else case.client_id
+            if client_id is None or (client_email is None and client_id not in owned_ids):
+                report.reject(row_number, [f"unknown client {client_email or case.client_id}"], on_error)
+                continue
+            if case.case_number in row_numbers:
+                report.reject(row_number, [f"case_number {case.case_number} repeated in this import"], on_error)
+                continue
+            row_numbers[case.case_number] = row_number
+            values.append({**case.dict(), "client_id": client_id, "lawyer_id": lawyer_id})
+
+        if values:
+            stmt = pg_insert(Case).on_conflict_do_nothing(index_elements=[Case.case_number]).returning(Case.case_number)
+            inserted = set((await db.scalars(stmt, values)).all())
+            await db.commit()
+            await dashboard_service.invalidate(lawyer_id)
+            await read_cache.invalidate(f"cases:{lawyer_id}")
+            report.imported += len(inserted)
+            for case_number, row_number in row_numbers.items():
+                if case_number not in inserted:
+                    report.reject(row_number, [f"case_number {case_number} already exists"], on_error)
+    await activity_log.record(lawyer_id, ActivityAction.IMPORT, "case", None, _import_details(report))
+    return report
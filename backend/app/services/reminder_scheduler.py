@@ -0,0 +1,232 @@
+"""
+Due-date reminders and overdue notices for tasks.
+
+Each worker keeps a min-heap of (fire_at, task_id, kind) entries, but only for open tasks
+whose notices fall within the next two reconcile intervals, so memory follows what is
+about to fire rather than the size of the tasks table. Every REMINDER_RECONCILE_SECONDS
+the window is reloaded with one range query on ix_tasks_open_due_date (a partial index
+on open tasks without an overdue notice); between reloads crm_service reports each task
+write through task_changed().
+
+Due entries fire in batches. One UPDATE ... RETURNING per kind claims the tasks by
+setting reminded_at / overdue_notified_at where still NULL and the task is still open
+and due, so each notice is sent once even with several workers or stale heap entries.
+The claimed tasks go to the notification sink.
+"""
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import heapq
+import json
+import logging
+import time
+
+from sqlalchemy import bindparam, select, update
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import registry
+from app.models.task import OPEN_TASK_STATUSES, Task
+
+logger = logging.getLogger(__name__)
+
+REMINDER, OVERDUE = "reminder", "overdue"
+ERROR_BACKOFF_SECONDS = 5.0
+
+notices_total = registry.counter("task_notices_total", "Task reminders and overdue notices sent", ["kind"])
+
+# (fire_at, task_id, kind, due_date the entry was scheduled for)
+Entry = Tuple[datetime, int, str, datetime]
+
+
+def _open_for_notices():
+    # Statuses are rendered as literals so the planner can match the partial index predicate
+    statuses = bindparam("open_statuses", list(OPEN_TASK_STATUSES), expanding=True, literal_execute=True)
+    return Task.status.in_(statuses) & Task.overdue_notified_at.is_(None)
+
+
+def upcoming_query(now: datetime, window_end: datetime, lead: timedelta):
+    """Open tasks with a notice due before `window_end`: a range scan of ix_tasks_open_due_date."""
+    return select(Task.id, Task.due_date, Task.reminded_at).where(
+        _open_for_notices(),
+        Task.due_date >= now - timedelta(hours=settings.REMINDER_CATCHUP_HOURS),
+        Task.due_date < window_end + lead,
+    )
+
+
+@dataclass
+class Notice:
+    kind: str
+    task_id: int
+    title: str
+    due_date: datetime
+    assigned_to: Optional[int]
+    case_id: int
+
+
+class LogNotificationSink:
+    async def send(self, notices: List[Notice]):
+        for n in notices:
+            logger.info(
+                "Task %s %s: %r due %s (user %s)", n.task_id, n.kind, n.title, n.due_date.isoformat(), n.assigned_to
+            )
+
+
+class FileNotificationSink:
+    """Appends one JSON object per notice; handy for local testing."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _append(self, lines: str):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+    async def send(self, notices: List[Notice]):
+        lines = "".join(json.dumps(asdict(n), default=str) + "\n" for n in notices)
+        await asyncio.to_thread(self._append, lines)
+
+
+class ReminderScheduler:
+    def __init__(self):
+        self.sink = None
+        self._heap: List[Entry] = []
+        # Due date each tracked task is scheduled for; heap entries that disagree are stale
+        self._due: Dict[int, datetime] = {}
+        self._window_end = datetime.min.replace(tzinfo=timezone.utc)
+        self._wake = asyncio.Event()
+        self._runner: Optional[asyncio.Task] = None
+
+    @property
+    def lead(self) -> timedelta:
+        return timedelta(minutes=settings.REMINDER_LEAD_MINUTES)
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def _schedule(self, task_id: int, due: datetime, reminded: bool, now: datetime):
+        self._due[task_id] = due
+        # A reminder is pointless once the task is overdue; the overdue notice covers it
+        if not reminded and due > now:
+            heapq.heappush(self._heap, (due - self.lead, task_id, REMINDER, due))
+        heapq.heappush(self._heap, (due, task_id, OVERDUE, due))
+
+    def task_changed(self, task: Task):
+        """Track a task that was just created or updated."""
+        if task.status not in OPEN_TASK_STATUSES or task.due_date is None or task.overdue_notified_at:
+            # Any heap entries for it are now stale
+            self._due.pop(task.id, None)
+            return
+        if self._due.get(task.id) == task.due_date:
+            return
+        if task.due_date - self.lead >= self._window_end:
+            # Not due soon; the reconcile that reaches its window will load it
+            self._due.pop(task.id, None)
+            return
+        self._schedule(task.id, task.due_date, task.reminded_at is not None, datetime.now(timezone.utc))
+        self._wake.set()
+
+    async def reconcile(self):
+        """Load open tasks whose notices fall in the next window."""
+        now = datetime.now(timezone.utc)
+        window_end = now + timedelta(seconds=2 * settings.REMINDER_RECONCILE_SECONDS)
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(upcoming_query(now, window_end, self.lead))).all()
+        for task_id, due, reminded_at in rows:
+            # Writes seen through task_changed() meanwhile are already scheduled
+            if self._due.get(task_id) != due:
+                self._schedule(task_id, due, reminded_at is not None, now)
+        self._window_end = window_end
+
+    def _pop_due(self, now: datetime) -> Dict[str, List[int]]:
+        batch: Dict[str, List[int]] = {REMINDER: [], OVERDUE: []}
+        taken = 0
+        while self._heap and self._heap[0][0] <= now and taken < settings.REMINDER_BATCH_SIZE:
+            _, task_id, kind, due = heapq.heappop(self._heap)
+            if self._due.get(task_id) != due:
+                continue
+            if kind == OVERDUE:
+                del self._due[task_id]
+            batch[kind].append(task_id)
+            taken += 1
+        return batch
+
+    async def _claim(self, kind: str, task_ids: List[int], now: datetime) -> List[Notice]:
+        # Only the worker whose UPDATE flips the marker from NULL sends the notice
+        column, due_by = (Task.reminded_at, now + self.lead) if kind == REMINDER else (Task.overdue_notified_at, now)
+        stmt = (
+            update(Task)
+            .where(Task.id.in_(task_ids), _open_for_notices(), column.is_(None), Task.due_date <= due_by)
+            .values({column: now})
+            .returning(Task.id, Task.title, Task.due_date, Task.assigned_to, Task.case_id)
+            .execution_options(synchronize_session=False)
+        )
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(stmt)).all()
+            await db.commit()
+        return [Notice(kind, *row) for row in rows]
+
+    async def fire_due(self) -> int:
+        """Send every notice that is due, a batch at a time; returns how many were sent."""
+        sent = 0
+        while self._heap and self._heap[0][0] <= datetime.now(timezone.utc):
+            now = datetime.now(timezone.utc)
+            for kind, task_ids in self._pop_due(now).items():
+                if not task_ids:
+                    continue
+                try:
+                    notices = await self._claim(kind, task_ids, now)
+                except Exception:
+                    # Forget them so the next reconcile schedules them again
+                    for task_id in task_ids:
+                        self._due.pop(task_id, None)
+                    raise
+                if notices:
+                    await self.sink.send(notices)
+                    notices_total.inc(len(notices), kind=kind)
+                    sent += len(notices)
+        return sent
+
+    async def run(self):
+        next_reconcile = 0.0
+        while True:
+            try:
+                self._wake.clear()
+                if time.monotonic() >= next_reconcile:
+                    await self.reconcile()
+                    next_reconcile = time.monotonic() + settings.REMINDER_RECONCILE_SECONDS
+                await self.fire_due()
+                timeout = next_reconcile - time.monotonic()
+                if self._heap:
+                    timeout = min(timeout, (self._heap[0][0] - datetime.now(timezone.utc)).total_seconds())
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=max(timeout, 0.0))
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Task reminder scheduler failed; retrying")
+                await asyncio.sleep(ERROR_BACKOFF_SECONDS)
+
+    def start(self):
+        if self._runner is None:
+            if self.sink is None:
+                sink_file = settings.REMINDER_SINK_FILE
+                self.sink = FileNotificationSink(sink_file) if sink_file else LogNotificationSink()
+            self._runner = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+
+
+reminder_scheduler = ReminderScheduler()
+
+registry.gauge("task_reminder_heap_size", "Scheduled reminder entries in this worker", lambda: len(reminder_scheduler))
@@ -1,16 +1,20 @@
-from sqlalchemy.orm import Session
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user import User, UserRole
-from app.schemas.user import UserCreate
-from app.core.security import get_password_hash
+from app.schemas.user import UserCreate, UserUpdate
+from app.core.cache import cache
+from app.core.config import settings
+from app.core.security import hash_password
 
-def get_user(db: Session, user_id: int):
-    return db.query(User).filter(User.id == user_id).first()
+async def get_user(db: AsyncSession, user_id: int):
+    return await db.scalar(select(User).where(User.id == user_id))
 
-def get_user_by_email(db: Session, email: str):
-    return db.query(User).filter(User.email == email).first()
+async def get_user_by_email(db: AsyncSession, email: str):
+    return await db.scalar(select(User).where(User.email == email))
 
-def create_user(db: Session, user: UserCreate):
-    hashed_password = get_password_hash(user.password)
+async def create_user(db: AsyncSession, user: UserCreate):
+    hashed_password = await hash_password(user.password)
     db_user = User(
         email=user.email,
         hashed_password=hashed_password,
@@ -19,6 +23,76 @@ def create_user(db: Session, user: UserCreate):
         is_active=True
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return db_user
+
+async def update_user(db: AsyncSession, user_id: int, user: UserUpdate):
+    db_user = await get_user(db, user_id)
+    if not db_user:
+        return None
+
+    update_data = user.dict(exclude_unset=True)
+    password = update_data.pop("password", None)
+    if password:
+        db_user.hashed_password = await hash_password(password)
+    for key, value in update_data.items():
+        setattr(db_user, key, value)
+
+    await db.commit()
+    await db.refresh(db_user)
+    # Role, activation and profile changes must be visible on the very next request
+    await invalidate_principal(user_id)
+    return db_user
+
+# Authenticated principals
+#
+# The fields an authenticated request needs are cached per user id in the shared
+# cache, so warm requests resolve the current user without a query. Anything that
+# changes these fields must call invalidate_principal.
+
+def _principal_key(user_id: int) -> str:
+    return f"principal:{user_id}"
+
+def _principal_from_cache(data: dict) -> User:
+    # Transient instance: read-only use in dependencies and responses, never added to a session
+    return User(
+        id=data["id"],
+        email=data["email"],
+        full_name=data["full_name"],
+        role=UserRole(data["role"]),
+        is_active=data["is_active"]
+    )
+
+async def get_principal(
+    db: AsyncSession,
+    user_id: Optional[int] = None,
+    email: Optional[str] = None
+) -> Optional[User]:
+    """Return the user for a token's id (cached) or, for older email-only tokens, its email."""
+    if user_id is not None:
+        cached = await cache.get(_principal_key(user_id))
+        if cached is not None:
+            return _principal_from_cache(cached)
+        db_user = await get_user(db, user_id)
+    elif email is not None:
+        db_user = await get_user_by_email(db, email=email)
+    else:
+        return None
+
+    if db_user is not None:
+        await cache.set(
+            _principal_key(db_user.id),
+            {
+                "id": db_user.id,
+                "email": db_user.email,
+                "full_name": db_user.full_name,
+                "role": db_user.role.value,
+                "is_active": db_user.is_active,
+            },
+            ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS
+        )
+    return db_user
+
+async def invalidate_principal(user_id: int):
+    await cache.delete(_principal_key(user_id))
@@ -0,0 +1,18 @@
+"""
+Tests that need Postgres run against SQLALCHEMY_DATABASE_URL after migrations
+(alembic upgrade head) and are skipped when that database cannot be reached.
+"""
+import pytest
+from sqlalchemy import exc, text
+
+from app.core.database import engine
+
+
+@pytest.fixture(scope="session")
+def database():
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except exc.OperationalError as e:
+        pytest.skip(f"No database at SQLALCHEMY_DATABASE_URL: {e.orig}")
+    return engine
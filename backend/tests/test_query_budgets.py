@@ -0,0 +1,75 @@
+"""Per-request SQL statement budgets for the case endpoints, counted with query_budget()."""
+import asyncio
+import uuid
+
+import httpx
+import pytest
+from sqlalchemy import delete
+
+from app.core.database import SessionLocal, async_engine
+from app.core.instrumentation import query_budget
+from app.core.security import create_access_token
+from app.main import app
+from app.models.case import Case
+from app.models.client import Client
+from app.models.task import Task
+from app.models.user import User, UserRole
+
+# (path, most statements the request may run)
+BUDGETS = {
+    "case list": ("/api/v1/cases/?limit=50", 1),
+    "case list with client and tasks": ("/api/v1/cases/?limit=50&include=client&include=tasks", 2),
+    "case detail with client and tasks": ("/api/v1/cases/{case_id}?include=client&include=tasks", 2),
+}
+
+
+@pytest.fixture
+def lawyer(database):
+    """A lawyer with one client, three cases and two tasks per case; removed afterwards."""
+    suffix = uuid.uuid4().hex[:12]
+    with SessionLocal() as db:
+        user = User(email=f"budget-{suffix}@example.com", hashed_password="!", role=UserRole.LAWYER)
+        db.add(user)
+        db.flush()
+        client = Client(lawyer_id=user.id, name="Budget Client")
+        db.add(client)
+        db.flush()
+        cases = [
+            Case(client_id=client.id, lawyer_id=user.id, case_number=f"BUDGET-{suffix}-{i}", title=f"Case {i}")
+            for i in range(3)
+        ]
+        db.add_all(cases)
+        db.flush()
+        db.add_all(Task(case_id=c.id, assigned_to=user.id, title=f"Task {j}") for c in cases for j in range(2))
+        db.commit()
+        user_id, email, case_id = user.id, user.email, cases[0].id
+    yield user_id, email, case_id
+    with SessionLocal() as db:
+        # Cases and tasks go with the client (ON DELETE CASCADE)
+        db.execute(delete(Client).where(Client.lawyer_id == user_id))
+        db.execute(delete(User).where(User.id == user_id))
+        db.commit()
+
+
+@pytest.mark.parametrize("path, budget", BUDGETS.values(), ids=BUDGETS.keys())
+def test_query_budget(lawyer, path, budget):
+    user_id, email, case_id = lawyer
+    headers = {"Authorization": "Bearer " + create_access_token(email, claims={"uid": user_id, "role": "lawyer"})}
+
+    async def request():
+        try:
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                # Warm the principal cache so only the endpoint's own queries are counted
+                await client.get("/api/v1/auth/me", headers=headers)
+                with query_budget(budget, path):
+                    return await client.get(path.format(case_id=case_id), headers=headers)
+        finally:
+            await async_engine.dispose()
+
+    response = asyncio.run(request())
+    assert response.status_code == 200
+    body = response.json()
+    cases = body if isinstance(body, list) else [body]
+    assert cases
+    if "include=tasks" in path:
+        assert all(len(c["tasks"]) == 2 for c in cases)
@@ -0,0 +1,21 @@
+"""EXPLAIN regression tests: the hot queries in app/scripts/check_query_plans.py stay on their indexes."""
+import pytest
+from sqlalchemy import text
+
+from app.scripts.check_query_plans import CHECKS, check
+
+
+@pytest.fixture(scope="module")
+def conn(database):
+    with database.connect() as conn:
+        # Only a missing index makes the planner fall back to a Seq Scan
+        conn.execute(text("SET enable_seqscan = off"))
+        yield conn
+
+
+@pytest.mark.parametrize(
+    "statement, must_avoid_sort", [c[1:] for c in CHECKS], ids=[c[0] for c in CHECKS]
+)
+def test_query_plan(conn, statement, must_avoid_sort):
+    problems, summary = check(conn, statement, must_avoid_sort)
+    assert not problems, f"{summary}: {'; '.join(problems)}"
@@ -0,0 +1,15 @@
+#!/bin/sh
+# Streaming replica for docker-compose.replica.yml. On first start, clone the primary
+# with pg_basebackup (-R writes standby.signal and primary_conninfo), then hand over to
+# the image's entrypoint, which fixes ownership and runs postgres as a hot standby.
+set -e
+
+if [ ! -s "$PGDATA/PG_VERSION" ]; then
+    export PGPASSWORD="$POSTGRES_PASSWORD"
+    until pg_basebackup -h "$PRIMARY_HOST" -U "$POSTGRES_USER" -D "$PGDATA" -R -X stream -c fast; do
+        echo "Waiting for the primary at $PRIMARY_HOST..."
+        sleep 2
+    done
+fi
+
+exec docker-entrypoint.sh "$@"
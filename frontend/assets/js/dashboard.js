@@ -112,24 +112,32 @@ document.addEventListener('DOMContentLoaded', () => {
 async function fetchDashboardStats() {
     const token = localStorage.getItem('access_token');
     try {
-        // Parallel fetch for stats
-        const [clientsRes, casesRes, tasksRes] = await Promise.all([
-            fetch('/api/v1/clients/', { headers: { 'Authorization': `Bearer ${token}` } }),
-            fetch('/api/v1/cases/', { headers: { 'Authorization': `Bearer ${token}` } }),
-            fetch('/api/v1/tasks/', { headers: { 'Authorization': `Bearer ${token}` } })
-        ]);
-
-        if (clientsRes.ok) {
-            const clients = await clientsRes.json();
-            document.getElementById('count-clients').textContent = clients.length;
-        }
-        if (casesRes.ok) {
-            const cases = await casesRes.json();
-            document.getElementById('count-cases').textContent = cases.length;
-        }
-        if (tasksRes.ok) {
-            const tasks = await tasksRes.json();
-            document.getElementById('count-tasks').textContent = tasks.length;
+        // Counts and deadlines come from one cached summary request
+        const response = await fetch('/api/v1/dashboard/summary', {
+            headers: { 'Authorization': `Bearer ${token}` }
+        });
+
+        if (response.ok) {
+            const summary = await response.json();
+            document.getElementById('count-clients').textContent = summary.active_clients;
+            document.getElementById('count-cases').textContent = summary.active_cases;
+            document.getElementById('count-tasks').textContent = summary.open_tasks;
+            document.getElementById('count-overdue').textContent = summary.overdue_tasks;
+
+            const priorities = summary.active_cases_by_priority;
+            document.getElementById('case-breakdown').textContent =
+                `${priorities.urgent} urgent · ${priorities.high} high priority cases`;
+
+            const deadlines = document.getElementById('upcoming-deadlines-list');
+            if (summary.upcoming_deadlines.length > 0) {
+                deadlines.innerHTML = summary.upcoming_deadlines.map(t => `
+                    <tr>
+                        <td style="font-weight:600">${t.title}</td>
+                        <td>${new Date(t.due_date).toLocaleDateString()}</td>
+                        <td><span class="case-badge badge-${t.priority === 'high' || t.priority === 'urgent' ? 'high' : 'med'}">${t.priority}</span></td>
+                    </tr>
+                `).join('');
+            }
         }
     } catch (err) {
         console.error('Error fetching stats:', err);